@@ -27,7 +27,7 @@ import mixer
 import transport
 
 import rum.processor
-from rum import scheduling, autorefresh
+from rum import scheduling, autorefresh, flushing
 
 # Refresh flag constants that are one-hot encoded that represent refreshing
 # different portions of the midi controller. These correspond to the flags in
@@ -70,8 +70,17 @@ class ChannelRack:
 class Midi:
     @staticmethod
     def to_midi_message(event: 'eventData'):
-        """ Convert an FL Studio eventData midi message to MidiMessage. """
-        return rum.midi.MidiMessage(event.status, event.data1, event.data2)
+        """ Convert an FL Studio eventData midi message to MidiMessage.
+
+        The message is tagged with the MIDI port of the event itself. The
+        port number of the device (device.getPortNumber()) is not used since
+        it is the same for every message a script handles, including the ones
+        other scripts dispatch to it. Versions of FL Studio whose eventData
+        has no port leave the port of the message unknown (None), so only the
+        handlers shared by all ports see these messages.
+        """
+        return rum.midi.MidiMessage(event.status, event.data1, event.data2,
+                                    port=getattr(event, 'port', None))
 
 
 class MixerPanel:
@@ -103,6 +112,12 @@ class Device:
             msg = status + (data1 << 8) + (data2 << 16)
             device.dispatch(i, msg)
 
+    @staticmethod
+    def dispatch_sysex_to_other_scripts(byte_str):
+        """ Dispatches a SYSEX message to all other scripts (see OnSysEx). """
+        for i in range(device.dispatchReceiverCount()):
+            device.dispatch(i, 0xF0, byte_str)
+
 
 class Transport:
     @staticmethod
@@ -129,31 +144,48 @@ def register(function):
 
     This will cause the corresponding method to be registered with the
     framework.
+
+    Buffered output (e.g. LED framebuffers) is flushed once the registered
+    function completes.
     """
     def init_function():
         # Force a full refresh when script attached.
         value = function()
         autorefresh.get_refresh_manager().refresh(autorefresh.FULL_REFRESH)
+        flushing.get_flush_manager().flush()
         return value
 
     def idle_function():
         scheduling.get_scheduler().idle()
-        return function()
+        value = function()
+        flushing.get_flush_manager().flush()
+        return value
 
     def midi_msg_function(event_data):
         msg = Midi.to_midi_message(event_data)
         rum.processor.get_processor().process(msg)
         if msg.handled:
             event_data.handled = True
-        return function(event_data)
+        value = function(event_data)
+        flushing.get_flush_manager().flush()
+        return value
 
     def refresh_function(flags):
         autorefresh.get_refresh_manager().refresh(flags)
-        return function(flags)
+        value = function(flags)
+        flushing.get_flush_manager().flush()
+        return value
+
+    def sysex_function(event_data):
+        value = function(event_data)
+        flushing.get_flush_manager().flush()
+        return value
 
     def full_refresh_function():
         autorefresh.get_refresh_manager().refresh(autorefresh.FULL_REFRESH)
-        return function()
+        value = function()
+        flushing.get_flush_manager().flush()
+        return value
 
     if function.__name__ == 'OnIdle':
         return idle_function
@@ -165,6 +197,8 @@ def register(function):
         return init_function
     elif function.__name__ == 'OnDoFullRefresh':
         return full_refresh_function
+    elif function.__name__ == 'OnSysEx':
+        return sysex_function
 
     # Default to the undecorated function if we don't care
     return function
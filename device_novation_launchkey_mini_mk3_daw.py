@@ -3,31 +3,104 @@
 # receiveFrom=RUM Novation Launchkey Mini Mk3 MIDI
 from daw import flstudio
 from daw.flstudio import register
-from device_profile.novation.launchkey.mini_mk3 import \
-    MiniMk3MidiCommandBuilder, MiniMk3
+from device_profile import registry as profiles
+from device_profile.novation.launchkey.mini_mk3 import MiniMk3, \
+    is_led_refresh, unpack_led_updates
+from rum import flushing
 from rum.matchers import midi_has
 from rum.midi import MidiMessage
 from rum.decorators import trigger_when
+from rum.output import OutputQueue, PRIORITY_BULK, PRIORITY_INTERACTIVE
+
+# Commands to the device are paced so its input buffer doesn't overflow.
+_output_queue = OutputQueue(flstudio.Device.send_sysex_message)
+flushing.get_flush_manager().add(_output_queue.service)
+_profile = profiles.new_profile('novation_launchkey_mini_mk3', True,
+                                flstudio.Device.send_sysex_message,
+                                output_queue=_output_queue)
+
+# Key of the queued command with the batched LED updates.
+_BATCH_KEY = ('led_batch',)
+# Maps LED id to (is_blinking, color) of the LEDs in the queued batch. A newer
+# batch replaces the queued one, so it must carry these updates along.
+_pending_batch = {}
+# Key of the queued command that resends all the LEDs.
+_REFRESH_KEY = ('led_refresh',)
+# Maps LED id to (is_blinking, color) of the LEDs in the queued refresh.
+_pending_refresh = {}
+
+
+def _send_led_updates(updates):
+    """ Queues LED updates, merged with the batch still waiting to be sent.
+
+    The updates are all queued at interactive priority so that a newer update
+    of an LED can never be overtaken by an older one. A queued refresh is
+    sent after them, so it is updated with the newer values.
+    """
+    if _output_queue.is_pending(_REFRESH_KEY):
+        refreshed = [(led_id, value) for led_id, value in updates
+                     if _pending_refresh.get(led_id, value) != value]
+        if refreshed:
+            _send_led_refresh(refreshed)
+    if not _output_queue.is_pending(_BATCH_KEY):
+        _pending_batch.clear()
+    if len(updates) == 1 and not _pending_batch:
+        # Single LED updates supersede pending updates of the same LED.
+        led_id, value = updates[0]
+        _profile.send(_build_led_command([(led_id, value)]),
+                      priority=PRIORITY_INTERACTIVE, key=('led', led_id))
+        return
+    for led_id, value in updates:
+        _pending_batch[led_id] = value
+    _profile.send(_build_led_command(list(_pending_batch.items())),
+                  priority=PRIORITY_INTERACTIVE, key=_BATCH_KEY)
+
+
+def _send_led_refresh(updates):
+    """ Queues a refresh of the LEDs at bulk priority. """
+    if not _output_queue.is_pending(_REFRESH_KEY):
+        _pending_refresh.clear()
+    for led_id, value in updates:
+        _pending_refresh[led_id] = value
+    _profile.send(_build_led_command(list(_pending_refresh.items())),
+                  priority=PRIORITY_BULK, key=_REFRESH_KEY)
+
+
+def _build_led_command(updates):
+    builder = _profile.new_midi_command_builder()
+    for led_id, (is_blinking, color) in updates:
+        if is_blinking:
+            builder.blinking_light(led_id, color)
+        else:
+            builder.light_color(led_id, color)
+    return builder.build()
 
 
 @trigger_when(midi_has(status=MiniMk3.SOLID_LED_STATUS_CMD))
 def set_led_color(m: MidiMessage):
-    msg = (MiniMk3MidiCommandBuilder.new_command()
-           .light_color(m.data1, m.data2)
-           .build())
-    flstudio.Device.send_sysex_message(msg)
+    _send_led_updates([(m.data1, (False, m.data2))])
     m.mark_handled()
 
 
 @trigger_when(midi_has(status=MiniMk3.BLINK_LED_STATUS_CMD))
 def set_blinking_led(m: MidiMessage):
-    msg = (MiniMk3MidiCommandBuilder
-           .new_command()
-           .blinking_light(m.data1, m.data2).build())
-    flstudio.Device.send_sysex_message(msg)
+    _send_led_updates([(m.data1, (True, m.data2))])
     m.mark_handled()
 
 
+@register
+def OnSysEx(event):
+    # LED updates batched by the MIDI script are applied as a single command.
+    updates = unpack_led_updates(event.sysex)
+    if updates is None:
+        return
+    if is_led_refresh(event.sysex):
+        _send_led_refresh(updates)
+    else:
+        _send_led_updates(updates)
+    event.handled = True
+
+
 @register
 def OnInit():
     print('Loaded RUM Device Novation Launchkey Mini MK3 (DAW)')
@@ -5,11 +5,13 @@
 from daw import flstudio
 from daw.flstudio import register, Transport, MixerPanel
 from device_profile.novation.launchkey.mini_mk3 import \
-    MiniMk3
+    MiniMk3, pack_led_updates
 from panels.flstudio import recorder, lights, channel
 from panels.flstudio.channel import ChannelSelector
 from panels.flstudio.lights import LightPanel
-from rum import matchers, registry
+from rum import matchers, registry, flushing
+from rum.compositor import Compositor
+from rum.lights import LedFramebuffer
 from rum.decorators import encoder, button
 from rum.matchers import midi_has, require_all, is_not
 from rum.midi import MidiMessage
@@ -22,20 +24,61 @@ IDLE_PLAYABLE_COLOR = (False, 0x5C)
 IDLE_NOT_PLAYABLE_COLOR = (False, 0x00)
 PLAY_LOOP_COLOR = (False, 0x0D)
 
+# Maximum number of events to keep across all recorded pad patterns. The least
+# recently played patterns are dropped when this is exceeded.
+MAX_RECORDED_EVENTS = 8192
+
+
+# Set when the next LED flush resends all the LEDs.
+_resyncing = False
+
+
+def dispatch_led_updates(changes):
+    # Send all the LED updates of this cycle to the DAW script in one message.
+    global _resyncing
+    flstudio.Device.dispatch_sysex_to_other_scripts(
+        pack_led_updates(changes, refresh=_resyncing))
+    _resyncing = False
+
+
+# LED updates are buffered and only the LEDs that don't match what the device is
+# showing are dispatched to the DAW script once the current midi message or idle
+# cycle has been handled. The framebuffer keeps the shadow of the device LEDs
+# and does the diffing, since the panel lights only see the colors before they
+# are composited.
+_led_framebuffer = LedFramebuffer(flush_fn=dispatch_led_updates)
+
+# The LED colors are composited from layers so that overlays don't fight with
+# the status colors: the pad status colors are at the bottom and the loop delay
+# selection is shown on top of them.
+_compositor = Compositor(output_fn=_led_framebuffer.set,
+                         background=(False, 0))
+_status_layer = _compositor.add_layer('status')
+_loop_delay_layer = _compositor.add_layer('loop_delay')
+
+# Flatten the layers before flushing the changed LEDs.
+flushing.get_flush_manager().add(_compositor.flatten)
+flushing.get_flush_manager().add(_led_framebuffer.flush)
+
+
+def resync_leds():
+    """ Hard resync of all the LEDs (sent after any interactive updates). """
+    global _resyncing
+    _resyncing = True
+    _led_framebuffer.resync()
+
+
 # Novation supports a special blink command. As such, the "color value"
 # will be a pair (is_blinking, color). Colors can be made to blink by setting
 # the is_blinking value to True.
 def request_set_led(led_id, value: (bool, int)):
-    is_blinking, led_color = value
-    led_cmd = (MiniMk3.BLINK_LED_STATUS_CMD if is_blinking
-               else MiniMk3.SOLID_LED_STATUS_CMD)
-    flstudio.Device.dispatch_message_to_other_scripts(
-        led_cmd,
-        led_id,
-        led_color)
+    _status_layer.set(led_id, value)
 
 
 def refresh_lights():
+    # Remove the loop delay selection to reveal the pad status colors.
+    _loop_delay_layer.clear()
+
     # Update the off pattern colors
     for pattern_id in recorder.get_recorder().get_patterns():
         lights.get_light(pattern_id[1]).set_off_color(IDLE_PLAYABLE_COLOR)
@@ -69,7 +112,8 @@ def refresh_lights():
             light_fn=request_set_led,
             initial=(False, 0),
             off_color=(False, 0),
-            on_color=(False, 0x73))
+            on_color=(False, 0x73),
+            resync_fn=resync_leds)
 def on_update_drumpad1_lights(led_id, value):
     request_set_led(led_id, value)
 
@@ -79,7 +123,8 @@ def on_update_drumpad1_lights(led_id, value):
             light_fn=request_set_led,
             initial=(False, 0),
             off_color=(False, 0),
-            on_color=(False, 0x73))
+            on_color=(False, 0x73),
+            resync_fn=resync_leds)
 def on_update_drumpad2_lights(led_id, value):
     request_set_led(led_id, value)
 
@@ -97,6 +142,18 @@ class Device:
 _device = Device()
 
 
+def on_pattern_evicted(pattern_id):
+    light = lights.get_light(pattern_id[1])
+    if light is None:
+        return
+    light.set_off_color(IDLE_NOT_PLAYABLE_COLOR)
+    light.toggle(bool_value=False)
+
+
+recorder.get_recorder().set_memory_budget(MAX_RECORDED_EVENTS,
+                                          eviction_fn=on_pattern_evicted)
+
+
 def is_record_held(msg: MidiMessage):
     return registry.button_down['record']
 
@@ -300,8 +357,8 @@ def on_encoder7(msg: MidiMessage, value):
 def on_set_loop_delay(value, loop_delay_ms):
     selected = int(value * (len(MiniMk3.DRUM_PAD_IDS[1]) - 1))
     for i in range(len(MiniMk3.DRUM_PAD_IDS[1])):
-        request_set_led(MiniMk3.DRUM_PAD_IDS[1][i],
-                        (False, 0x39 if i == selected else 0))
+        _loop_delay_layer.set(MiniMk3.DRUM_PAD_IDS[1][i],
+                              (False, 0x39 if i == selected else 0))
 
 @register
 def OnInit():
@@ -325,6 +382,8 @@ def OnRefresh(flags):
 
 @register
 def OnDoFullRefresh():
+    # Hard resync of all LEDs in case the device was reconnected.
+    resync_leds()
     if DEBUG:
         print('Do full refresh')
 
@@ -1,4 +1,21 @@
-from rum import lights, displays
+import _functools
+
+from rum import lights, displays, flushing, autorefresh, output, colors, \
+    padgrid
+
+# Hardware capabilities a device profile can advertise.
+# Device can blink an LED by itself.
+NATIVE_BLINK = 'native_blink'
+
+# Maximum number of single LED commands cached per device profile.
+MAX_CACHED_COMMANDS = 4096
+
+
+def put_bytes(buffer: bytearray, offset, data):
+    """ Copies data into the buffer at offset and returns the end offset. """
+    end = offset + len(data)
+    buffer[offset:end] = data
+    return end
 
 
 class DeviceProfile:
@@ -8,48 +25,293 @@ class DeviceProfile:
     device with the framework API. Because there is the possibility of button
     inputs and output commands being on separate device ports, only an interface
     is provided and the remaining is left for the user to determine.
+
+    Lights created by the profile write into a LED framebuffer. The changed
+    LEDs are sent as a single command when the framebuffer is flushed (which
+    happens at the end of every dispatch cycle through the flush manager).
+
+    Colors of the lights can be given as colors.Rgb values. For devices with
+    a color PALETTE, they are mapped to the nearest palette index.
+
+    Profiles list the hardware capabilities of the device in CAPABILITIES so
+    that the framework can use them (e.g. native blinking) when available.
+    The limits of the device are declared by the remaining class constants
+    and batched light updates are split into as few messages as they allow.
     """
-    def __init__(self, is_daw_port, send_sysex_fn):
+    CAPABILITIES = frozenset()
+    # Maximum number of bytes per message (None if unlimited).
+    MAX_MESSAGE_SIZE = None
+    # Maximum number of lights updated per message (None if unlimited, 1 if
+    # the device does not support batching light updates).
+    MAX_LIGHTS_PER_MESSAGE = None
+    # (lines, chars per line) of the device display (None if no display).
+    DISPLAY_GEOMETRY = None
+    # The (r, g, b) color of each palette index of the device LEDs (None if
+    # the LEDs do not use a color palette).
+    PALETTE = None
+
+    def __init__(self, is_daw_port, send_sysex_fn,
+                 output_queue: output.OutputQueue = None):
+        """ Construct a DeviceProfile.
+
+        :param is_daw_port: whether commands are sent to the DAW port.
+        :param send_sysex_fn: function that sends a sysex command.
+        :param output_queue: optional OutputQueue that paces the commands
+        sent (to send_sysex_fn) to the port bandwidth.
+        """
         self._is_daw_port = is_daw_port
         self._send_sysex_fn = send_sysex_fn
+        self._output_queue = output_queue
+        # Maps daw_mode to the LED framebuffer of the commands for that mode.
+        self._framebuffers = {}
+        # The LED framebuffers and pad grids, indexed by their source number.
+        self._led_sources = []
+        # Source numbers of the LED sources whose next flush is a resync.
+        self._resyncing = set()
+        # Maps daw_mode to the LED values of the queued refresh commands.
+        self._refresh_leds = {}
+        # Maps daw_mode to the number of queued refresh commands.
+        self._refresh_counts = {}
+        # Maps (led_id, value, value type, daw_mode) to the built command.
+        self._command_cache = {}
+        self._palette = None
 
     def new_midi_command_builder(self):
         """ Return a new builder for constructing a midi command. """
         raise NotImplementedError()
 
-    def new_color_toggle_light(self, led_id, off_value=0x00, on_value=0x7F):
-        """ Return a new color toggle light instance representing the LED. """
-        def set_light_color(value):
-            builder: MidiCommandBuilder = self.new_midi_command_builder()
-            cmd = builder.light_color(led_id, value).build(
-                daw_mode=self._is_daw_port)
+    def send(self, cmd, priority=output.PRIORITY_NORMAL, key=None):
+        """ Sends a command through the output queue (if one is set).
+
+        :param cmd: the bytes of the command.
+        :param priority: the priority of the command in the output queue.
+        :param key: key of what the command updates so pending commands for
+        the same target are dropped.
+        """
+        if self._output_queue is None:
             self._send_sysex_fn(cmd)
-        color_light = lights.ColorLight(update_fn=set_light_color,
-                                        initial=off_value)
+        else:
+            self._output_queue.send(cmd, priority=priority, key=key)
+
+    def clear_output(self):
+        """ Drops the commands waiting in the output queue.
+
+        The framebuffers are resynced since their shadows already account for
+        the dropped commands.
+        """
+        if self._output_queue is not None:
+            self._output_queue.clear()
+        self.resync()
+
+    def resync(self):
+        """ Hard resync: resends all the LEDs on the next flush.
+
+        The LEDs are resent at bulk priority so that feedback to user actions
+        goes out ahead of them. LEDs updated while the resync is still queued
+        are updated in the queued commands too, so the resync never reverts
+        them.
+        """
+        for source, leds in enumerate(self._led_sources):
+            leds.resync()
+            if leds.is_dirty():
+                self._resyncing.add(source)
+
+    def has_capability(self, capability):
+        """ Returns True if the device supports the hardware capability. """
+        return capability in self.CAPABILITIES
+
+    def get_palette(self):
+        """ Returns the colors.Palette of the device (None if no PALETTE). """
+        if self._palette is None and self.PALETTE is not None:
+            # The lookup table is shared by all profiles with this palette.
+            self._palette = colors.get_palette(self.PALETTE)
+        return self._palette
+
+    def color_value(self, color):
+        """ Returns the LED value of a color (palette index for Rgb colors).
+        """
+        if isinstance(color, colors.Rgb) and self.PALETTE is not None:
+            return self.get_palette().index(color)
+        return color
+
+    def _set_led_color(self, framebuffer, led_id, color):
+        framebuffer.set(led_id, self.color_value(color))
+
+    def get_framebuffer(self, daw_mode=None):
+        """ Returns the LED framebuffer lights of the device write into.
+
+        :param daw_mode: whether the commands are built for the DAW port
+        (defaults to whether the profile is for the DAW port).
+        """
+        if daw_mode is None:
+            daw_mode = self._is_daw_port
+        if daw_mode not in self._framebuffers:
+            framebuffer = lights.LedFramebuffer(
+                flush_fn=_functools.partial(
+                    self._send_leds, daw_mode, len(self._led_sources)))
+            self._framebuffers[daw_mode] = framebuffer
+            self._add_led_source(framebuffer)
+        return self._framebuffers[daw_mode]
+
+    def _add_led_source(self, leds):
+        if not self._led_sources:
+            autorefresh.get_refresh_manager().add(self._on_refresh)
+        self._led_sources.append(leds)
+        flushing.get_flush_manager().add(leds.flush)
+
+    def _on_refresh(self, flags):
+        # Resend all the LEDs on a full refresh (e.g. device reconnected).
+        if flags == autorefresh.FULL_REFRESH:
+            self.resync()
+
+    def _is_refresh_pending(self, daw_mode):
+        """ Returns True if refresh commands are waiting to be sent. """
+        return self._output_queue is not None and any(
+            self._output_queue.is_pending(('led_refresh', daw_mode, idx))
+            for idx in range(self._refresh_counts.get(daw_mode, 0)))
+
+    def _send_refresh(self, daw_mode, changes):
+        """ Queues resynced LEDs at bulk priority.
+
+        They are merged with the refresh commands still waiting to be sent.
+        """
+        if not self._is_refresh_pending(daw_mode):
+            self._refresh_leds[daw_mode] = {}
+        self._refresh_leds[daw_mode].update(changes)
+        self._queue_refresh(daw_mode)
+
+    def _queue_refresh(self, daw_mode):
+        cmds = self._build_leds_messages(
+            daw_mode, list(self._refresh_leds[daw_mode].items()))
+        for idx, cmd in enumerate(cmds):
+            self.send(cmd, priority=output.PRIORITY_BULK,
+                      key=('led_refresh', daw_mode, idx))
+        if self._output_queue is not None:
+            # Drop the commands of a previous build that had more messages.
+            for idx in range(len(cmds),
+                             self._refresh_counts.get(daw_mode, 0)):
+                self._output_queue.discard(('led_refresh', daw_mode, idx))
+        self._refresh_counts[daw_mode] = len(cmds)
+
+    def _update_refresh(self, daw_mode, changes):
+        """ Updates the queued refresh commands with newer LED values. """
+        if not self._is_refresh_pending(daw_mode):
+            return
+        leds = self._refresh_leds[daw_mode]
+        updated = False
+        for led_id, value in changes:
+            if led_id in leds and leds[led_id] != value:
+                leds[led_id] = value
+                updated = True
+        if updated:
+            self._queue_refresh(daw_mode)
+
+    def _send_leds(self, daw_mode, source, changes):
+        """ Sends the changed LEDs of a framebuffer in one command. """
+        if source in self._resyncing:
+            self._resyncing.discard(source)
+            self._send_refresh(daw_mode, changes)
+            return
+        self._update_refresh(daw_mode, changes)
+        if len(changes) == 1:
+            # Setting a single LED is the common case so the finished command
+            # is cached.
+            led_id, value = changes[0]
+            key = (led_id, value, value.__class__, daw_mode)
+            cmd = self._command_cache.get(key)
+            if cmd is None:
+                if len(self._command_cache) >= MAX_CACHED_COMMANDS:
+                    self._command_cache.clear()
+                cmd = self._build_leds_messages(daw_mode, changes)[0]
+                self._command_cache[key] = cmd
+            self.send(cmd, priority=output.PRIORITY_INTERACTIVE,
+                      key=('led', daw_mode, led_id))
+            return
+        for cmd in self._build_leds_messages(daw_mode, changes):
+            self.send(cmd, priority=output.PRIORITY_INTERACTIVE)
+
+    def _build_leds_messages(self, daw_mode, changes):
+        builder: MidiCommandBuilder = self.new_midi_command_builder()
+        for led_id, value in changes:
+            if value is True:
+                builder.light_on(led_id)
+            elif value is False:
+                builder.light_off(led_id)
+            elif isinstance(value, _Blinking):
+                builder.blinking_light(led_id, value.color)
+            else:
+                builder.light_color(led_id, value)
+        return builder.build_messages(
+            daw_mode=daw_mode,
+            max_size=self.MAX_MESSAGE_SIZE,
+            max_lights=self.MAX_LIGHTS_PER_MESSAGE)
+
+    def new_color_toggle_light(self, led_id, off_value=0x00, on_value=0x7F):
+        """ Return a new color toggle light instance representing the LED.
+
+        The light blinks natively if the device has the NATIVE_BLINK
+        capability.
+        """
+        framebuffer = self.get_framebuffer()
+        color_light = lights.ColorLight(
+            update_fn=_functools.partial(
+                self._set_led_color, framebuffer, led_id),
+            initial=off_value)
+        blink_fn = None
+        if self.has_capability(NATIVE_BLINK):
+            def blink_fn(color):
+                framebuffer.set(led_id, _Blinking(self.color_value(color)))
         return lights.ColorToggleLight(
-            color_light, off_color=off_value, on_color=on_value)
+            color_light, off_color=off_value, on_color=on_value,
+            blink_fn=blink_fn)
 
     def new_toggle_light(self, led_id, daw_mode=True):
         """ Return a new toggle light instance representing the LED. """
-        def light_on():
-            builder: MidiCommandBuilder = self.new_midi_command_builder()
-            cmd = builder.light_on(led_id).build(daw_mode=daw_mode)
-            self._send_sysex_fn(cmd)
+        framebuffer = self.get_framebuffer(daw_mode=daw_mode)
+        return lights.OnOffLight(
+            on_fn=_functools.partial(framebuffer.set, led_id, True),
+            off_fn=_functools.partial(framebuffer.set, led_id, False),
+            initial=False)
 
-        def light_off():
-            builder: MidiCommandBuilder = self.new_midi_command_builder()
-            cmd = builder.light_off(led_id).build(daw_mode=daw_mode)
-            self._send_sysex_fn(cmd)
+    def new_pad_grid(self, led_ids, daw_mode=None):
+        """ Return a new PadGrid of the pad LEDs.
+
+        The changed pads of the grid are sent in one command when it is
+        flushed (through the flush manager). Colors are LED values so Rgb
+        colors need to be converted with color_value first.
 
-        return lights.OnOffLight(on_fn=light_on,
-                                 off_fn=light_off,
-                                 initial=False)
+        :param led_ids: the rows of LED ids of the pads.
+        :param daw_mode: whether the commands are built for the DAW port
+        (defaults to whether the profile is for the DAW port).
+        """
+        if daw_mode is None:
+            daw_mode = self._is_daw_port
+        grid = padgrid.PadGrid(
+            led_ids, flush_fn=_functools.partial(
+                self._send_leds, daw_mode, len(self._led_sources)))
+        self._add_led_source(grid)
+        return grid
 
     def new_display(self, daw_mode=True):
         """ Return a new display instance. """
         raise NotImplementedError()
 
 
+class _Blinking:
+    """ Framebuffer value of an LED blinking natively in a color. """
+    def __init__(self, color):
+        self.color = color
+
+    def __eq__(self, other):
+        return isinstance(other, _Blinking) and self.color == other.color
+
+    def __hash__(self):
+        return hash(self.color)
+
+    def __repr__(self):
+        return '[Blinking: {}]'.format(self.color)
+
+
 class MidiCommandBuilder:
     """ Abstract base class for a builder for constructing midi commands.
 
@@ -67,6 +329,7 @@ class MidiCommandBuilder:
         self.param_lights_to_set_colors = []
         self.param_lights_to_turn_on = []
         self.param_lights_to_turn_off = []
+        self.param_lights_to_blink = []
         self.param_display_updates = []
 
     def light_color(self, *light_value_args):
@@ -95,6 +358,18 @@ class MidiCommandBuilder:
             self.param_lights_to_turn_off.append(light_ids[i])
         return self
 
+    def blinking_light(self, *led_id_color_args):
+        """ Specify the lights to blink natively in a given color.
+
+        This is specified by calling .blinking_light(id1, val1, id2, val2, ...)
+        and is only built by devices with the NATIVE_BLINK capability.
+        """
+        assert len(led_id_color_args) % 2 == 0
+        for i in range(0, len(led_id_color_args), 2):
+            self.param_lights_to_blink.append(
+                (led_id_color_args[i], led_id_color_args[i + 1]))
+        return self
+
     def display(self, display_id, lines):
         """ Specify the lines to set for the given display_id. """
         self.param_display_updates.append((display_id, lines))
@@ -110,4 +385,86 @@ class MidiCommandBuilder:
         """
         raise NotImplementedError()
 
+    def _light_entries(self):
+        """ Returns the (method name, args) of the lights, in build order. """
+        return ([('light_off', (led_id,))
+                 for led_id in self.param_lights_to_turn_off]
+                + [('light_on', (led_id,))
+                   for led_id in self.param_lights_to_turn_on]
+                + [('light_color', entry)
+                   for entry in self.param_lights_to_set_colors]
+                + [('blinking_light', entry)
+                   for entry in self.param_lights_to_blink])
+
+    def _new_chunk(self, entries):
+        """ Returns a new builder with only the specified light entries. """
+        builder = self.__class__()
+        for name, args in entries:
+            getattr(builder, name)(*args)
+        return builder
+
+    def _light_chunks(self, entries, daw_mode, max_size, max_lights):
+        """ Returns the light entries grouped into the chunks of each message.
+
+        The size of each entry is worked out from the builds of one and two
+        of the entry (the difference is the entry and the rest is the fixed
+        message overhead), so chunks mixing entry kinds of different sizes
+        stay within max_size. Entries of the same kind share their size.
+        """
+        sizes = {}
+        overhead = 0
+        if max_size is not None:
+            for name, args in entries:
+                if name in sizes:
+                    continue
+                one = len(self._new_chunk([(name, args)]).build(
+                    daw_mode=daw_mode))
+                two = len(self._new_chunk([(name, args), (name, args)]).build(
+                    daw_mode=daw_mode))
+                sizes[name] = two - one
+                overhead = max(overhead, one - sizes[name])
+
+        chunks = []
+        chunk = []
+        chunk_size = overhead
+        for entry in entries:
+            entry_size = sizes.get(entry[0], 0)
+            if chunk and ((max_size is not None
+                           and chunk_size + entry_size > max_size)
+                          or (max_lights is not None
+                              and len(chunk) >= max_lights)):
+                chunks.append(chunk)
+                chunk = []
+                chunk_size = overhead
+            chunk.append(entry)
+            chunk_size += entry_size
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def build_messages(self, daw_mode=True, max_size=None, max_lights=None):
+        """ Returns the command split into the fewest messages the limits allow.
+
+        Light updates are packed into as few messages as possible while each
+        message stays within max_size bytes and max_lights lights. Display
+        updates are built in their own message.
+
+        :param daw_mode: Set to true if building the command to be sent on
+        DAW port. false otherwise
+        :param max_size: maximum number of bytes per message (None if
+        unlimited).
+        :param max_lights: maximum number of lights per message (None if
+        unlimited).
+        """
+        entries = self._light_entries()
+        messages = []
+        for chunk in self._light_chunks(entries, daw_mode, max_size,
+                                        max_lights):
+            messages.append(self._new_chunk(chunk).build(daw_mode=daw_mode))
+        if self.param_display_updates:
+            builder = self.__class__()
+            builder.param_display_updates = list(self.param_display_updates)
+            messages.append(builder.build(daw_mode=daw_mode))
+        return [msg for msg in messages if msg]
+
 
@@ -1,4 +1,7 @@
-from device_profile.abstract import MidiCommandBuilder
+from device_profile.abstract import MidiCommandBuilder, DeviceProfile, \
+    put_bytes
+from device_profile.registry import register_profile
+from rum import displays, output
 
 
 class Mk2(MidiCommandBuilder):
@@ -10,33 +13,94 @@ class Mk2(MidiCommandBuilder):
     CMD_SET_LIGHTS = bytes([0x02, 0x00, 0x10])
     CMD_SET_DISPLAY = bytes([0x04, 0x00, 0x60])
 
-    def build(self):
+    def build(self, daw_mode=True):
+        num_lights = (len(self.param_lights_to_turn_off)
+                      + len(self.param_lights_to_turn_on)
+                      + len(self.param_lights_to_set_colors))
+        lines = []
+        if self.param_display_updates:
+            # Keylab 61 only has 1 display, so just fetch the last update.
+            _, lines = self.param_display_updates[-1]
+            # Copy the line bytes straight from the display buffer. Lines set
+            # to None are unchanged and left out of the command.
+            lines = [(line_id, displays.line_bytes(line))
+                     for line_id, line in enumerate(lines[:2], start=1)
+                     if line is not None]
+
+        # Size the command upfront so it is written into a single buffer.
+        size = 0
+        if num_lights:
+            size += (len(Mk2.CMD_BEGIN) + len(Mk2.CMD_SET_LIGHTS)
+                     + 2 * num_lights + len(Mk2.CMD_END))
+        if lines:
+            size += (len(Mk2.CMD_BEGIN) + len(Mk2.CMD_SET_DISPLAY)
+                     + sum(len(line) + 2 for _, line in lines)
+                     + 1 + len(Mk2.CMD_END))
+        cmd = bytearray(size)
+        offset = 0
+
         # Start with the lights
-        cmd = bytes()
-        if (self.param_lights_to_turn_off
-                or self.param_lights_to_turn_on
-                or self.param_lights_to_set_colors):
-            cmd += Mk2.CMD_BEGIN
-            cmd += Mk2.CMD_SET_LIGHTS
+        if num_lights:
+            offset = put_bytes(cmd, offset, Mk2.CMD_BEGIN)
+            offset = put_bytes(cmd, offset, Mk2.CMD_SET_LIGHTS)
             for led_id in self.param_lights_to_turn_off:
-                cmd += bytes([led_id, 0])
+                offset = put_bytes(cmd, offset, (led_id, 0))
 
             for led_id in self.param_lights_to_turn_on:
-                cmd += bytes([led_id, 0x7F])
+                offset = put_bytes(cmd, offset, (led_id, 0x7F))
 
             for led_id, led_value in self.param_lights_to_set_colors:
-                cmd += bytes([led_id, led_value])
-            cmd += Mk2.CMD_END
+                offset = put_bytes(cmd, offset, (led_id, led_value))
+            offset = put_bytes(cmd, offset, Mk2.CMD_END)
 
         # Now deal with the display
-        if self.param_display_updates:
-            # Keylab 61 only has 1 display, so just fetch the last update.
-            lines = self.param_display_updates[-1]
-            cmd += Mk2.CMD_BEGIN
-            cmd += Mk2.CMD_SET_DISPLAY
-            cmd += bytes([0x1]) + bytes(lines[0], 'ascii') + bytes([0x00])
-            if len(lines) >= 2:
-                cmd += bytes([0x2]) + bytes(lines[1], 'ascii') + bytes([0x00])
-            cmd += bytes([0x7F])
-            cmd += Mk2.CMD_END
-        return cmd
+        if lines:
+            offset = put_bytes(cmd, offset, Mk2.CMD_BEGIN)
+            offset = put_bytes(cmd, offset, Mk2.CMD_SET_DISPLAY)
+            for line_id, line in lines:
+                cmd[offset] = line_id
+                offset = put_bytes(cmd, offset + 1, line)
+                cmd[offset] = 0x00
+                offset += 1
+            cmd[offset] = 0x7F
+            put_bytes(cmd, offset + 1, Mk2.CMD_END)
+        return bytes(cmd)
+
+
+@register_profile('arturia_keylab_mk2')
+class Mk2DeviceProfile(DeviceProfile):
+    """ Device profile of the Arturia Keylab mk2.
+
+    All the changed lights are set with a single CMD_SET_LIGHTS message and
+    display pushes only send the lines that changed.
+    """
+    DISPLAY_GEOMETRY = (2, 16)
+    # Conservative bound on the length of a sysex message so that large light
+    # updates don't overrun the input buffer of the keyboard (a light command
+    # holds up to 59 lights).
+    MAX_MESSAGE_SIZE = 128
+
+    def new_midi_command_builder(self):
+        return Mk2()
+
+    def new_display(self, daw_mode=True):
+        num_lines, line_width = Mk2DeviceProfile.DISPLAY_GEOMETRY
+        display = (displays.DirectDisplay.Builder()
+                   .set_lines(num_lines)
+                   .set_line_width(line_width)
+                   .push_changes_with(
+                       lambda regions: self._push_display_lines(
+                           display, daw_mode, regions))
+                   .build())
+        return display
+
+    def _push_display_lines(self, display, daw_mode, regions):
+        changed = set(line_idx for line_idx, _, _ in regions)
+        lines = [line if idx in changed else None
+                 for idx, line in enumerate(display[:])]
+        cmd = Mk2().display(0, lines).build(daw_mode=daw_mode)
+        # Only a pending push of the same lines is superseded, so that lines
+        # of an earlier push are never dropped. Display rewrites are bulk
+        # updates so LED feedback goes out first.
+        self.send(cmd, priority=output.PRIORITY_BULK,
+                  key=('display', daw_mode, tuple(sorted(changed))))
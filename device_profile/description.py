@@ -0,0 +1,220 @@
+""" Declarative device descriptions compiled to matcher indexes and tables.
+
+A device description is a JSON file listing the controls of a device (the
+status bytes and data1 ids of their midi messages), the LED status bytes and
+the sysex templates of the commands sent to it. Numbers can be written as
+ints or hex strings (e.g. "0x9F").
+
+Example:
+    {
+      "name": "my_device",
+      "commands": {"preamble": ["0x9F", "0x0C", "0x00"]},
+      "leds": {"solid": "0x99", "on": "0x77", "off": "0x00"},
+      "controls": {
+        "play": {"status_range": ["0xB0", "0xBF"], "ids": "0x73"},
+        "pads": {"status": {"down": "0x99", "up": "0x89"},
+                 "ids": [["0x28", "0x29"], ["0x24", "0x25"]]}
+      }
+    }
+
+Descriptions are compiled at development time into plain tables (the ids of
+every control, an index of (status, data1) to the control and the command
+bytes) that are written out as a Python module of literals:
+
+    python -m device_profile.description my_device.json my_device_layout.py
+
+Device profiles import the generated module and wrap its COMPILED tables in a
+DeviceDescription, so script init neither parses JSON nor needs any of the
+(non-builtin) standard library modules used to compile descriptions. Re-run
+the command after changing a description.
+"""
+import sys
+
+
+def _number(value):
+    """ Returns the int of a number written as an int or hex string. """
+    if isinstance(value, str):
+        return int(value, 0)
+    return value
+
+
+def _statuses(control):
+    """ Returns (statuses, events) of a control description.
+
+    statuses is the tuple of all the status bytes of the control and events
+    maps the event name to its status byte (for controls with a status per
+    event such as pad down/up).
+    """
+    if 'status_range' in control:
+        low, high = control['status_range']
+        return tuple(range(_number(low), _number(high) + 1)), {}
+    events = {name: _number(status)
+              for name, status in control['status'].items()}
+    return tuple(sorted(set(events.values()))), events
+
+
+def compile_description(description):
+    """ Compiles a parsed description to its tables.
+
+    :param description: the parsed JSON of the description.
+    """
+    controls = {}
+    index = {}
+    for name, control in description.get('controls', {}).items():
+        ids = control['ids']
+        if isinstance(ids, list) and ids and isinstance(ids[0], list):
+            rows = tuple(tuple(_number(i) for i in row) for row in ids)
+        elif isinstance(ids, list):
+            rows = (tuple(_number(i) for i in ids),)
+        else:
+            rows = ((_number(ids),),)
+        flat_ids = tuple(i for row in rows for i in row)
+        statuses, events = _statuses(control)
+        controls[name] = {
+            'rows': rows,
+            'ids': flat_ids,
+            'statuses': statuses,
+            'events': events,
+            'channel': control.get('channel'),
+        }
+        for idx, data1 in enumerate(flat_ids):
+            for status in statuses:
+                assert (status, data1) not in index, (
+                    'Controls {} and {} share message ({}, {})'.format(
+                        index[(status, data1)][0], name, status, data1))
+                index[(status, data1)] = (name, idx)
+    return {
+        'name': description.get('name'),
+        'controls': controls,
+        'index': index,
+        'leds': {name: _number(value)
+                 for name, value in description.get('leds', {}).items()},
+        'commands': {name: bytes(_number(b) for b in template)
+                     for name, template in
+                     description.get('commands', {}).items()},
+    }
+
+
+def compile_file(json_path):
+    """ Compiles a description file to its tables (development time only). """
+    json = __import__('json')
+    with open(json_path, 'r') as f:
+        return compile_description(json.load(f))
+
+
+def _format_dict(entries, indent):
+    """ Returns the source of a dict literal with one entry per line. """
+    pad = ' ' * indent
+    lines = ['{']
+    for key, value in entries:
+        lines.append('{}    {!r}: {},'.format(pad, key, value))
+    lines.append(pad + '}')
+    return '\n'.join(lines)
+
+
+def format_compiled(compiled):
+    """ Returns the source of a Python module with the compiled tables. """
+    controls = _format_dict(
+        [(name, _format_dict(
+            [(key, repr(value))
+             for key, value in compiled['controls'][name].items()], 8))
+         for name in sorted(compiled['controls'])], 4)
+    index = _format_dict(
+        [(key, repr(compiled['index'][key]))
+         for key in sorted(compiled['index'])], 4)
+    body = _format_dict([
+        ('name', repr(compiled['name'])),
+        ('controls', controls),
+        ('index', index),
+        ('leds', repr(compiled['leds'])),
+        ('commands', repr(compiled['commands'])),
+    ], 0)
+    return 'COMPILED = {}\n'.format(body)
+
+
+def write_module(json_path, module_path):
+    """ Writes the compiled tables of a description file as a Python module.
+
+    The module defines COMPILED holding the tables as literals.
+    """
+    name = json_path.replace('\\', '/').split('/')[-1]
+    with open(module_path, 'w') as f:
+        f.write('""" Compiled from {} by device_profile.description.\n\n'
+                'Do not edit. Regenerate after changing the description.\n'
+                '"""\n'.format(name))
+        f.write(format_compiled(compile_file(json_path)))
+
+
+class DeviceDescription:
+    """ Compiled description of a device. """
+    def __init__(self, compiled):
+        self._compiled = compiled
+        self._controls = compiled['controls']
+        self._index = compiled['index']
+
+    @property
+    def name(self):
+        """ Returns the name of the described device. """
+        return self._compiled['name']
+
+    def control_names(self):
+        """ Returns the names of the controls of the device. """
+        return list(self._controls)
+
+    def ids(self, control):
+        """ Returns the data1 ids of a control as a list. """
+        return list(self._controls[control]['ids'])
+
+    def rows(self, control):
+        """ Returns the data1 ids of a control as a list of rows. """
+        return [list(row) for row in self._controls[control]['rows']]
+
+    def id_map(self, control):
+        """ Returns a dict mapping the data1 ids of a control to their index.
+        """
+        return {data1: idx
+                for idx, data1 in enumerate(self._controls[control]['ids'])}
+
+    def status(self, control, event):
+        """ Returns the status byte of an event (e.g. 'down') of a control. """
+        return self._controls[control]['events'][event]
+
+    def channel(self, control):
+        """ Returns the midi channel of a control (None if not specified). """
+        return self._controls[control]['channel']
+
+    def led(self, name):
+        """ Returns an LED value (e.g. a status byte or color) by name. """
+        return self._compiled['leds'][name]
+
+    def command(self, name):
+        """ Returns the bytes of a sysex template by name. """
+        return self._compiled['commands'][name]
+
+    def lookup(self, msg):
+        """ Returns the (control, index) a midi message is from.
+
+        Returns None if the message is not from a described control.
+        """
+        return self._index.get((msg.status, msg.data1))
+
+    def matcher(self, control, idx=None, event=None):
+        """ Returns a matcher of the messages of a control.
+
+        :param control: name of the control.
+        :param idx: only match the message of the control id at this index
+        (defaults to any id of the control).
+        :param event: only match the status of this event (defaults to any
+        status of the control).
+        """
+        entry = self._controls[control]
+        ids = entry['ids'] if idx is None else (entry['ids'][idx],)
+        statuses = (entry['statuses'] if event is None
+                    else (entry['events'][event],))
+        keys = frozenset((status, data1)
+                         for status in statuses for data1 in ids)
+        return lambda m: (m.status, m.data1) in keys
+
+
+if __name__ == '__main__':
+    write_module(sys.argv[1], sys.argv[2])
@@ -0,0 +1,248 @@
+""" In-process emulator of the Novation Launchkey Mini Mk3.
+
+The emulator stands in for the keyboard when exercising a device script. It
+generates input streams (pad rolls, encoder sweeps, button chords) with the
+message layout of the real device, keeps a model of the LED state from the
+output sent to it and measures the output traffic:
+  - messages and bytes sent to the device per input,
+  - bytes per second sent to the device,
+  - latency from an input to the first LED change that follows it.
+
+Example:
+    emulator = MiniMk3Emulator(input_fn=send_to_script,
+                               time_fn=clock.time, sleep_fn=clock.advance)
+    emulator.play(merge(pad_roll(rate_hz=20, count=32),
+                        encoder_sweep(7, rate_hz=100)),
+                  idle_fn=script.OnIdle)
+    print(emulator.report())
+"""
+import time
+
+from device_profile.novation.launchkey.mini_mk3 import MiniMk3, \
+    unpack_led_updates
+
+_DESCRIPTION = MiniMk3.DESCRIPTION
+_PAD_DOWN = _DESCRIPTION.status('drum_pads', 'down')
+_PAD_UP = _DESCRIPTION.status('drum_pads', 'up')
+# Status of the control change messages sent by the encoders and buttons.
+_CONTROL_CHANGE = 0xB0
+# Status of the DAW mode command at the start of the built commands.
+_DAW_MODE_STATUS = MiniMk3.CMD_PREAMBLE[0]
+
+LED_OFF = (False, 0)
+
+
+def _pad_ids():
+    return [led_id for row in MiniMk3.DRUM_PAD_IDS for led_id in row]
+
+
+def pad_roll(rate_hz, count, velocity=0x7F, hold=None, start=0.0):
+    """ Returns the input events of pads pressed one after the other.
+
+    Each input event is a (time in seconds, status, data1, data2) tuple.
+
+    :param rate_hz: number of pad presses per second.
+    :param count: number of pad presses (cycles through all the pads).
+    :param velocity: velocity of the pad presses.
+    :param hold: seconds each pad is held (default: half the press interval).
+    :param start: time of the first press.
+    """
+    interval = 1.0 / rate_hz
+    if hold is None:
+        hold = interval / 2
+    pad_ids = _pad_ids()
+    events = []
+    for i in range(count):
+        pad_id = pad_ids[i % len(pad_ids)]
+        press_time = start + i * interval
+        events.append((press_time, _PAD_DOWN, pad_id, velocity))
+        events.append((press_time + hold, _PAD_UP, pad_id, 0))
+    return merge(events)
+
+
+def encoder_sweep(idx, rate_hz, first=0, last=127, step=1, start=0.0):
+    """ Returns the input events of an encoder turned from first to last.
+
+    :param idx: index of the encoder (0-7).
+    :param rate_hz: number of encoder messages per second.
+    :param first: the first encoder value.
+    :param last: the last encoder value.
+    :param step: the value change per message.
+    :param start: time of the first message.
+    """
+    if last < first:
+        step = -abs(step)
+    encoder_id = MiniMk3.ENCODER_IDS[idx]
+    values = range(first, last + (1 if step > 0 else -1), step)
+    return [(start + i / rate_hz, _CONTROL_CHANGE, encoder_id, value)
+            for i, value in enumerate(values)]
+
+
+def button_chord(names, hold=0.1, start=0.0):
+    """ Returns the input events of buttons pressed and released together.
+
+    :param names: names of the buttons ('record', 'play', 'page_up' or
+    'page_down').
+    :param hold: seconds the buttons are held.
+    :param start: time the buttons are pressed.
+    """
+    button_ids = [_DESCRIPTION.ids(name)[0] for name in names]
+    return ([(start, _CONTROL_CHANGE, button_id, 0x7F)
+             for button_id in button_ids]
+            + [(start + hold, _CONTROL_CHANGE, button_id, 0x00)
+               for button_id in reversed(button_ids)])
+
+
+def merge(*event_lists):
+    """ Returns the input events of all the lists ordered by time. """
+    events = [event for events in event_lists for event in events]
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+class MiniMk3Emulator:
+    """ Emulates the LEDs and inputs of a Launchkey Mini Mk3. """
+    def __init__(self, input_fn, time_fn=None, sleep_fn=None):
+        """ Construct a MiniMk3Emulator.
+
+        :param input_fn: function taking (status, data1, data2) that delivers
+        an input message to the script under test.
+        :param time_fn: function returning the current time in seconds
+        (default: time.monotonic).
+        :param sleep_fn: function that waits the specified seconds (default:
+        time.sleep). Use the advance method of a fake clock in tests.
+        """
+        self._input_fn = input_fn
+        self._time_fn = time.monotonic if time_fn is None else time_fn
+        self._sleep_fn = time.sleep if sleep_fn is None else sleep_fn
+        # Maps LED id to (is_blinking, color).
+        self.leds = {}
+        self.reset_metrics()
+
+    def reset_metrics(self):
+        """ Resets the traffic metrics. """
+        self.inputs = 0
+        self.messages = 0
+        self.bytes = 0
+        self.led_changes = 0
+        self.latencies = []
+        self._first_input_time = None
+        self._last_output_time = None
+        # Time of the last input not yet followed by an LED change.
+        self._pending_input_time = None
+
+    def led(self, led_id):
+        """ Returns the (is_blinking, color) the LED shows. """
+        return self.leds.get(led_id, LED_OFF)
+
+    def pad_colors(self):
+        """ Returns the (is_blinking, color) of the pads as rows. """
+        return [[self.led(led_id) for led_id in row]
+                for row in MiniMk3.DRUM_PAD_IDS]
+
+    # Inputs
+    def send(self, status, data1, data2):
+        """ Sends an input message to the script. """
+        now = self._time_fn()
+        if self._first_input_time is None:
+            self._first_input_time = now
+        self.inputs += 1
+        self._pending_input_time = now
+        self._input_fn(status, data1, data2)
+
+    def press_pad(self, x, y, velocity=0x7F):
+        self.send(_PAD_DOWN, MiniMk3.DRUM_PAD_IDS[y][x], velocity)
+
+    def release_pad(self, x, y):
+        self.send(_PAD_UP, MiniMk3.DRUM_PAD_IDS[y][x], 0)
+
+    def turn_encoder(self, idx, value):
+        self.send(_CONTROL_CHANGE, MiniMk3.ENCODER_IDS[idx], value)
+
+    def press_button(self, name):
+        self.send(_CONTROL_CHANGE, _DESCRIPTION.ids(name)[0], 0x7F)
+
+    def release_button(self, name):
+        self.send(_CONTROL_CHANGE, _DESCRIPTION.ids(name)[0], 0x00)
+
+    def play(self, events, idle_fn=None, idle_interval=0.01):
+        """ Sends input events at their times.
+
+        :param events: list of (time in seconds, status, data1, data2) ordered
+        by time (relative to the start of play).
+        :param idle_fn: function called while waiting for the next event
+        (e.g. the OnIdle of the script).
+        :param idle_interval: maximum seconds between idle_fn calls.
+        """
+        start = self._time_fn()
+        for event_time, status, data1, data2 in events:
+            self._wait_until(start + event_time, idle_fn, idle_interval)
+            self.send(status, data1, data2)
+        if idle_fn is not None:
+            idle_fn()
+
+    def _wait_until(self, until, idle_fn, idle_interval):
+        while True:
+            if idle_fn is not None:
+                idle_fn()
+            remaining = until - self._time_fn()
+            if remaining <= 0:
+                return
+            self._sleep_fn(min(remaining, idle_interval))
+
+    # Outputs
+    def receive(self, data):
+        """ Applies a message sent to the device.
+
+        Accepts the commands built by MiniMk3MidiCommandBuilder as well as the
+        packed LED updates the MIDI script dispatches to the DAW script.
+        """
+        now = self._time_fn()
+        self.messages += 1
+        self.bytes += len(data)
+        self._last_output_time = now
+        data = bytes(data)
+        updates = unpack_led_updates(data)
+        if updates is None:
+            updates = []
+            for i in range(0, len(data) - 2, 3):
+                status, led_id, color = data[i], data[i + 1], data[i + 2]
+                if status == MiniMk3.SOLID_LED_STATUS_CMD:
+                    updates.append((led_id, (False, color)))
+                elif status == MiniMk3.BLINK_LED_STATUS_CMD:
+                    updates.append((led_id, (True, color)))
+                elif status != _DAW_MODE_STATUS:
+                    # Not a LED command (e.g. other sysex).
+                    break
+        changed = False
+        for led_id, value in updates:
+            value = (bool(value[0]), value[1])
+            if self.leds.get(led_id, LED_OFF) != value:
+                self.leds[led_id] = value
+                self.led_changes += 1
+                changed = True
+        if changed and self._pending_input_time is not None:
+            self.latencies.append(now - self._pending_input_time)
+            self._pending_input_time = None
+
+    def report(self):
+        """ Returns a dict of the traffic metrics. """
+        elapsed = 0.0
+        if (self._first_input_time is not None
+                and self._last_output_time is not None):
+            elapsed = self._last_output_time - self._first_input_time
+        return {
+            'inputs': self.inputs,
+            'messages': self.messages,
+            'bytes': self.bytes,
+            'led_changes': self.led_changes,
+            'messages_per_input': (self.messages / self.inputs
+                                   if self.inputs else 0.0),
+            'bytes_per_second': (self.bytes / elapsed if elapsed > 0
+                                 else 0.0),
+            'latency_ms_avg': (1000 * sum(self.latencies)
+                               / len(self.latencies)
+                               if self.latencies else 0.0),
+            'latency_ms_max': (1000 * max(self.latencies)
+                               if self.latencies else 0.0),
+        }
@@ -1,17 +1,30 @@
-from device_profile.abstract import MidiCommandBuilder, DeviceProfile
+from device_profile.abstract import MidiCommandBuilder, DeviceProfile, \
+    NATIVE_BLINK, put_bytes
+from device_profile.description import DeviceDescription
+from device_profile.novation import palette
+from device_profile.novation.launchkey import mini_mk3_layout
+from device_profile.registry import register_profile
 from rum import displays
-from rum.matchers import midi_has
+
+
+# The layout of the device is described in mini_mk3.json and compiled into
+# mini_mk3_layout.py (see device_profile.description).
+_DESCRIPTION = DeviceDescription(mini_mk3_layout.COMPILED)
+_DRUM_PAD_INDEX = _DESCRIPTION.id_map('drum_pads')
 
 
 class MiniMk3:
     # Reference:
     # https://www.kraftmusic.com/media/ownersmanual/Novation_Launchkey_Programmers_Reference_Manual.pdf
-    CMD_PREAMBLE = bytes([
-        0x9F, 0x0C, 0x00,   # Exit DAW mode (defaults to drum layout
-    ])
+    DESCRIPTION = _DESCRIPTION
+
+    # Exit DAW mode (defaults to drum layout)
+    CMD_PREAMBLE = DESCRIPTION.command('preamble')
 
-    SOLID_LED_STATUS_CMD = 0x99
-    BLINK_LED_STATUS_CMD = 0x9B
+    SOLID_LED_STATUS_CMD = DESCRIPTION.led('solid')
+    BLINK_LED_STATUS_CMD = DESCRIPTION.led('blink')
+    LED_ON_COLOR = DESCRIPTION.led('on')
+    LED_OFF_COLOR = DESCRIPTION.led('off')
 
     # Button constants
     # NOTE: You could very well enable DAW mode, switch buttons over to session
@@ -22,37 +35,38 @@ class MiniMk3:
     # to different settings without needing to worry what mode is being
     # displayed. For our simple case, we will just use the drum layout which
     # is the default layout when the keyboard is first powered on.
-    DRUM_PAD_IDS = [[0x28, 0x29, 0x2A, 0x2B, 0x30, 0x31, 0x32, 0x33],
-                    [0x24, 0x25, 0x26, 0x27, 0x2C, 0x2D, 0x2E, 0x2F]]
+    DRUM_PAD_IDS = DESCRIPTION.rows('drum_pads')
 
     # Mapping of the channel index the buttons map to.
-    CHANNEL_MAP = {pad_id: idx for idx, pad_id in
-                   enumerate(DRUM_PAD_IDS[0] + DRUM_PAD_IDS[1])}
+    CHANNEL_MAP = DESCRIPTION.id_map('drum_pads')
 
-    DRUM_PAD_MIDI_CHANNEL = 9   # corresponds to channel 10
+    # corresponds to channel 10
+    DRUM_PAD_MIDI_CHANNEL = DESCRIPTION.channel('drum_pads')
 
     # Various matchers
-    IS_RECORD_BUTTON = midi_has(status_range=(0xB0, 0xBF), data1=0x75)
-    IS_PLAY_BUTTON = midi_has(status_range=(0xB0, 0xBF), data1=0x73)
-    IS_PAGE_UP_BUTTON = midi_has(status_range=(0xB0, 0xBF), data1=0x68)
-    IS_PAGE_DOWN_BUTTON = midi_has(status_range=(0xB0, 0xBF), data1=0x69)
-    IS_DRUM_PAD = midi_has(status_in=[0x89, 0x99], data1_range=(0x24, 0x33))
+    IS_RECORD_BUTTON = DESCRIPTION.matcher('record')
+    IS_PLAY_BUTTON = DESCRIPTION.matcher('play')
+    IS_PAGE_UP_BUTTON = DESCRIPTION.matcher('page_up')
+    IS_PAGE_DOWN_BUTTON = DESCRIPTION.matcher('page_down')
+    IS_DRUM_PAD = DESCRIPTION.matcher('drum_pads')
 
     DRUM_PAD_DOWN_MATCHERS = [
-        [midi_has(status=0x99, data1=pad_id) for pad_id in row_ids]
+        [_DESCRIPTION.matcher('drum_pads', idx=_DRUM_PAD_INDEX[pad_id],
+                              event='down') for pad_id in row_ids]
         for row_ids in DRUM_PAD_IDS
     ]
 
     DRUM_PAD_UP_MATCHERS = [
-        [midi_has(status=0x89, data1=pad_id) for pad_id in row_ids]
+        [_DESCRIPTION.matcher('drum_pads', idx=_DRUM_PAD_INDEX[pad_id],
+                              event='up') for pad_id in row_ids]
         for row_ids in DRUM_PAD_IDS
     ]
 
     # Data1 codes for the encoder.
-    ENCODER_IDS = [0x15, 0x16, 0x17, 0x18, 0x19, 0x1A, 0x1B, 0x1C]
-    ENCODER_MAP = {eid: idx for idx, eid in enumerate(ENCODER_IDS)}
-    ENCODER_MATCHERS = [midi_has(status_range=(0xB0, 0xBF), data1=enc_id)
-                        for enc_id in ENCODER_IDS]
+    ENCODER_IDS = DESCRIPTION.ids('encoders')
+    ENCODER_MAP = DESCRIPTION.id_map('encoders')
+    ENCODER_MATCHERS = [_DESCRIPTION.matcher('encoders', idx=idx)
+                        for idx in range(len(ENCODER_IDS))]
 
     @staticmethod
     def is_encoder(idx):
@@ -60,63 +74,102 @@ class MiniMk3:
         return MiniMk3.ENCODER_MATCHERS[idx]
 
 
+# Header of the sysex used to pass a batch of LED updates between the MIDI and
+# DAW scripts: the non-commercial manufacturer id followed by 'RUM'.
+LED_BATCH_HEADER = bytes([0xF0, 0x7D, 0x52, 0x55, 0x4D])
+# Header of a batch that resends all the LEDs (ends in 'R' instead of 'M').
+LED_REFRESH_HEADER = bytes([0xF0, 0x7D, 0x52, 0x55, 0x52])
+LED_BATCH_END = 0xF7
+
+
+def pack_led_updates(updates, refresh=False):
+    """ Packs LED updates into a single sysex message.
+
+    Each update is packed as 3 data bytes (is_blinking, led_id, color) so that
+    all bytes stay within the 7-bit sysex data range.
+
+    :param updates: list of (led_id, (is_blinking, color)) pairs.
+    :param refresh: set to True if the updates resend all the LEDs (so they
+    can be sent after interactive updates).
+    """
+    header = LED_REFRESH_HEADER if refresh else LED_BATCH_HEADER
+    msg = bytearray(len(header) + 3 * len(updates) + 1)
+    offset = put_bytes(msg, 0, header)
+    for led_id, (is_blinking, color) in updates:
+        offset = put_bytes(msg, offset,
+                           (1 if is_blinking else 0, led_id, color))
+    msg[offset] = LED_BATCH_END
+    return bytes(msg)
+
+
+def unpack_led_updates(sysex):
+    """ Returns the (led_id, (is_blinking, color)) pairs of a packed sysex.
+
+    Returns None if the sysex is not a packed batch of LED updates.
+    """
+    if (sysex is None
+            or not (sysex.startswith(LED_BATCH_HEADER)
+                    or sysex.startswith(LED_REFRESH_HEADER))
+            or (len(sysex) - len(LED_BATCH_HEADER) - 1) % 3 != 0):
+        return None
+    return [(sysex[i + 1], (sysex[i] == 1, sysex[i + 2]))
+            for i in range(len(LED_BATCH_HEADER), len(sysex) - 1, 3)]
+
+
+def is_led_refresh(sysex):
+    """ Returns True if a packed sysex resends all the LEDs. """
+    return sysex is not None and sysex.startswith(LED_REFRESH_HEADER)
+
+
 class MiniMk3MidiCommandBuilder(MidiCommandBuilder):
     """ MIDI Command structure for Novation MiniMk3MidiCommandBuilder. """
     @staticmethod
     def new_command():
         return MiniMk3MidiCommandBuilder()
 
-    def __init__(self):
-        super().__init__()
-        self.param_lights_to_blink = []
-
-    def blinking_light(self, *led_id_color_args):
-        """ Set the lights on the device to blink a given color. """
-        assert len(led_id_color_args) % 2 == 0
-        for i in range(0, len(led_id_color_args), 2):
-            self.param_lights_to_blink.append(
-                (led_id_color_args[i], led_id_color_args[i + 1]))
-        return self
-
     def build(self, daw_mode=True):
-        # Start with the lights
-        cmd = bytes()
-        if (self.param_lights_to_turn_off
-                or self.param_lights_to_turn_on
-                or self.param_lights_to_set_colors
-                or self.param_lights_to_blink):
-
-            if daw_mode:
-                # If not in DAW mode, don't prepend the command pre-amble
-                cmd += MiniMk3.CMD_PREAMBLE
-
-            for led_id in self.param_lights_to_turn_off:
-                cmd += bytes([MiniMk3.SOLID_LED_STATUS_CMD,
-                              led_id,
-                              0x00])
-
-            for led_id in self.param_lights_to_turn_on:
-                cmd += bytes([MiniMk3.SOLID_LED_STATUS_CMD,
-                              led_id,
-                              0x77])
-
-            for led_id, led_value in self.param_lights_to_set_colors:
-                cmd += bytes([MiniMk3.SOLID_LED_STATUS_CMD,
-                              led_id,
-                              led_value])
-
-            for led_id, led_value in self.param_lights_to_blink:
-                cmd += bytes([MiniMk3.BLINK_LED_STATUS_CMD,
-                              led_id,
-                              led_value])
-
-        if self.param_display_updates:
+        # Each light is a 3 byte message, so the command size is known upfront.
+        num_lights = (len(self.param_lights_to_turn_off)
+                      + len(self.param_lights_to_turn_on)
+                      + len(self.param_lights_to_set_colors)
+                      + len(self.param_lights_to_blink))
+        if not num_lights:
             # No display on the Launchkey mini mk3
-            pass
-        return cmd
+            return bytes()
+
+        preamble = MiniMk3.CMD_PREAMBLE if daw_mode else b''
+        cmd = bytearray(len(preamble) + 3 * num_lights)
+        # If not in DAW mode, don't prepend the command pre-amble
+        offset = put_bytes(cmd, 0, preamble)
 
+        for led_id in self.param_lights_to_turn_off:
+            offset = put_bytes(
+                cmd, offset, (MiniMk3.SOLID_LED_STATUS_CMD, led_id,
+                              MiniMk3.LED_OFF_COLOR))
 
+        for led_id in self.param_lights_to_turn_on:
+            offset = put_bytes(
+                cmd, offset, (MiniMk3.SOLID_LED_STATUS_CMD, led_id,
+                              MiniMk3.LED_ON_COLOR))
+
+        for led_id, led_value in self.param_lights_to_set_colors:
+            offset = put_bytes(
+                cmd, offset, (MiniMk3.SOLID_LED_STATUS_CMD, led_id, led_value))
+
+        for led_id, led_value in self.param_lights_to_blink:
+            offset = put_bytes(
+                cmd, offset, (MiniMk3.BLINK_LED_STATUS_CMD, led_id, led_value))
+        return bytes(cmd)
+
+
+@register_profile('novation_launchkey_mini_mk3')
 class MiniMk3DeviceProfile(DeviceProfile):
+    CAPABILITIES = frozenset([NATIVE_BLINK])
+    # Each light is a separate 3 byte note message, so there is no limit on
+    # how many are sent together.
+    MAX_LIGHTS_PER_MESSAGE = None
+    PALETTE = palette.PALETTE
+
     def new_midi_command_builder(self):
         return MiniMk3MidiCommandBuilder()
 
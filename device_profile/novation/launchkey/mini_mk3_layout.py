@@ -0,0 +1,279 @@
+""" Compiled from mini_mk3.json by device_profile.description.
+
+Do not edit. Regenerate after changing the description.
+"""
+COMPILED = {
+    'name': 'novation_launchkey_mini_mk3',
+    'controls': {
+        'drum_pads': {
+            'rows': ((40, 41, 42, 43, 48, 49, 50, 51), (36, 37, 38, 39, 44, 45, 46, 47)),
+            'ids': (40, 41, 42, 43, 48, 49, 50, 51, 36, 37, 38, 39, 44, 45, 46, 47),
+            'statuses': (137, 153),
+            'events': {'down': 153, 'up': 137},
+            'channel': 9,
+        },
+        'encoders': {
+            'rows': ((21, 22, 23, 24, 25, 26, 27, 28),),
+            'ids': (21, 22, 23, 24, 25, 26, 27, 28),
+            'statuses': (176, 177, 178, 179, 180, 181, 182, 183, 184, 185, 186, 187, 188, 189, 190, 191),
+            'events': {},
+            'channel': None,
+        },
+        'page_down': {
+            'rows': ((105,),),
+            'ids': (105,),
+            'statuses': (176, 177, 178, 179, 180, 181, 182, 183, 184, 185, 186, 187, 188, 189, 190, 191),
+            'events': {},
+            'channel': None,
+        },
+        'page_up': {
+            'rows': ((104,),),
+            'ids': (104,),
+            'statuses': (176, 177, 178, 179, 180, 181, 182, 183, 184, 185, 186, 187, 188, 189, 190, 191),
+            'events': {},
+            'channel': None,
+        },
+        'play': {
+            'rows': ((115,),),
+            'ids': (115,),
+            'statuses': (176, 177, 178, 179, 180, 181, 182, 183, 184, 185, 186, 187, 188, 189, 190, 191),
+            'events': {},
+            'channel': None,
+        },
+        'record': {
+            'rows': ((117,),),
+            'ids': (117,),
+            'statuses': (176, 177, 178, 179, 180, 181, 182, 183, 184, 185, 186, 187, 188, 189, 190, 191),
+            'events': {},
+            'channel': None,
+        },
+    },
+    'index': {
+        (137, 36): ('drum_pads', 8),
+        (137, 37): ('drum_pads', 9),
+        (137, 38): ('drum_pads', 10),
+        (137, 39): ('drum_pads', 11),
+        (137, 40): ('drum_pads', 0),
+        (137, 41): ('drum_pads', 1),
+        (137, 42): ('drum_pads', 2),
+        (137, 43): ('drum_pads', 3),
+        (137, 44): ('drum_pads', 12),
+        (137, 45): ('drum_pads', 13),
+        (137, 46): ('drum_pads', 14),
+        (137, 47): ('drum_pads', 15),
+        (137, 48): ('drum_pads', 4),
+        (137, 49): ('drum_pads', 5),
+        (137, 50): ('drum_pads', 6),
+        (137, 51): ('drum_pads', 7),
+        (153, 36): ('drum_pads', 8),
+        (153, 37): ('drum_pads', 9),
+        (153, 38): ('drum_pads', 10),
+        (153, 39): ('drum_pads', 11),
+        (153, 40): ('drum_pads', 0),
+        (153, 41): ('drum_pads', 1),
+        (153, 42): ('drum_pads', 2),
+        (153, 43): ('drum_pads', 3),
+        (153, 44): ('drum_pads', 12),
+        (153, 45): ('drum_pads', 13),
+        (153, 46): ('drum_pads', 14),
+        (153, 47): ('drum_pads', 15),
+        (153, 48): ('drum_pads', 4),
+        (153, 49): ('drum_pads', 5),
+        (153, 50): ('drum_pads', 6),
+        (153, 51): ('drum_pads', 7),
+        (176, 21): ('encoders', 0),
+        (176, 22): ('encoders', 1),
+        (176, 23): ('encoders', 2),
+        (176, 24): ('encoders', 3),
+        (176, 25): ('encoders', 4),
+        (176, 26): ('encoders', 5),
+        (176, 27): ('encoders', 6),
+        (176, 28): ('encoders', 7),
+        (176, 104): ('page_up', 0),
+        (176, 105): ('page_down', 0),
+        (176, 115): ('play', 0),
+        (176, 117): ('record', 0),
+        (177, 21): ('encoders', 0),
+        (177, 22): ('encoders', 1),
+        (177, 23): ('encoders', 2),
+        (177, 24): ('encoders', 3),
+        (177, 25): ('encoders', 4),
+        (177, 26): ('encoders', 5),
+        (177, 27): ('encoders', 6),
+        (177, 28): ('encoders', 7),
+        (177, 104): ('page_up', 0),
+        (177, 105): ('page_down', 0),
+        (177, 115): ('play', 0),
+        (177, 117): ('record', 0),
+        (178, 21): ('encoders', 0),
+        (178, 22): ('encoders', 1),
+        (178, 23): ('encoders', 2),
+        (178, 24): ('encoders', 3),
+        (178, 25): ('encoders', 4),
+        (178, 26): ('encoders', 5),
+        (178, 27): ('encoders', 6),
+        (178, 28): ('encoders', 7),
+        (178, 104): ('page_up', 0),
+        (178, 105): ('page_down', 0),
+        (178, 115): ('play', 0),
+        (178, 117): ('record', 0),
+        (179, 21): ('encoders', 0),
+        (179, 22): ('encoders', 1),
+        (179, 23): ('encoders', 2),
+        (179, 24): ('encoders', 3),
+        (179, 25): ('encoders', 4),
+        (179, 26): ('encoders', 5),
+        (179, 27): ('encoders', 6),
+        (179, 28): ('encoders', 7),
+        (179, 104): ('page_up', 0),
+        (179, 105): ('page_down', 0),
+        (179, 115): ('play', 0),
+        (179, 117): ('record', 0),
+        (180, 21): ('encoders', 0),
+        (180, 22): ('encoders', 1),
+        (180, 23): ('encoders', 2),
+        (180, 24): ('encoders', 3),
+        (180, 25): ('encoders', 4),
+        (180, 26): ('encoders', 5),
+        (180, 27): ('encoders', 6),
+        (180, 28): ('encoders', 7),
+        (180, 104): ('page_up', 0),
+        (180, 105): ('page_down', 0),
+        (180, 115): ('play', 0),
+        (180, 117): ('record', 0),
+        (181, 21): ('encoders', 0),
+        (181, 22): ('encoders', 1),
+        (181, 23): ('encoders', 2),
+        (181, 24): ('encoders', 3),
+        (181, 25): ('encoders', 4),
+        (181, 26): ('encoders', 5),
+        (181, 27): ('encoders', 6),
+        (181, 28): ('encoders', 7),
+        (181, 104): ('page_up', 0),
+        (181, 105): ('page_down', 0),
+        (181, 115): ('play', 0),
+        (181, 117): ('record', 0),
+        (182, 21): ('encoders', 0),
+        (182, 22): ('encoders', 1),
+        (182, 23): ('encoders', 2),
+        (182, 24): ('encoders', 3),
+        (182, 25): ('encoders', 4),
+        (182, 26): ('encoders', 5),
+        (182, 27): ('encoders', 6),
+        (182, 28): ('encoders', 7),
+        (182, 104): ('page_up', 0),
+        (182, 105): ('page_down', 0),
+        (182, 115): ('play', 0),
+        (182, 117): ('record', 0),
+        (183, 21): ('encoders', 0),
+        (183, 22): ('encoders', 1),
+        (183, 23): ('encoders', 2),
+        (183, 24): ('encoders', 3),
+        (183, 25): ('encoders', 4),
+        (183, 26): ('encoders', 5),
+        (183, 27): ('encoders', 6),
+        (183, 28): ('encoders', 7),
+        (183, 104): ('page_up', 0),
+        (183, 105): ('page_down', 0),
+        (183, 115): ('play', 0),
+        (183, 117): ('record', 0),
+        (184, 21): ('encoders', 0),
+        (184, 22): ('encoders', 1),
+        (184, 23): ('encoders', 2),
+        (184, 24): ('encoders', 3),
+        (184, 25): ('encoders', 4),
+        (184, 26): ('encoders', 5),
+        (184, 27): ('encoders', 6),
+        (184, 28): ('encoders', 7),
+        (184, 104): ('page_up', 0),
+        (184, 105): ('page_down', 0),
+        (184, 115): ('play', 0),
+        (184, 117): ('record', 0),
+        (185, 21): ('encoders', 0),
+        (185, 22): ('encoders', 1),
+        (185, 23): ('encoders', 2),
+        (185, 24): ('encoders', 3),
+        (185, 25): ('encoders', 4),
+        (185, 26): ('encoders', 5),
+        (185, 27): ('encoders', 6),
+        (185, 28): ('encoders', 7),
+        (185, 104): ('page_up', 0),
+        (185, 105): ('page_down', 0),
+        (185, 115): ('play', 0),
+        (185, 117): ('record', 0),
+        (186, 21): ('encoders', 0),
+        (186, 22): ('encoders', 1),
+        (186, 23): ('encoders', 2),
+        (186, 24): ('encoders', 3),
+        (186, 25): ('encoders', 4),
+        (186, 26): ('encoders', 5),
+        (186, 27): ('encoders', 6),
+        (186, 28): ('encoders', 7),
+        (186, 104): ('page_up', 0),
+        (186, 105): ('page_down', 0),
+        (186, 115): ('play', 0),
+        (186, 117): ('record', 0),
+        (187, 21): ('encoders', 0),
+        (187, 22): ('encoders', 1),
+        (187, 23): ('encoders', 2),
+        (187, 24): ('encoders', 3),
+        (187, 25): ('encoders', 4),
+        (187, 26): ('encoders', 5),
+        (187, 27): ('encoders', 6),
+        (187, 28): ('encoders', 7),
+        (187, 104): ('page_up', 0),
+        (187, 105): ('page_down', 0),
+        (187, 115): ('play', 0),
+        (187, 117): ('record', 0),
+        (188, 21): ('encoders', 0),
+        (188, 22): ('encoders', 1),
+        (188, 23): ('encoders', 2),
+        (188, 24): ('encoders', 3),
+        (188, 25): ('encoders', 4),
+        (188, 26): ('encoders', 5),
+        (188, 27): ('encoders', 6),
+        (188, 28): ('encoders', 7),
+        (188, 104): ('page_up', 0),
+        (188, 105): ('page_down', 0),
+        (188, 115): ('play', 0),
+        (188, 117): ('record', 0),
+        (189, 21): ('encoders', 0),
+        (189, 22): ('encoders', 1),
+        (189, 23): ('encoders', 2),
+        (189, 24): ('encoders', 3),
+        (189, 25): ('encoders', 4),
+        (189, 26): ('encoders', 5),
+        (189, 27): ('encoders', 6),
+        (189, 28): ('encoders', 7),
+        (189, 104): ('page_up', 0),
+        (189, 105): ('page_down', 0),
+        (189, 115): ('play', 0),
+        (189, 117): ('record', 0),
+        (190, 21): ('encoders', 0),
+        (190, 22): ('encoders', 1),
+        (190, 23): ('encoders', 2),
+        (190, 24): ('encoders', 3),
+        (190, 25): ('encoders', 4),
+        (190, 26): ('encoders', 5),
+        (190, 27): ('encoders', 6),
+        (190, 28): ('encoders', 7),
+        (190, 104): ('page_up', 0),
+        (190, 105): ('page_down', 0),
+        (190, 115): ('play', 0),
+        (190, 117): ('record', 0),
+        (191, 21): ('encoders', 0),
+        (191, 22): ('encoders', 1),
+        (191, 23): ('encoders', 2),
+        (191, 24): ('encoders', 3),
+        (191, 25): ('encoders', 4),
+        (191, 26): ('encoders', 5),
+        (191, 27): ('encoders', 6),
+        (191, 28): ('encoders', 7),
+        (191, 104): ('page_up', 0),
+        (191, 105): ('page_down', 0),
+        (191, 115): ('play', 0),
+        (191, 117): ('record', 0),
+    },
+    'leds': {'solid': 153, 'blink': 155, 'on': 119, 'off': 0},
+    'commands': {'preamble': b'\x9f\x0c\x00'},
+}
@@ -0,0 +1,52 @@
+""" Registry of the device profiles available to device scripts.
+
+Device scripts can look up a profile by name (or by the capabilities they
+need) instead of importing the profile class directly. Profiles register
+themselves with the @register_profile decorator when their module is imported.
+The modules of the known profiles are imported the first time they are
+looked up.
+"""
+
+# Maps profile name to the module that defines (and registers) the profile.
+_PROFILE_MODULES = {
+    'arturia_keylab_mk2': 'device_profile.arturia.keylab',
+    'novation_launchkey_mini_mk3': 'device_profile.novation.launchkey.mini_mk3',
+}
+
+# Maps profile name to the registered DeviceProfile class.
+_profiles = {}
+
+
+def register_profile(name):
+    """ Class decorator that registers a DeviceProfile under a name. """
+    def decorator(profile_cls):
+        _profiles[name] = profile_cls
+        return profile_cls
+    return decorator
+
+
+def get_profile_class(name):
+    """ Returns the DeviceProfile class registered under name (or None). """
+    if name not in _profiles and name in _PROFILE_MODULES:
+        __import__(_PROFILE_MODULES[name])
+    return _profiles.get(name)
+
+
+def new_profile(name, is_daw_port, send_sysex_fn, **kwargs):
+    """ Constructs the DeviceProfile registered under name. """
+    profile_cls = get_profile_class(name)
+    assert profile_cls is not None, 'Unknown device profile: {}'.format(name)
+    return profile_cls(is_daw_port, send_sysex_fn, **kwargs)
+
+
+def profile_names():
+    """ Returns the names of all known profiles. """
+    names = set(_PROFILE_MODULES)
+    names.update(_profiles)
+    return sorted(names)
+
+
+def find_profiles(*capabilities):
+    """ Returns the names of the profiles that have all the capabilities. """
+    return [name for name in profile_names()
+            if set(capabilities).issubset(get_profile_class(name).CAPABILITIES)]
@@ -7,6 +7,8 @@ from rum.midi import MidiMessage
 
 
 _panels = {}
+# Maps LED id to the panel with the light (first registered panel wins).
+_light_index = {}
 
 
 def get_panel(name):
@@ -24,18 +26,45 @@ def new_color_toggle_light(led_id, light_fn, initial=0,
 
 
 def get_light(led_id):
-    for panel in _panels.values():
-        if led_id in panel:
-            return panel[panel.index(led_id)]
-    return None
+    panel = _light_index.get(led_id)
+    if panel is None or panel._lights is None:
+        return None
+    return panel[panel.index(led_id)]
+
+
+def _index_lights(panel):
+    # Drop the lights of the panel replaced by a panel of the same name.
+    replaced = _panels.get(panel._name)
+    if replaced is not None:
+        for led_id in replaced._led_ids:
+            if _light_index.get(led_id) is replaced:
+                del _light_index[led_id]
+    _panels[panel._name] = panel
+    for led_id in panel._led_ids:
+        if led_id not in _light_index:
+            _light_index[led_id] = panel
 
 
 class LightPanel(Panel):
     def __init__(self, name, led_ids, light_fn=None,
-                 refresh_fn=None, initial=0, off_color=0, on_color=0x7F):
+                 refresh_fn=None, initial=0, off_color=0, on_color=0x7F,
+                 shadow: rum.lights.LedShadow = None, resync_fn=None):
+        """ Construct a LightPanel.
+
+        :param shadow: optional LedShadow of what the device LEDs show. When
+        specified, refreshes only resend the lights that do not match it.
+        Only use it when light_fn writes straight to the framebuffer that
+        keeps the shadow (and not e.g. through a compositor layer).
+        :param resync_fn: optional function that forces the device LEDs to be
+        resent (e.g. LedFramebuffer.resync). Needed to resync lights whose
+        values pass through something that drops unchanged values (e.g. a
+        compositor layer).
+        """
         super().__init__()
         self._name = name
         self._lights = None
+        self._shadow = shadow
+        self._resync_fn = resync_fn
 
         if light_fn is not None:
             self._lights = [
@@ -54,7 +83,7 @@ class LightPanel(Panel):
         }
         self._light_fn = light_fn
         self._refresh_fn = refresh_fn
-        _panels[name] = self
+        _index_lights(self)
 
     def _refresh(self, flags):
         if flags & flstudio.REFRESH_CONTROLLER_LEDS == 0:
@@ -64,7 +93,18 @@ class LightPanel(Panel):
         if self._refresh_fn is not None:
             self._refresh_fn
 
-        # Force all lights to refresh
+        # Only refresh the lights the device is not already showing.
+        for led_id, light in zip(self._led_ids, self._lights):
+            if (self._shadow is None
+                    or not self._shadow.matches(led_id, light.get())):
+                light.refresh()
+
+    def resync(self):
+        """ Hard resync of all lights (e.g. after the device reconnects). """
+        if self._resync_fn is not None:
+            self._resync_fn()
+        if self._shadow is not None:
+            self._shadow.resync()
         for light in self._lights:
             light.refresh()
 
@@ -20,7 +20,7 @@ def _play_note(msg: MidiMessage):
             0)
 
 
-_recorder = rum.recorder.Recorder(
+_recorder = rum.recorder.NoteRecorder(
     scheduling.get_scheduler(), playback_fn=_play_note)
 
 
@@ -28,6 +28,23 @@ def get_recorder():
     return _recorder
 
 
+def _current_tempo():
+    # FL Studio reports the tempo multiplied by 1000.
+    return mixer.getCurrentTempo() / 1000
+
+
+def enable_quantization(steps_per_beat=4, strength=1.0, swing=0.0):
+    """ Quantize recorded patterns to the song tempo when recording stops. """
+    _recorder.set_quantizer(rum.recorder.Quantizer(
+        _current_tempo, steps_per_beat=steps_per_beat, strength=strength,
+        swing=swing))
+
+
+def disable_quantization():
+    """ Stop quantizing newly recorded patterns. """
+    _recorder.set_quantizer(None)
+
+
 def get_pattern_id(msg: MidiMessage):
     return msg.status, msg.data1
 
@@ -42,10 +59,11 @@ class RecordPattern(abstract.Panel):
         # Turn on lights related to pattern_id or display.
         pass
     """
-    def __init__(self, start_matcher, output_fn=None):
+    def __init__(self, start_matcher, output_fn=None, overdub=False):
         super().__init__()
         self._start_matcher = start_matcher
         self._output_fn = output_fn
+        self._overdub = overdub
 
     def _refresh(self, flags):
         pattern_id = _recorder.get_recording_pattern_id()
@@ -59,7 +77,7 @@ class RecordPattern(abstract.Panel):
             return
         pattern_id = get_pattern_id(msg)
         if self._start_matcher(msg):
-            _recorder.start_recording(pattern_id)
+            _recorder.start_recording(pattern_id, overdub=self._overdub)
             if self._output_fn is not None:
                 self._output_fn(pattern_id)
             msg.mark_handled()
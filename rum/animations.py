@@ -17,6 +17,10 @@ class BlinkingAnimation(Animation):
 
     If a ColorLight source needs to be blinked, then it needs to be re-defined
     (via a facade/view pattern) as a Light source.
+
+    If the light supports blinking natively on the device, the device is asked
+    to blink the light instead of toggling it on a timer so that no messages
+    are sent while blinking. Otherwise the light is toggled in software.
     """
 
     def __init__(self, light: ToggleLight, scheduler: Scheduler,
@@ -26,6 +30,7 @@ class BlinkingAnimation(Animation):
         self._update_interval_ms = update_interval_ms
         self._animation_task = None
         self._run_animation = False
+        self._native = False
 
     def _toggle_blink(self):
         # Check if animation got stopped.
@@ -44,6 +49,10 @@ class BlinkingAnimation(Animation):
             # Animation already scheduled.
             return
         self._run_animation = True
+        self._native = self._light.set_native_blinking(True)
+        if self._native:
+            # Device blinks the light by itself.
+            return
         self._animation_task = self._scheduler.schedule(
             self._toggle_blink, delay_ms=self._update_interval_ms)
 
@@ -59,10 +68,17 @@ class BlinkingAnimation(Animation):
         if not self._run_animation:
             return
         self._run_animation = False
+        if self._native:
+            self._native = False
+            self._light.set_native_blinking(False)
         if self._animation_task is not None:
             self._scheduler.cancel(self._animation_task)
         self._animation_task = None
 
+    def is_native(self):
+        """ Returns True if the device is blinking the light natively. """
+        return self._native
+
     def reset_animation(self):
         # No-op since blinking just starts off from where last left off.
         pass
@@ -0,0 +1,129 @@
+""" RGB colors and their mapping to the color palettes of devices.
+
+Most devices (e.g. the Novation Launchkey) only take an index into a fixed
+color palette for their LEDs. Scripts can instead use Rgb colors (and compute
+fades in RGB) and the device profile maps them to the nearest palette entry.
+
+The nearest palette entry is looked up in a table over a reduced resolution
+RGB cube. Each cell of the cube is computed the first time it is used, so
+there is no nearest neighbor search per frame and no upfront cost to build
+the whole table at script init.
+"""
+
+
+class Rgb(tuple):
+    """ An RGB color with 8-bit red, green and blue channels. """
+    def __new__(cls, r, g, b):
+        assert 0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255
+        return tuple.__new__(cls, (r, g, b))
+
+    @staticmethod
+    def from_hex(value):
+        """ Returns the Rgb of a 24-bit integer (e.g. 0xFF8000). """
+        return Rgb((value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF)
+
+    @property
+    def r(self):
+        return self[0]
+
+    @property
+    def g(self):
+        return self[1]
+
+    @property
+    def b(self):
+        return self[2]
+
+    def blend(self, other, amount):
+        """ Returns the color amount (0.0-1.0) of the way towards other. """
+        return Rgb(int(round(self[0] + (other[0] - self[0]) * amount)),
+                   int(round(self[1] + (other[1] - self[1]) * amount)),
+                   int(round(self[2] + (other[2] - self[2]) * amount)))
+
+    def scale(self, brightness):
+        """ Returns the color with its brightness scaled (0.0-1.0). """
+        return Rgb(int(round(self[0] * brightness)),
+                   int(round(self[1] * brightness)),
+                   int(round(self[2] * brightness)))
+
+    def __bool__(self):
+        return self != BLACK
+
+    def __repr__(self):
+        return 'Rgb(0x{:02X}, 0x{:02X}, 0x{:02X})'.format(*self)
+
+
+BLACK = Rgb(0, 0, 0)
+WHITE = Rgb(255, 255, 255)
+RED = Rgb(255, 0, 0)
+ORANGE = Rgb(255, 128, 0)
+YELLOW = Rgb(255, 255, 0)
+GREEN = Rgb(0, 255, 0)
+CYAN = Rgb(0, 255, 255)
+BLUE = Rgb(0, 0, 255)
+MAGENTA = Rgb(255, 0, 255)
+
+# Marks a cell of the lookup table that was not computed yet.
+_UNSET = 0xFF
+
+
+class Palette:
+    """ Maps Rgb colors to the nearest entry of a device color palette. """
+    def __init__(self, entries, bits=4):
+        """ Construct a Palette.
+
+        :param entries: the (r, g, b) color of each palette index.
+        :param bits: bits per channel of the lookup table (the table has
+        2^(3 * bits) cells).
+        """
+        assert len(entries) < _UNSET
+        self._entries = tuple(entries)
+        self._bits = bits
+        self._shift = 8 - bits
+        # Value at the center of each cell for a channel.
+        self._levels = [(i << self._shift) + ((1 << self._shift) >> 1)
+                        for i in range(1 << bits)]
+        self._table = bytearray([_UNSET]) * (1 << (3 * bits))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, idx):
+        return self._entries[idx]
+
+    def nearest(self, rgb):
+        """ Returns the palette index nearest to the color (full search). """
+        r, g, b = rgb
+        best_idx = 0
+        best_distance = None
+        for idx, (pr, pg, pb) in enumerate(self._entries):
+            distance = (pr - r) ** 2 + (pg - g) ** 2 + (pb - b) ** 2
+            if best_distance is None or distance < best_distance:
+                best_idx, best_distance = idx, distance
+        return best_idx
+
+    def index(self, rgb):
+        """ Returns the palette index of a color from the lookup table. """
+        shift = self._shift
+        r, g, b = rgb[0] >> shift, rgb[1] >> shift, rgb[2] >> shift
+        cell = (((r << self._bits) | g) << self._bits) | b
+        idx = self._table[cell]
+        if idx == _UNSET:
+            levels = self._levels
+            idx = self.nearest((levels[r], levels[g], levels[b]))
+            self._table[cell] = idx
+        return idx
+
+
+# Maps palette entries to their Palette so each table is only built once.
+_palettes = {}
+
+
+def get_palette(entries):
+    """ Returns the shared Palette of the palette entries. """
+    entries = tuple(entries)
+    palette = _palettes.get(entries)
+    if palette is None:
+        palette = Palette(entries)
+        _palettes[entries] = palette
+    return palette
@@ -0,0 +1,173 @@
+""" Composites ordered layers of LED colors into the colors shown on a device.
+
+Instead of animations, status updates and overlays all writing to the same
+lights, each writes to its own layer. A layer is a sparse map of led -> color
+and the color shown for a led is the color of the top-most visible layer that
+has one (or the background color). Only the leds whose layers changed are
+recomputed when the compositor is flattened.
+"""
+from rum.lights import ToggleLight
+
+
+class Layer:
+    """ Sparse map of led -> color composited over the layers below it. """
+    def __init__(self, compositor: 'Compositor', name):
+        self._compositor = compositor
+        self._name = name
+        self._colors = {}
+        self._visible = True
+
+    def name(self):
+        return self._name
+
+    def set(self, led_id, color):
+        """ Sets the color of the led in this layer. """
+        if led_id in self._colors and self._colors[led_id] == color:
+            return
+        self._colors[led_id] = color
+        if self._visible:
+            self._compositor.invalidate(led_id)
+
+    def get(self, led_id, default=None):
+        """ Returns the color of the led in this layer. """
+        return self._colors.get(led_id, default)
+
+    def clear(self, led_id=None):
+        """ Makes the led (or all leds if None) transparent in this layer. """
+        if led_id is None:
+            led_ids = list(self._colors)
+            self._colors.clear()
+        elif led_id in self._colors:
+            led_ids = [led_id]
+            del self._colors[led_id]
+        else:
+            return
+        if self._visible:
+            for led_id in led_ids:
+                self._compositor.invalidate(led_id)
+
+    def set_visible(self, visible):
+        """ Shows or hides the layer without losing its colors. """
+        if visible == self._visible:
+            return
+        self._visible = visible
+        for led_id in self._colors:
+            self._compositor.invalidate(led_id)
+
+    def is_visible(self):
+        return self._visible
+
+    def light(self, led_id, on_color):
+        """ Returns a ToggleLight that turns the led on/off in this layer. """
+        return LayerLight(self, led_id, on_color)
+
+    def __contains__(self, led_id):
+        return led_id in self._colors
+
+    def __repr__(self):
+        return '[Layer {}: {}]'.format(self._name, self._colors)
+
+
+class LayerLight(ToggleLight):
+    """ Adapts a led of a layer to a ToggleLight (e.g. for animations).
+
+    Turning the light on sets the on color in the layer while turning it off
+    makes the led transparent so the layers below show through.
+    """
+    def __init__(self, layer: Layer, led_id, on_color):
+        self._layer = layer
+        self._led_id = led_id
+        self._on_color = on_color
+
+    def __bool__(self):
+        return self._led_id in self._layer
+
+    def toggle(self, bool_value=None):
+        if bool_value is None:
+            bool_value = not self
+        if bool_value:
+            self._layer.set(self._led_id, self._on_color)
+        else:
+            self._layer.clear(self._led_id)
+        return bool_value
+
+    def get(self):
+        return self._layer.get(self._led_id)
+
+    def set(self, value, force_update=False):
+        self._layer.set(self._led_id, value)
+
+    def set_on_color(self, on_color):
+        self._on_color = on_color
+        if self:
+            self._layer.set(self._led_id, on_color)
+        return self
+
+    def __repr__(self):
+        return '[LayerLight {}: {}]'.format(self._led_id, self.get())
+
+
+class Compositor:
+    """ Flattens ordered layers into the frame of led colors to output.
+
+    Layers are stacked in the order they are added (the first layer is the
+    bottom). Call flatten() once per tick (e.g. from the flush manager before
+    the LED framebuffer is flushed) to output the leds whose color changed.
+    """
+    def __init__(self, output_fn=None, background=0):
+        """ Construct a Compositor.
+
+        :param output_fn: function taking (led_id, color) called for every
+        led whose flattened color changed (e.g. LedFramebuffer.set).
+        :param background: color of leds that no layer sets.
+        """
+        self._output_fn = output_fn
+        self._background = background
+        self._layers = []
+        self._layer_map = {}
+        # Flattened color of each led as last output.
+        self._frame = {}
+        # Leds whose flattened color needs to be recomputed (ordered set).
+        self._dirty = {}
+
+    def add_layer(self, name):
+        """ Adds a new layer on top of the existing layers and returns it. """
+        assert name not in self._layer_map
+        layer = Layer(self, name)
+        self._layers.append(layer)
+        self._layer_map[name] = layer
+        return layer
+
+    def layer(self, name):
+        """ Returns the layer with the specified name. """
+        return self._layer_map[name]
+
+    def invalidate(self, led_id):
+        """ Mark the led to be recomputed on the next flatten. """
+        self._dirty[led_id] = True
+
+    def color(self, led_id):
+        """ Returns the flattened color of the led. """
+        for layer in reversed(self._layers):
+            if layer.is_visible() and led_id in layer:
+                return layer.get(led_id)
+        return self._background
+
+    def flatten(self):
+        """ Outputs the leds whose flattened color changed.
+
+        Returns the list of (led_id, color) pairs that changed.
+        """
+        if not self._dirty:
+            return []
+        changes = []
+        for led_id in self._dirty:
+            color = self.color(led_id)
+            if led_id not in self._frame or self._frame[led_id] != color:
+                self._frame[led_id] = color
+                changes.append((led_id, color))
+        self._dirty.clear()
+        if self._output_fn is not None:
+            for led_id, color in changes:
+                self._output_fn(led_id, color)
+        return changes
@@ -48,6 +48,9 @@ class BlinkableLight(Blinkable, ToggleLight):
             self._blink_animation.stop_animation()
         self._light.set(value, force_update=force_update)
 
+    def set_native_blinking(self, enabled):
+        return self._light.set_native_blinking(enabled)
+
     def start_blinking(self):
         self._blink_animation.start_animation()
 
@@ -3,7 +3,7 @@ from rum import processor
 from rum import registry
 
 
-def button(name, on_matcher, off_matcher):
+def button(name, on_matcher, off_matcher, port=None):
     """ Triggers the function when either the on or off matchers match.
 
     The state of the buttons can be retrieved from registry.button_down.
@@ -13,6 +13,8 @@ def button(name, on_matcher, off_matcher):
     represents the button being pressed.
     :param off_matcher: matcher function that returns True if the midi message
     represents the button being released.
+    :param port: only trigger for messages from this MIDI port (default: any
+    port).
     """
     def decorate(function):
         # Register the function with a default active processor.
@@ -26,14 +28,14 @@ def button(name, on_matcher, off_matcher):
                 del registry.button_down[name]
             function(m, False)
 
-        (processor.get_processor()
+        (processor.get_processor(port)
          .add(processor.when(on_matcher).then(fn_on))
          .add(processor.when(off_matcher).then(fn_off)))
         return function
     return decorate
 
 
-def encoder(name, matcher_fn, infinite=False):
+def encoder(name, matcher_fn, infinite=False, port=None):
     """ Triggers the function when either the on or off matchers match.
 
     :param name: the name of the encoder.
@@ -41,6 +43,8 @@ def encoder(name, matcher_fn, infinite=False):
     and returns True if the message corresponds to an encoder update.
     :param infinite: specify True if this is an infinite encoder (and thus,
     the values produced are incremental)
+    :param port: only trigger for messages from this MIDI port (default: any
+    port).
     """
     def decorate(function):
         # Register the function with a default active processor.
@@ -48,18 +52,20 @@ def encoder(name, matcher_fn, infinite=False):
             value = midi.get_encoded_value(m, incremental=infinite)
             registry.encoders[name] = value
             function(m, value)
-        (processor.get_processor()
+        (processor.get_processor(port)
          .add(processor.when(matcher_fn).then(fn_update)))
         return function
     return decorate
 
 
-def slider(name, matcher_fn):
+def slider(name, matcher_fn, port=None):
     """ Triggers the function when the value matches.
 
     :param name: the name of the slider
     :param matcher_fn: matcher function that takes an input MidiMessage
     and returns True if the message corresponds to a slider update.
+    :param port: only trigger for messages from this MIDI port (default: any
+    port).
     """
     def decorate(function):
         # Register the function with a default active processor.
@@ -68,13 +74,13 @@ def slider(name, matcher_fn):
             registry.sliders[name] = value
             function(m, value)
 
-        (processor.get_processor()
+        (processor.get_processor(port)
          .add(processor.when(matcher_fn).then(fn_update)))
         return function
     return decorate
 
 
-def trigger_when(*var_matchers):
+def trigger_when(*var_matchers, port=None):
     """ Register the function this is decorating with the midi processor.
 
     An example usage of this annotation is as follows:
@@ -94,10 +100,12 @@ def trigger_when(*var_matchers):
 
     :param var_matchers:  a variable list of matchers to midi messages that
     returns True if the trigger condition is met or False if not.
+    :param port: only trigger for messages from this MIDI port (default: any
+    port).
     """
     def decorate(function):
         # Register the function with a default active processor.
-        processor.get_processor().add(
+        processor.get_processor(port).add(
             processor.when(*var_matchers).then(function))
         return function
 
@@ -17,23 +17,126 @@ class Display:
         """ Returns the height (number of lines) of the display. """
         raise NotImplementedError()
 
-    def push(self):
-        """ Push the contents in this instance to the actual hardware. """
+    def push(self, force=False):
+        """ Push the contents in this instance to the actual hardware.
+
+        Displays only push the contents that changed since the last push. Set
+        force to True to push all contents regardless (e.g. to resync a device
+        that was reconnected).
+        """
+        raise NotImplementedError()
+
+    def is_dirty(self):
+        """ Returns True if there are changes that have not been pushed. """
         raise NotImplementedError()
 
+    def root(self):
+        """ Returns the physical display that this display renders to. """
+        return self
+
     def __len__(self): raise NotImplementedError()
     def __setitem__(self, key, value): raise NotImplementedError()
     def __getitem__(self, item): raise NotImplementedError()
     def __repr__(self): raise NotImplementedError()
 
 
+class DisplayLine:
+    """ Row (or a range of columns of a row) of a display framebuffer.
+
+    A DisplayLine is a window into the bytearray holding the display contents
+    and behaves like a list of chars. Assigning to it writes the ASCII encoded
+    chars directly into the framebuffer, and device command builders can copy
+    the raw bytes (see line_bytes) into outgoing sysex without joining or
+    encoding the text.
+    """
+    def __init__(self, view: memoryview):
+        self._view = view
+
+    def view(self, start, end):
+        """ Returns a DisplayLine for the columns [start, end) of the line.
+
+        The returned line shares the framebuffer with this line.
+        """
+        return DisplayLine(self._view[start:end])
+
+    def buffer(self):
+        """ Returns the memoryview of the framebuffer bytes of the line. """
+        return self._view
+
+    def __len__(self):
+        return len(self._view)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [chr(b) for b in self._view[key]]
+        return chr(self._view[key])
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            target = self._view[key]
+            target[:] = _fit(_encode(value), len(target))
+        else:
+            self._view[key] = _encode(value)[0]
+
+    def __iter__(self):
+        return (chr(b) for b in self._view)
+
+    def __eq__(self, other):
+        if isinstance(other, DisplayLine):
+            return self._view == other._view
+        if isinstance(other, str):
+            return str(self) == other
+        return list(self) == other
+
+    __hash__ = None
+
+    def __str__(self):
+        return self._view.tobytes().decode('ascii')
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+def _encode(value):
+    """ Returns the ASCII bytes of a str, list of chars or DisplayLine. """
+    if isinstance(value, DisplayLine):
+        return value.buffer()
+    if not isinstance(value, str):
+        value = ''.join(value)
+    return value.encode('ascii', 'replace')
+
+
+def _fit(data, width):
+    """ Truncate or pad (with spaces) the bytes to the given width. """
+    if len(data) == width:
+        return data
+    if len(data) > width:
+        return data[:width]
+    return bytes(data) + b' ' * (width - len(data))
+
+
+def line_bytes(line):
+    """ Returns the ASCII bytes of a display line.
+
+    For lines of a DirectDisplay this is a memoryview of the framebuffer so
+    device command builders can copy it directly into a command.
+
+    :param line: DisplayLine, str or list of chars.
+    """
+    return _encode(line)
+
+
 class DirectDisplay(Display):
     """ Basic simple display that maintains a set of chars to display.
 
     DirectDisplay simply holds the line contents that will be displayed on
-    the LCD screen represented. These are represented as arrays of arrays of
-    chars. The display also offers a push method to sync to a destination
-    buffer.
+    the LCD screen represented. The contents are held in a single bytearray
+    framebuffer with each line represented by a DisplayLine window into it.
+    The display also offers a push method to sync to a destination buffer.
+
+    The display keeps a copy of the contents as they were last pushed. This is
+    used to skip pushes when nothing changed and to only send the regions of
+    the lines that changed.
     """
     class Builder:
         def __init__(self):
@@ -41,6 +144,7 @@ class DirectDisplay(Display):
             self._num_lines = 2
             self._line_width = 16
             self._push_fn = None
+            self._push_changes_fn = None
 
         def set_lines(self, num_lines):
             """ Specify number of lines the display supports (default: 2). """
@@ -56,25 +160,46 @@ class DirectDisplay(Display):
             """ Specify function for pushing display text to the actual display.
 
             :param push_fn: function that takes a list of lines to display. Each
-            line is a list of characters with exactly the specified number of
-            chars that fit the display. The function is resposible for pushing
-            the character lines to the display. If None is specified (default),
+            line is a DisplayLine with exactly the specified number of chars
+            that fit the display. The function is resposible for pushing the
+            character lines to the display. If None is specified (default),
             push calls are dropped. """
             self._push_fn = push_fn
             return self
 
+        def push_changes_with(self, push_changes_fn):
+            """ Specify function for pushing only the changed display regions.
+
+            :param push_changes_fn: function that takes a list of changed
+            regions. Each region is a tuple (line_index, start_col, chars)
+            where chars is the DisplayLine of characters that changed on the
+            line starting at start_col. The chars share the display buffer so
+            they are only valid for the duration of the call. This can be
+            specified together with or instead of push_with.
+            """
+            self._push_changes_fn = push_changes_fn
+            return self
+
         def build(self):
             """ Constructs a DirectDisplay with the specified parameters. """
             return DirectDisplay(self._num_lines,
                                  self._line_width,
-                                 push_fn=self._push_fn)
+                                 push_fn=self._push_fn,
+                                 push_changes_fn=self._push_changes_fn)
 
-    def __init__(self, num_lines, chars_per_line, push_fn=None):
+    def __init__(self, num_lines, chars_per_line, push_fn=None,
+                 push_changes_fn=None):
         self._num_lines = num_lines
         self._num_chars = chars_per_line
-        self._lines = [[' ' for _ in range(self._num_chars)]
-                       for _ in range(num_lines)]
+        self._buffer = bytearray(b' ' * (num_lines * chars_per_line))
+        view = memoryview(self._buffer)
+        self._lines = [
+            DisplayLine(view[i * chars_per_line:(i + 1) * chars_per_line])
+            for i in range(num_lines)]
         self._push_fn = push_fn
+        self._push_changes_fn = push_changes_fn
+        # Copy of the framebuffer as last pushed (None if never pushed).
+        self._pushed_buffer = None
 
     def __len__(self):
         return self._num_lines
@@ -83,16 +208,14 @@ class DirectDisplay(Display):
         return self._lines[key]
 
     def __setitem__(self, key, value):
-        self._lines[key][:] = self._fix_width(value)
+        self._lines[key][:] = value
 
     def __repr__(self):
-        return '\n'.join([''.join(arr) for arr in self._lines])
+        return '\n'.join([str(line) for line in self._lines])
 
-    def _fix_width(self, line):
-        """ Fix the limit (either truncate or pad) to self._num_chars. """
-        padding = ' ' * self._num_chars
-        line += padding
-        return line[:self._num_chars]
+    def buffer(self):
+        """ Returns a memoryview of the framebuffer (lines back to back). """
+        return memoryview(self._buffer)
 
     def height(self):
         """ Returns the number of lines in the display. """
@@ -102,11 +225,50 @@ class DirectDisplay(Display):
         """ Returns the number of characters per line in the display. """
         return self._num_chars
 
-    def push(self):
-        """ Push the buffer contents into the display. """
-        if self._push_fn is None:
+    def _changed_regions(self):
+        """ Returns the (line_index, start_col, chars) spans not pushed. """
+        regions = []
+        width = self._num_chars
+        for idx, line in enumerate(self._lines):
+            offset = idx * width
+            if (self._buffer[offset:offset + width]
+                    == self._pushed_buffer[offset:offset + width]):
+                continue
+            start = offset
+            while self._buffer[start] == self._pushed_buffer[start]:
+                start += 1
+            end = offset + width
+            while self._buffer[end - 1] == self._pushed_buffer[end - 1]:
+                end -= 1
+            regions.append((idx, start - offset,
+                            line.view(start - offset, end - offset)))
+        return regions
+
+    def is_dirty(self):
+        """ Returns True if the lines changed since the last push. """
+        return (self._pushed_buffer is None
+                or self._buffer != self._pushed_buffer)
+
+    def push(self, force=False):
+        """ Push the buffer contents that changed into the display.
+
+        The push is skipped if nothing changed since the last push.
+
+        :param force: set to True to push all lines even if they didn't change.
+        """
+        if self._push_fn is None and self._push_changes_fn is None:
             return
-        self._push_fn(self._lines)
+        if force or self._pushed_buffer is None:
+            regions = [(idx, 0, line) for idx, line in enumerate(self._lines)]
+        else:
+            regions = self._changed_regions()
+            if not regions:
+                return
+        self._pushed_buffer = bytearray(self._buffer)
+        if self._push_fn is not None:
+            self._push_fn(self._lines)
+        if self._push_changes_fn is not None:
+            self._push_changes_fn(regions)
 
 
 class DisplayWindow(Display):
@@ -169,10 +331,10 @@ class DisplayWindow(Display):
         return self._line_range[1] - self._line_range[0]
 
     def __getitem__(self, key):
-        return self._get_line(key)[self._char_range[0]:self._char_range[-1]]
+        return self._get_line(key).view(*self._char_range)
 
     def __setitem__(self, key, value):
-        self._get_line(key)[self._char_range[0]:self._char_range[-1]] = self._fix_width(value)
+        self[key][:] = value
 
     def __repr__(self):
         lines = [''.join(self._get_line(i)) for i in range(*self._line_range)]
@@ -182,13 +344,6 @@ class DisplayWindow(Display):
         base_idx = self._line_range[0] if idx >= 0 else self._line_range[1]
         return self._display[base_idx + idx]
 
-    def _fix_width(self, line):
-        """ Fix the limit (either truncate or pad) to self._num_chars. """
-        num_chars = self._char_range[1] - self._char_range[0]
-        padding = ' ' * num_chars
-        line += padding
-        return line[:num_chars]
-
     def height(self):
         """ Returns the number of lines the window represents. """
         return len(self)
@@ -197,9 +352,15 @@ class DisplayWindow(Display):
         """ Returns the number of chars per line that the window represents. """
         return self._char_range[1] - self._char_range[0]
 
-    def push(self):
+    def push(self, force=False):
         """ Trigger a push to render the text in the underlying display. """
-        self._display.push()
+        self._display.push(force=force)
+
+    def is_dirty(self):
+        return self._display.is_dirty()
+
+    def root(self):
+        return self._display.root()
 
 
 class ScrollingDisplay(Display):
@@ -214,15 +375,42 @@ class ScrollingDisplay(Display):
                  scheduler: Scheduler,
                  scroll_interval_ms=250,
                  scroll_amount=1,
-                 padding=2):
+                 padding=2,
+                 render_loop: 'RenderLoop' = None,
+                 marquee_cache: 'MarqueeCache' = None):
+        """ Construct a ScrollingDisplay.
+
+        :param display: the display to scroll the lines of.
+        :param scheduler: scheduler used to time the scrolling.
+        :param scroll_interval_ms: time between scroll steps.
+        :param scroll_amount: number of chars to scroll per step.
+        :param padding: number of spaces between the end and start of a line.
+        :param render_loop: optional RenderLoop to advance the scrolling lines
+        on. When specified, the lines are stepped on the loop's shared tick
+        and the loop pushes the changes. Otherwise each scrolling line
+        schedules its own steps and pushing is left to the caller.
+        :param marquee_cache: cache of scrolling frames to use (defaults to
+        the cache shared by all scrolling displays).
+        """
+        if marquee_cache is None:
+            marquee_cache = _marquee_cache
+        self._marquee_cache = marquee_cache
         self._display = display
         self._scheduler = scheduler
         self._scroll_interval_ms = scroll_interval_ms
         self._scroll_amount = scroll_amount
         self._padding = padding
         self._lines = ['' for _ in range(self._display.height())]
-        self._offset_map = {i: 0 for i in range(self._display.height())}
+        # Maps a line to its scrolling frames and the index of the next frame.
+        self._frames = {}
+        self._frame_idx = {i: 0 for i in range(self._display.height())}
         self._scrolling = set()
+        self._render_loop = render_loop
+        # Maps a scrolling line to the time of its next scroll step when
+        # scrolling on a render loop.
+        self._next_scroll_ms = {}
+        if render_loop is not None:
+            render_loop.add(self)
 
     def __len__(self):
         return len(self._display)
@@ -232,29 +420,62 @@ class ScrollingDisplay(Display):
 
     def __setitem__(self, idx, value):
         # Reset the scroll if user requests to set the value.
-        self._offset_map[idx] = 0
+        self._frame_idx[idx] = 0
         self._lines[idx] = value
-        if idx not in self._scrolling:
+        self._frames[idx] = None
+        if len(value) > self._display.width():
+            self._frames[idx] = self._marquee_cache.frames(
+                value, self._display.width(), self._padding,
+                self._scroll_amount)
+        if self._render_loop is not None:
+            self._render_line(idx)
+            self._next_scroll_ms[idx] = (self._scheduler.time_ms() +
+                                         self._scroll_interval_ms)
+            self._render_loop.request_push(self)
+        elif idx not in self._scrolling:
             # Don't start another scrolling thread if line is already scrolling.
             self._update_display(idx)
 
+    def advance(self, now_ms):
+        """ Step the scrolling lines that are due when on a render loop.
+
+        :param now_ms: the current time in milliseconds.
+        :return: True if any line was updated.
+        """
+        updated = False
+        for idx in list(self._scrolling):
+            if now_ms >= self._next_scroll_ms[idx]:
+                self._render_line(idx)
+                self._next_scroll_ms[idx] = now_ms + self._scroll_interval_ms
+                updated = True
+        return updated
+
+    def is_animating(self):
+        """ Returns True if any line is scrolling. """
+        return bool(self._scrolling)
+
     def _update_display(self, idx):
-        if len(self._lines[idx]) <= self._display.width():
+        if self._render_line(idx):
+            self._scheduler.schedule(lambda: self._update_display(idx),
+                                     delay_ms=self._scroll_interval_ms)
+
+    def _render_line(self, idx):
+        """ Write the current frame of the line and step its scroll offset.
+
+        :return: True if the line is scrolling.
+        """
+        frames = self._frames[idx]
+        if frames is None:
             # Text fits on display. No need to scroll.
             self._scrolling.discard(idx)
             self._display[idx] = self._lines[idx]
-            return
+            return False
 
-        padded_line = '{}{}'.format(self._lines[idx], " " * self._padding)
-        offset = self._offset_map[idx]
-        wrap_len = offset + self._display.width() - len(padded_line)
-        wrap_str = padded_line[:wrap_len] if wrap_len > 0 else ''
-        self._display[idx] = '{}{}'.format(padded_line[offset:], wrap_str)
-        self._offset_map[idx] += self._scroll_amount
-        self._offset_map[idx] %= len(padded_line)
+        frame_idx = self._frame_idx[idx]
+        self._display[idx] = frames[frame_idx]
+        self._frame_idx[idx] = (frame_idx + 1) % len(frames)
         self._scrolling.add(idx)
-        self._scheduler.schedule(lambda: self._update_display(idx),
-                                 delay_ms=self._scroll_interval_ms)
+        return True
 
     def width(self):
         return self._display.width()
@@ -262,8 +483,156 @@ class ScrollingDisplay(Display):
     def height(self):
         return self._display.height()
 
-    def push(self):
-        return self._display.push()
+    def push(self, force=False):
+        return self._display.push(force=force)
+
+    def is_dirty(self):
+        return self._display.is_dirty()
+
+    def root(self):
+        return self._display.root()
+
+
+class MarqueeCache:
+    """ Least recently used cache of precomputed scrolling text frames.
+
+    Scrolling a line of text cycles through a fixed set of display-width
+    frames. These are computed once when a line is set and shared between all
+    displays showing the same text, so scrolling only needs to step through
+    the frames.
+    """
+    def __init__(self, max_entries=32):
+        self._max_entries = max_entries
+        # Maps (text, width, padding, scroll_amount) to the tuple of frames.
+        # Dicts keep insertion order so the first key is least recently used.
+        self._frames = {}
+
+    def frames(self, text, width, padding, scroll_amount):
+        """ Returns the tuple of frames to cycle through to scroll the text.
+
+        :param text: the text to scroll (longer than width).
+        :param width: the number of chars per frame.
+        :param padding: number of spaces between the end and start of the text.
+        :param scroll_amount: number of chars to scroll per frame.
+        """
+        key = (text, width, padding, scroll_amount)
+        frames = self._frames.pop(key, None)
+        if frames is None:
+            frames = self._build_frames(text, width, padding, scroll_amount)
+            while len(self._frames) >= self._max_entries:
+                del self._frames[next(iter(self._frames))]
+        self._frames[key] = frames
+        return frames
+
+    def clear(self):
+        """ Remove all cached frames. """
+        self._frames.clear()
+
+    def __len__(self):
+        return len(self._frames)
+
+    @staticmethod
+    def _build_frames(text, width, padding, scroll_amount):
+        padded_line = '{}{}'.format(text, ' ' * padding)
+        # Two copies of the line are enough to slice any wrapped frame.
+        repeated_line = padded_line * (width // len(padded_line) + 2)
+        frames = []
+        offset = 0
+        while True:
+            frames.append(repeated_line[offset:offset + width])
+            offset = (offset + scroll_amount) % len(padded_line)
+            if offset == 0:
+                return tuple(frames)
+
+
+_marquee_cache = MarqueeCache()
+
+
+def get_marquee_cache():
+    """ Returns the marquee cache shared by scrolling displays. """
+    return _marquee_cache
+
+
+class RenderLoop:
+    """ Shared render clock that animates displays and coalesces pushes.
+
+    Animated displays (e.g. ScrollingDisplays created with this loop) are all
+    advanced on a single scheduled tick instead of scheduling their own
+    tasks. All writes made during a tick result in at most one push per
+    physical display, and pushes to each physical display are limited to a
+    maximum frame rate so the display traffic stays bounded regardless of how
+    many windows are animating. The loop only ticks while there is something
+    to animate or push.
+    """
+    def __init__(self, scheduler: Scheduler, tick_ms=50, max_fps=20):
+        """ Construct a RenderLoop.
+
+        :param scheduler: scheduler to run the ticks on.
+        :param tick_ms: time between ticks (default: 50ms).
+        :param max_fps: default maximum number of pushes per second to a
+        physical display (default: 20).
+        """
+        self._scheduler = scheduler
+        self._tick_ms = tick_ms
+        self._max_fps = max_fps
+        self._animations = []
+        # Maps a physical display to its maximum frame rate.
+        self._max_fps_map = {}
+        # Maps a physical display to the time of its last push.
+        self._last_push_ms = {}
+        # Physical displays waiting to be pushed (dict used as ordered set).
+        self._pending = {}
+        self._tick_task = None
+
+    def add(self, animation):
+        """ Add a display to animate on each tick.
+
+        The display must implement advance(now_ms), returning True if it
+        wrote anything, is_animating() and root() returning the display to
+        push.
+        """
+        self._animations.append(animation)
+        self._start()
+
+    def remove(self, animation):
+        """ Stop animating the display. """
+        if animation in self._animations:
+            self._animations.remove(animation)
+
+    def set_max_fps(self, display: Display, max_fps):
+        """ Limit the pushes per second to the display's physical display. """
+        self._max_fps_map[display.root()] = max_fps
+
+    def request_push(self, display: Display):
+        """ Push the display's physical display on the next available frame. """
+        self._pending[display.root()] = None
+        self._start()
+
+    def _start(self):
+        if self._tick_task is None:
+            self._tick_task = self._scheduler.schedule(
+                self._tick, delay_ms=self._tick_ms)
+
+    def _tick(self):
+        self._tick_task = None
+        now_ms = self._scheduler.time_ms()
+        for animation in self._animations:
+            if animation.advance(now_ms):
+                self._pending[animation.root()] = None
+
+        for display in list(self._pending.keys()):
+            max_fps = self._max_fps_map.get(display, self._max_fps)
+            last_ms = self._last_push_ms.get(display)
+            if last_ms is not None and now_ms - last_ms < 1000.0 / max_fps:
+                # Too soon for another frame. Try again on a later tick.
+                continue
+            del self._pending[display]
+            self._last_push_ms[display] = now_ms
+            display.push()
+
+        if self._pending or any(animation.is_animating()
+                                for animation in self._animations):
+            self._start()
 
 
 class PagedDisplay(Display):
@@ -272,6 +641,10 @@ class PagedDisplay(Display):
         self._scheduler = scheduler
         self._active_page = ''
         self._page_map = {}
+        # Maps page key to the function that renders the page lines.
+        self._renderer_map = {}
+        # Pages with a renderer whose cached lines are out of date.
+        self._dirty_pages = set()
         self._temporary_page = None
         self._reset_task = None
 
@@ -320,9 +693,7 @@ class PagedDisplay(Display):
             self._reset_task = self._scheduler.schedule(
                 self._on_page_expired, delay_ms=expiration_ms)
 
-        for i in range(len(self._display)):
-            self._display[i] = self._page_map[key][i]
-
+        self._show_page(key)
         if push:
             self.push()
 
@@ -341,8 +712,7 @@ class PagedDisplay(Display):
             self._reset_task = None
 
         self._temporary_page = None
-        for i in range(len(self._display)):
-            self._display[i] = self._page_map[self._active_page][i]
+        self._show_page(self._active_page)
 
         # Also force the underlying display to update
         if push:
@@ -360,8 +730,62 @@ class PagedDisplay(Display):
         if key not in self._page_map:
             self._page_map[key] = [[' ' * self.width()]
                                    for _ in range(self.height())]
+        if key in self._dirty_pages:
+            self._render_page(key)
         return self._page_map[key]
 
+    def set_page_renderer(self, key, render_fn):
+        """ Specify a function that renders the lines of a page.
+
+        The function is only called when the page is displayed (or fetched)
+        and its lines are out of date, so pages that are not visible cost
+        nothing to maintain. The rendered lines are cached until the page is
+        invalidated.
+
+        :param key: name of the page to render.
+        :param render_fn: function that takes no arguments and returns the
+        list of lines of the page. Set to None to remove the renderer and keep
+        the last rendered lines.
+        """
+        if render_fn is None:
+            self._renderer_map.pop(key, None)
+            self._dirty_pages.discard(key)
+            return
+        self._renderer_map[key] = render_fn
+        self.invalidate(key)
+
+    def invalidate(self, key, push=True):
+        """ Mark the rendered lines of a page as out of date.
+
+        If the page is currently displayed, it is rendered again right away.
+        Otherwise it is rendered the next time it is displayed.
+
+        :param key: name of the page to invalidate.
+        :param push: whether to push the text to hardware if the page is
+        displayed (default: True)
+        """
+        if key not in self._renderer_map:
+            return
+        self._dirty_pages.add(key)
+        if key == self._get_page_key_displayed():
+            self._show_page(key)
+            if push:
+                self.push()
+
+    def _render_page(self, key):
+        """ Renders the lines of a page into the page cache. """
+        self._dirty_pages.discard(key)
+        lines = self._renderer_map[key]()
+        page = self.page(key)
+        for i in range(self.height()):
+            page[i] = lines[i] if i < len(lines) else ''
+
+    def _show_page(self, key):
+        """ Copies the lines of a page into the underlying display. """
+        lines = self.page(key)
+        for i in range(len(self._display)):
+            self._display[i] = lines[i]
+
     def page_keys(self):
         """ Returns all page names. """
         return self._page_map.keys()
@@ -372,5 +796,11 @@ class PagedDisplay(Display):
     def height(self):
         return self._display.height()
 
-    def push(self):
-        return self._display.push()
+    def push(self, force=False):
+        return self._display.push(force=force)
+
+    def is_dirty(self):
+        return self._display.is_dirty()
+
+    def root(self):
+        return self._display.root()
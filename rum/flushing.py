@@ -0,0 +1,34 @@
+""" Flushes buffered device output at the end of each dispatch cycle. """
+
+
+class FlushManager:
+    """ Maintains list of flush tasks to run when flush is called.
+
+    Output that is buffered during a midi dispatch or idle cycle (e.g. LED
+    framebuffers) registers a flush function here so that the buffered
+    changes are sent once the cycle completes.
+    """
+
+    def __init__(self):
+        self._listeners = []
+
+    def flush(self):
+        for fn in self._listeners:
+            fn()
+
+    def add(self, listener):
+        self._listeners.append(listener)
+
+    def remove(self, listener):
+        self._listeners.remove(listener)
+
+    def clear(self):
+        self._listeners.clear()
+        return self
+
+
+_flusher = FlushManager()
+
+
+def get_flush_manager():
+    return _flusher
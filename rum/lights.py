@@ -16,6 +16,14 @@ class ToggleLight(Light):
     """ Interface for a light source that can be toggled on the device. """
     def toggle(self, bool_value=None): raise NotImplementedError
 
+    def set_native_blinking(self, enabled):
+        """ Make the device blink the light by itself (without any traffic).
+
+        Returns False if the light does not support blinking natively, in
+        which case blinking needs to be animated in software.
+        """
+        return False
+
 
 class OnOffLight(ToggleLight):
     """ Controls a light on the device that can be toggled on/off. """
@@ -71,9 +79,10 @@ class ColorLight(Light):
     Colors can be represented as an RGB color with 24 bits of the 32-bit integer
     holding the red, green, blue channel information. Colors can also be
     specially coded by an enumeration like value where different values map to
-    a preset color. This class does not distinguish between the two and simply
-    provides an integer value that the user can set. The provided update
-    function (which is device dependent) will provide this implementation.
+    a preset color or be a colors.Rgb value. This class does not distinguish
+    between them and simply provides a value that the user can set. The
+    provided update function (which is device dependent) will provide this
+    implementation.
     """
     def __init__(self, update_fn=None, initial=0):
         self._color = initial
@@ -99,23 +108,42 @@ class ColorLight(Light):
                 self._update_fn(color)
 
     def __bool__(self):
-        return self._color != 0
+        return bool(self._color)
 
     def __repr__(self):
-        return '[ColorLight: 0x{:02X}]'.format(self._color)
+        if isinstance(self._color, int):
+            return '[ColorLight: 0x{:02X}]'.format(self._color)
+        return '[ColorLight: {!r}]'.format(self._color)
 
 
 class ColorToggleLight(ToggleLight):
     """ Adapts a ColorLight so that it behaves as a toggle light. """
 
-    def __init__(self, light: Light, off_color=0, on_color=0x7F):
+    def __init__(self, light: Light, off_color=0, on_color=0x7F,
+                 blink_fn=None):
+        """ Construct a ColorToggleLight.
+
+        :param blink_fn: optional function that takes a color and makes the
+        device blink the light in that color natively. If None, the light
+        does not support native blinking.
+        """
         self._light = light
         self._off_color = off_color
         self._on_color = on_color
+        self._blink_fn = blink_fn
+        # Whether the device is blinking the light natively.
+        self._native_blinking = False
 
     def __bool__(self):
         return self._light.get() != self._off_color
 
+    def _keep_blinking(self):
+        # Writing the light sends its solid color, which would stop the device
+        # from blinking. Ask for the blink again after the write (LED
+        # framebuffers only send the last value written in a cycle).
+        if self._native_blinking:
+            self._blink_fn(self._on_color)
+
     def toggle(self, bool_value=None):
         if bool_value is None:
             if self._light.get() == self._off_color:
@@ -125,6 +153,7 @@ class ColorToggleLight(ToggleLight):
         else:
             self._light.set(self._on_color if bool_value
                             else self._off_color)
+        self._keep_blinking()
         return self._light.get() != self._off_color
 
     def get(self):
@@ -132,17 +161,136 @@ class ColorToggleLight(ToggleLight):
 
     def set(self, value, force_update=False):
         self._light.set(value, force_update=force_update)
+        self._keep_blinking()
         return self
 
+    def set_native_blinking(self, enabled):
+        if self._blink_fn is None:
+            return False
+        self._native_blinking = enabled
+        if enabled:
+            self._blink_fn(self._on_color)
+        else:
+            # Restore the solid color of the light.
+            self._light.set(self._light.get(), force_update=True)
+        return True
+
+    def is_native_blinking(self):
+        """ Returns True if the device is blinking the light natively. """
+        return self._native_blinking
+
     def set_off_color(self, off_color):
         self._off_color = off_color
         return self
 
     def set_on_color(self, on_color):
         self._on_color = on_color
+        self._keep_blinking()
         return self
 
     def __repr__(self):
         return ('[ColorToggleLight: {} | {}]'.format(
             "ON" if bool(self) else "OFF",
             self._light))
+
+
+class LedShadow:
+    """ Model of what the device LEDs are showing, as last transmitted.
+
+    Comparing the desired light values against the shadow allows refreshes to
+    only send the LEDs that do not match what the device is already showing.
+    LEDs that were never transmitted (or after a resync) never match.
+    """
+    def __init__(self):
+        self._values = {}
+
+    def get(self, led_id, default=None):
+        """ Returns the value last transmitted for the LED. """
+        return self._values.get(led_id, default)
+
+    def matches(self, led_id, value):
+        """ Returns True if the device is known to show value on the LED. """
+        return led_id in self._values and self._values[led_id] == value
+
+    def update(self, led_id, value):
+        """ Record that the value was transmitted to the LED. """
+        self._values[led_id] = value
+
+    def resync(self):
+        """ Forget the device state (e.g. after the device reconnects).
+
+        Every LED is considered mismatched until it is transmitted again.
+        """
+        self._values.clear()
+
+    def __contains__(self, led_id):
+        return led_id in self._values
+
+    def __len__(self):
+        return len(self._values)
+
+
+class LedFramebuffer:
+    """ Buffers LED values of a device so they can be sent in one command.
+
+    Lights write their values into the framebuffer instead of sending a
+    command for every change. When flushed (e.g. at the end of each midi
+    dispatch or idle cycle), the LEDs whose value does not match the shadow of
+    the device state are passed to the flush function in a single call so
+    that they can be combined into one command.
+    """
+    def __init__(self, flush_fn=None, shadow: LedShadow = None):
+        """ Construct a LedFramebuffer.
+
+        :param flush_fn: function that takes a list of (led_id, value) pairs
+        of the LEDs that need to be sent.
+        :param shadow: the LedShadow tracking what the device shows. Can be
+        shared with panels that refresh their lights against it (default:
+        a new shadow).
+        """
+        self._flush_fn = flush_fn
+        self._shadow = LedShadow() if shadow is None else shadow
+        self._values = {}
+        # LEDs written since the last flush (dict used as an ordered set).
+        self._dirty = {}
+
+    def set(self, led_id, value):
+        """ Sets the value of the LED to send on the next flush. """
+        self._values[led_id] = value
+        self._dirty[led_id] = True
+
+    def get(self, led_id, default=None):
+        """ Returns the latest value set for the LED. """
+        return self._values.get(led_id, default)
+
+    def shadow(self):
+        """ Returns the shadow of the device LED state. """
+        return self._shadow
+
+    def resync(self):
+        """ Hard resync: resend every LED on the next flush. """
+        self._shadow.resync()
+        for led_id in self._values:
+            self._dirty[led_id] = True
+
+    def is_dirty(self):
+        """ Returns True if LEDs were written since the last flush. """
+        return bool(self._dirty)
+
+    def flush(self):
+        """ Sends the LEDs that do not match the device shadow.
+
+        Returns the list of (led_id, value) pairs that were sent.
+        """
+        if not self._dirty:
+            return []
+        changes = []
+        for led_id in self._dirty:
+            value = self._values[led_id]
+            if not self._shadow.matches(led_id, value):
+                self._shadow.update(led_id, value)
+                changes.append((led_id, value))
+        self._dirty.clear()
+        if changes and self._flush_fn is not None:
+            self._flush_fn(changes)
+        return changes
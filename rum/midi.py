@@ -27,12 +27,14 @@ class Midi:
 
 class MidiMessage:
     """ Container for MIDI note and basic parsing functions. """
-    def __init__(self, status, data1, data2, time_fn=None):
+    def __init__(self, status, data1, data2, time_fn=None, port=None):
         if time_fn is None:
             time_fn = time.monotonic
         self.status = status
         self.data1 = data1
         self.data2 = data2
+        # MIDI port the message was received from (None if unknown).
+        self.port = port
 
         self.handled = False
         self.timestamp_ms = int(time_fn() * 1000)
@@ -52,6 +54,21 @@ class MidiMessage:
         self.handled = True
         return self
 
+    def copy(self, status=None, data1=None, data2=None):
+        """ Returns a copy of the message with the given fields replaced.
+
+        The copy keeps the timestamp of this message and shares its userdata.
+        """
+        msg = MidiMessage.__new__(MidiMessage)
+        msg.status = self.status if status is None else status
+        msg.data1 = self.data1 if data1 is None else data1
+        msg.data2 = self.data2 if data2 is None else data2
+        msg.port = self.port
+        msg.handled = False
+        msg.timestamp_ms = self.timestamp_ms
+        msg.userdata = self.userdata
+        return msg
+
     def __bytes__(self):
         return bytes((self.status, self.data1, self.data2))
 
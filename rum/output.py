@@ -0,0 +1,140 @@
+""" Paces the messages sent to a device port to the available MIDI bandwidth. """
+import itertools
+
+from rum import scheduling
+
+# Priorities of queued messages (lower values are sent first).
+# Feedback to a user action (e.g. a pad or encoder LED).
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 1
+# Bulk updates (e.g. full refreshes or display rewrites).
+PRIORITY_BULK = 2
+
+# Number of bits sent over the wire per byte (start + 8 data + stop bits).
+BITS_PER_BYTE = 10
+
+
+class OutputQueue:
+    """ Queue of messages to a device port paced to the port bandwidth.
+
+    Sending many messages at once (e.g. a full pad refresh together with a
+    display rewrite) can overflow the buffer of the device and cause updates
+    to be dropped. Messages are queued instead and service() (registered with
+    the flush manager) transmits them as fast as the bandwidth allows.
+
+    Messages are sent in order of priority and then in the order they were
+    queued. A message can be given a key identifying what it updates (e.g. an
+    LED or a display line). Queuing a message with the same key as a pending
+    message drops the pending message since it is superseded. Only use
+    different priorities for messages that update different targets so that a
+    newer update is never overtaken by an older one.
+    """
+    def __init__(self, send_fn, baud_rate=31250, buffer_bytes=64,
+                 scheduler: scheduling.Scheduler = None):
+        """ Construct an OutputQueue.
+
+        :param send_fn: function that transmits a message to the device.
+        :param baud_rate: bandwidth of the port in bits per second (default:
+        31250 which is the MIDI DIN baud rate).
+        :param buffer_bytes: number of bytes the device can buffer. Messages
+        are sent while the bytes not yet transmitted fit in the buffer.
+        :param scheduler: scheduler used for the current time (defaults to
+        the global scheduler).
+        """
+        self._send_fn = send_fn
+        self._buffer_bytes = buffer_bytes
+        self._scheduler = scheduler
+        self._bytes_per_ms = 0
+        self.set_baud_rate(baud_rate)
+        # Queues for each priority mapping key to message. Dicts keep the
+        # insertion order so the first key is the oldest message.
+        self._queues = [{}, {}, {}]
+        # Maps key to the priority queue the keyed message is in.
+        self._key_priority = {}
+        self._counter = itertools.count()
+        # Bytes sent that have not been transmitted over the wire yet.
+        self._backlog_bytes = 0
+        self._backlog_time_ms = None
+
+    def _time_ms(self):
+        scheduler = self._scheduler
+        if scheduler is None:
+            scheduler = scheduling.get_scheduler()
+        return scheduler.time_ms()
+
+    def set_baud_rate(self, baud_rate):
+        """ Sets the bandwidth of the port in bits per second. """
+        self._bytes_per_ms = baud_rate / BITS_PER_BYTE / 1000
+
+    def send(self, msg, priority=PRIORITY_NORMAL, key=None):
+        """ Queues a message to send to the device.
+
+        :param msg: the bytes of the message.
+        :param priority: one of PRIORITY_INTERACTIVE, PRIORITY_NORMAL or
+        PRIORITY_BULK.
+        :param key: optional key of what the message updates. A pending
+        message with the same key is dropped.
+        """
+        if key is None:
+            # Unkeyed messages never supersede each other.
+            key = (OutputQueue, next(self._counter))
+        elif key in self._key_priority:
+            del self._queues[self._key_priority[key]][key]
+        self._queues[priority][key] = msg
+        self._key_priority[key] = priority
+
+    def _drain(self, now_ms):
+        """ Removes the bytes transmitted since the last check. """
+        if self._backlog_time_ms is not None:
+            elapsed_ms = now_ms - self._backlog_time_ms
+            self._backlog_bytes = max(
+                0, self._backlog_bytes - elapsed_ms * self._bytes_per_ms)
+        self._backlog_time_ms = now_ms
+
+    def service(self):
+        """ Transmits the queued messages that the bandwidth allows.
+
+        Returns the number of messages sent.
+        """
+        if not self._key_priority:
+            return 0
+        self._drain(self._time_ms())
+        count = 0
+        for queue in self._queues:
+            while queue:
+                key = next(iter(queue))
+                msg = queue[key]
+                if (self._backlog_bytes > 0 and
+                        self._backlog_bytes + len(msg) > self._buffer_bytes):
+                    # Wait until the device had time to process the backlog.
+                    return count
+                del queue[key]
+                del self._key_priority[key]
+                self._backlog_bytes += len(msg)
+                self._send_fn(msg)
+                count += 1
+        return count
+
+    def discard(self, key):
+        """ Drops the pending message with the key (if any). """
+        if key in self._key_priority:
+            del self._queues[self._key_priority.pop(key)][key]
+
+    def is_pending(self, key):
+        """ Returns True if a message with the key is waiting to be sent. """
+        return key in self._key_priority
+
+    def clear(self):
+        """ Drops all pending messages.
+
+        Anything that tracks the device state from the queued messages (e.g.
+        the shadow of an LED framebuffer, which is updated when a message is
+        queued) no longer matches the device and needs to be resynced (see
+        DeviceProfile.clear_output).
+        """
+        for queue in self._queues:
+            queue.clear()
+        self._key_priority.clear()
+
+    def __len__(self):
+        return len(self._key_priority)
@@ -0,0 +1,147 @@
+""" Grid of pad LEDs addressed by (x, y) coordinates. """
+from array import array
+
+
+class PadGrid:
+    """ Fixed size 2D array of pad LED colors.
+
+    The colors are held in an array('B') (one byte per pad, row by row) so
+    that full grid patterns (e.g. step sequencer views or meters) are a few
+    array writes. A flush diffs the grid row by row against what was last
+    flushed and passes only the changed pads to the flush function in a
+    single call so they are sent as one command.
+
+    The pads of a grid should not also be driven by other lights since the
+    grid only tracks what it sent itself.
+    """
+    def __init__(self, led_ids, flush_fn=None, initial=0):
+        """ Construct a PadGrid.
+
+        :param led_ids: the rows of LED ids of the pads (top row first).
+        :param flush_fn: function that takes a list of (led_id, color) pairs
+        of the pads that changed.
+        :param initial: the initial color of all the pads.
+        """
+        self._height = len(led_ids)
+        self._width = len(led_ids[0]) if led_ids else 0
+        assert all(len(row) == self._width for row in led_ids)
+        self._led_ids = tuple(led_id for row in led_ids for led_id in row)
+        self._coords = {led_id: (idx % self._width, idx // self._width)
+                        for idx, led_id in enumerate(self._led_ids)}
+        self._flush_fn = flush_fn
+        self._colors = array('B', [initial]) * len(self._led_ids)
+        # Colors as last flushed (None if the device state is unknown).
+        self._flushed = None
+
+    def width(self):
+        """ Returns the number of pads per row. """
+        return self._width
+
+    def height(self):
+        """ Returns the number of rows. """
+        return self._height
+
+    def __len__(self):
+        return len(self._led_ids)
+
+    def __contains__(self, led_id):
+        return led_id in self._coords
+
+    def led_id(self, x, y):
+        """ Returns the LED id of the pad at (x, y). """
+        return self._led_ids[y * self._width + x]
+
+    def coord(self, led_id):
+        """ Returns the (x, y) of the pad with the LED id (None if absent). """
+        return self._coords.get(led_id)
+
+    def get(self, x, y):
+        """ Returns the color of the pad at (x, y). """
+        return self._colors[y * self._width + x]
+
+    def set(self, x, y, color):
+        """ Sets the color of the pad at (x, y). """
+        self._colors[y * self._width + x] = color
+
+    def get_led(self, led_id):
+        """ Returns the color of the pad with the LED id. """
+        x, y = self._coords[led_id]
+        return self.get(x, y)
+
+    def set_led(self, led_id, color):
+        """ Sets the color of the pad with the LED id. """
+        x, y = self._coords[led_id]
+        self.set(x, y, color)
+
+    def get_row(self, y):
+        """ Returns a copy of the colors of a row. """
+        start = y * self._width
+        return self._colors[start:start + self._width]
+
+    def set_row(self, y, colors):
+        """ Sets the colors of a row (extra colors are dropped). """
+        self.blit([colors], 0, y)
+
+    def fill(self, color):
+        """ Sets all the pads to the color. """
+        self._colors[:] = array('B', [color]) * len(self._colors)
+
+    def clear(self):
+        """ Turns all the pads off. """
+        self.fill(0)
+
+    def blit(self, rows, x=0, y=0):
+        """ Copies a 2D block of colors into the grid.
+
+        The block is clipped to the grid.
+
+        :param rows: sequence of rows of colors (e.g. lists, bytes or arrays).
+        :param x: column the left of the block is copied to.
+        :param y: row the top of the block is copied to.
+        """
+        for row_idx, row in enumerate(rows):
+            dst_y = y + row_idx
+            if dst_y < 0:
+                continue
+            if dst_y >= self._height:
+                break
+            src_start = max(0, -x)
+            dst_x = max(0, x)
+            count = min(len(row) - src_start, self._width - dst_x)
+            if count <= 0:
+                continue
+            start = dst_y * self._width + dst_x
+            self._colors[start:start + count] = array(
+                'B', row[src_start:src_start + count])
+
+    def is_dirty(self):
+        """ Returns True if pads changed since the last flush. """
+        return self._flushed is None or self._colors != self._flushed
+
+    def resync(self):
+        """ Hard resync: resend every pad on the next flush. """
+        self._flushed = None
+
+    def flush(self):
+        """ Sends the pads that changed since the last flush.
+
+        Returns the list of (led_id, color) pairs that were sent.
+        """
+        colors = self._colors
+        flushed = self._flushed
+        if flushed is None:
+            changes = list(zip(self._led_ids, colors))
+        else:
+            changes = []
+            width = self._width
+            for start in range(0, len(colors), width):
+                end = start + width
+                if colors[start:end] == flushed[start:end]:
+                    continue
+                for idx in range(start, end):
+                    if colors[idx] != flushed[idx]:
+                        changes.append((self._led_ids[idx], colors[idx]))
+        self._flushed = array('B', colors)
+        if changes and self._flush_fn is not None:
+            self._flush_fn(changes)
+        return changes
@@ -8,9 +8,16 @@ class MidiProcessor:
     MidiProcessor is a convenience structure that receives a single midi message
     and dispatches it to multiple end points. These dispatch functions can
     have built-in conditions that drop or transmit the message to its end point.
+
+    Process functions for the messages of a single MIDI port are added to the
+    sub-processor returned by port(). Messages are routed to the sub-processor
+    of their port after the process functions shared by all ports, so a script
+    can serve several controllers without each function checking the port.
     """
     def __init__(self):
         self._processors = []
+        # Maps port number to the sub-processor for messages from that port.
+        self._port_processors = {}
 
     def add(self, *var_processor_fns):
         """ Add processor function to trigger when a midi message is processed.
@@ -33,23 +40,42 @@ class MidiProcessor:
             self._processors.append(fn)
         return self
 
+    def port(self, port):
+        """ Returns the sub-processor of the messages from the MIDI port. """
+        if port not in self._port_processors:
+            self._port_processors[port] = MidiProcessor()
+        return self._port_processors[port]
+
     def clear(self):
         """ Clears all processors. """
         self._processors.clear()
+        self._port_processors.clear()
 
     def process(self, message: MidiMessage):
-        """ Process midi message by sending it to all processor functions. """
+        """ Process midi message by sending it to all processor functions.
+
+        The message is then processed by the sub-processor of its port (if
+        one exists).
+        """
         for p in self._processors:
             p(message)
+        if message.port in self._port_processors:
+            self._port_processors[message.port].process(message)
         return self
 
 
 _active_processor = MidiProcessor()
 
 
-def get_processor():
-    """ Returns the singleton processor. """
-    return _active_processor
+def get_processor(port=None):
+    """ Returns the singleton processor.
+
+    :param port: if specified, returns the sub-processor of the singleton
+    processor for the messages from this MIDI port.
+    """
+    if port is None:
+        return _active_processor
+    return _active_processor.port(port)
 
 
 class When:
@@ -1,4 +1,339 @@
 from rum import scheduling
+from rum.midi import Midi, MidiMessage
+
+try:
+    import numpy
+except ImportError:
+    # NumPy is not available in every DAW's python environment. Quantization
+    # falls back to plain python math when it is missing.
+    numpy = None
+
+
+class Quantizer:
+    """ Snaps the timing of a recorded pattern to a tempo derived grid.
+
+    The grid is computed from the current tempo at the time quantize is called
+    and is divided into a number of steps per beat (e.g. 4 steps per beat
+    corresponds to 1/16 notes in 4/4). The strength controls how far events are
+    pulled towards the nearest grid step (1.0 snaps exactly, 0.0 leaves the
+    timing untouched) and swing delays every odd grid step by a fraction of a
+    step.
+    """
+    def __init__(self, tempo_fn, steps_per_beat=4, strength=1.0, swing=0.0):
+        """ Construct a Quantizer.
+
+        :param tempo_fn: function that returns the current tempo in beats per
+        minute.
+        :param steps_per_beat: number of grid steps per beat (default: 4).
+        :param strength: amount between 0.0 and 1.0 to pull events towards the
+        grid (default: 1.0).
+        :param swing: fraction of a grid step between 0.0 and 1.0 (exclusive)
+        to delay odd grid steps by (default: 0.0).
+        """
+        assert steps_per_beat > 0
+        assert 0.0 <= strength <= 1.0
+        assert 0.0 <= swing < 1.0
+        self._tempo_fn = tempo_fn
+        self._steps_per_beat = steps_per_beat
+        self._strength = strength
+        self._swing = swing
+
+    def grid_ms(self):
+        """ Returns the duration of a single grid step in milliseconds. """
+        return 60000.0 / self._tempo_fn() / self._steps_per_beat
+
+    def quantize(self, pattern):
+        """ Returns a quantized copy of the pattern.
+
+        The pattern is a list of (timestamp_ms, data) tuples sorted by time.
+        Offsets are computed relative to the first event so the first event
+        always stays in place. Note offs of MidiMessage notes are not snapped
+        themselves but moved by the same amount as the note on they end, so
+        notes keep their length (short notes don't collapse to nothing).
+        """
+        if not pattern:
+            return []
+        base_ms = pattern[0][0]
+        grid_ms = self.grid_ms()
+        if numpy is not None:
+            offsets = numpy.array([t - base_ms for t, _ in pattern],
+                                  dtype=float)
+            steps = numpy.rint(offsets / grid_ms)
+            targets = steps * grid_ms + (steps % 2) * self._swing * grid_ms
+            offsets += self._strength * (targets - offsets)
+            offsets = numpy.rint(offsets).astype(int).tolist()
+        else:
+            offsets = [self._quantize_offset(t - base_ms, grid_ms)
+                       for t, _ in pattern]
+        quantized = []
+        # Maps a note's table index to the shifts of its open note ons.
+        shifts = {}
+        for offset, (timestamp_ms, data) in zip(offsets, pattern):
+            if isinstance(data, MidiMessage):
+                if _is_note_on(data):
+                    shifts.setdefault(_note_index(data), []).append(
+                        base_ms + offset - timestamp_ms)
+                elif _is_note_off(data) and shifts.get(_note_index(data)):
+                    offset = (timestamp_ms - base_ms
+                              + shifts[_note_index(data)].pop(0))
+            quantized.append((base_ms + offset, data))
+        # Moved note offs can pass later events.
+        quantized.sort(key=_event_time)
+        return quantized
+
+    def _quantize_offset(self, offset_ms, grid_ms):
+        step = round(offset_ms / grid_ms)
+        target_ms = step * grid_ms + (step % 2) * self._swing * grid_ms
+        return int(round(offset_ms + self._strength * (target_ms - offset_ms)))
+
+
+class Transform:
+    """ A single stage of a PatternView.
+
+    Transforms are applied lazily to each event as it is emitted during
+    playback, so the recorded pattern is never copied. A stage receives an
+    iterable of data events and yields zero or more (possibly new) data
+    events, which lets stages be chained together like generators. A stage can
+    also change the delay of events, which is applied when the pattern (or
+    each loop of it) is scheduled.
+
+    Stages can be enabled/disabled at any time, including while the pattern
+    is playing.
+    """
+    def __init__(self):
+        self.enabled = True
+
+    def delay(self, delay_ms):
+        """ Returns the delay (relative to pattern start) to play an event. """
+        return delay_ms
+
+    def apply(self, events):
+        """ Yields the events to emit for the incoming events. """
+        return events
+
+
+class MapTransform(Transform):
+    """ Replaces each event with the result of a function. """
+    def __init__(self, map_fn):
+        super().__init__()
+        self._map_fn = map_fn
+
+    def apply(self, events):
+        for event in events:
+            yield self._map_fn(event)
+
+
+class FilterTransform(Transform):
+    """ Only emits the events for which the predicate returns True. """
+    def __init__(self, predicate_fn):
+        super().__init__()
+        self._predicate_fn = predicate_fn
+
+    def apply(self, events):
+        for event in events:
+            if self._predicate_fn(event):
+                yield event
+
+
+class StretchTransform(Transform):
+    """ Scales the timing of the pattern by a factor (2.0 = half speed). """
+    def __init__(self, factor):
+        super().__init__()
+        assert factor > 0
+        self._factor = factor
+
+    def delay(self, delay_ms):
+        return delay_ms * self._factor
+
+
+class PatternView:
+    """ Lazy view of a recorded pattern with a chain of transforms.
+
+    A view refers to a pattern by its id and can be played by the recorder
+    like any other pattern. Many views of a single recording can coexist
+    without using any additional memory for the events.
+    """
+    def __init__(self, pattern_id, transforms=()):
+        self.pattern_id = pattern_id
+        self._transforms = list(transforms)
+        # Maps note index to the note ons emitted for each sounding note on,
+        # oldest first.
+        self._sounding = {}
+
+    def add(self, *transforms):
+        """ Append transforms to the end of the chain. """
+        self._transforms.extend(transforms)
+        return self
+
+    def transforms(self):
+        """ Returns the list of transforms in the order they are applied. """
+        return self._transforms
+
+    def delay(self, delay_ms):
+        """ Returns the delay of an event after applying enabled transforms. """
+        for transform in self._transforms:
+            if transform.enabled:
+                delay_ms = transform.delay(delay_ms)
+        return delay_ms
+
+    def emit(self, data):
+        """ Returns an iterable over the events to emit for the data.
+
+        A note off ends the notes its note on was turned into, so that toggling
+        a transform while a note sounds doesn't leave it stuck.
+        """
+        if isinstance(data, MidiMessage) and _is_note_off(data):
+            note_ons = self._sounding.get(_note_index(data))
+            if note_ons:
+                return [data.copy(
+                    status=data.get_masked_status() | note_on.get_channel(),
+                    data1=note_on.data1) for note_on in note_ons.pop(0)]
+        events = (data,)
+        for transform in self._transforms:
+            if transform.enabled:
+                events = transform.apply(events)
+        if isinstance(data, MidiMessage) and _is_note_on(data):
+            events = list(events)
+            self._sounding.setdefault(_note_index(data), []).append(
+                [e for e in events
+                 if isinstance(e, MidiMessage) and _is_note_on(e)])
+        return events
+
+    def reset(self):
+        """ Forgets the sounding notes, e.g. after they have been released. """
+        self._sounding.clear()
+
+
+def _is_note(msg: MidiMessage):
+    return msg.get_masked_status() in (Midi.STATUS_NOTE_ON,
+                                       Midi.STATUS_NOTE_OFF,
+                                       Midi.STATUS_POLYPHONIC_KEY_PRESSURE)
+
+
+class TransposeTransform(Transform):
+    """ Transposes the notes of recorded MidiMessages by some semitones.
+
+    Notes that would fall outside of the valid midi note range are dropped.
+    """
+    def __init__(self, semitones):
+        super().__init__()
+        self._semitones = semitones
+
+    def apply(self, events):
+        for msg in events:
+            if not _is_note(msg):
+                yield msg
+                continue
+            note = msg.data1 + self._semitones
+            if 0 <= note <= 0x7F:
+                yield msg.copy(data1=note)
+
+
+def transpose(semitones):
+    """ Returns a transform that transposes recorded MidiMessage notes. """
+    return TransposeTransform(semitones)
+
+
+def scale_velocity(factor):
+    """ Returns a transform that scales the velocity of recorded note ons. """
+    def _scale(msg: MidiMessage):
+        if (msg.get_masked_status() != Midi.STATUS_NOTE_ON or
+                msg.data2 == 0):
+            return msg
+        # Never scale a note on down to 0 since that is a note off.
+        return msg.copy(data2=max(1, min(0x7F, int(msg.data2 * factor))))
+    return MapTransform(_scale)
+
+
+def only_channels(*channels):
+    """ Returns a transform that drops MidiMessages on other channels. """
+    return FilterTransform(lambda msg: msg.get_channel() in channels)
+
+
+def stretch(factor):
+    """ Returns a transform that stretches the timing of a pattern. """
+    return StretchTransform(factor)
+
+
+class RingBuffer:
+    """ Fixed capacity FIFO buffer that overwrites its oldest items when full.
+
+    If no capacity is specified, the buffer grows as needed and only behaves
+    as a FIFO queue with cheap removal of the oldest items.
+    """
+    def __init__(self, capacity=None):
+        assert capacity is None or capacity > 0
+        self._capacity = capacity
+        self._items = [None] * (capacity if capacity is not None else 8)
+        self._start = 0
+        self._size = 0
+
+    def append(self, item):
+        """ Add an item, dropping the oldest item if the buffer is full. """
+        if self._size == len(self._items):
+            if self._capacity is not None:
+                self._items[self._start] = item
+                self._start = (self._start + 1) % len(self._items)
+                return
+            # Unbounded buffer. Grow it.
+            self._items = self.to_list() + [None] * len(self._items)
+            self._start = 0
+        self._items[(self._start + self._size) % len(self._items)] = item
+        self._size += 1
+
+    def popleft(self):
+        """ Remove and return the oldest item. """
+        assert self._size > 0
+        item = self._items[self._start]
+        self._items[self._start] = None
+        self._start = (self._start + 1) % len(self._items)
+        self._size -= 1
+        return item
+
+    def to_list(self):
+        """ Returns a list of the items from oldest to newest. """
+        end = self._start + self._size
+        if end <= len(self._items):
+            return self._items[self._start:end]
+        return (self._items[self._start:] +
+                self._items[:end - len(self._items)])
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += self._size
+        if not 0 <= idx < self._size:
+            raise IndexError('RingBuffer index out of range')
+        return self._items[(self._start + idx) % len(self._items)]
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __len__(self):
+        return self._size
+
+
+def _merge_sorted(pattern, events):
+    """ Merge two lists of (timestamp_ms, data) sorted by time.
+
+    This is a single streaming pass over both lists. For equal timestamps,
+    events from pattern are kept before events from events.
+    """
+    merged = []
+    i = j = 0
+    while i < len(pattern) and j < len(events):
+        if events[j][0] < pattern[i][0]:
+            merged.append(events[j])
+            j += 1
+        else:
+            merged.append(pattern[i])
+            i += 1
+    merged.extend(pattern[i:])
+    merged.extend(events[j:])
+    return merged
+
+
+def _event_time(event):
+    return event[0]
 
 
 class Recorder:
@@ -10,14 +345,42 @@ class Recorder:
     type is generic and the playback function is provided via the constructor.
     As such, the recorder can be re-purposed
     """
-    def __init__(self, scheduler: scheduling.Scheduler, playback_fn=None):
+    def __init__(self, scheduler: scheduling.Scheduler, playback_fn=None,
+                 quantizer: Quantizer = None, max_overdub_events=1024):
         self._scheduler = scheduler
+        # Optional quantizer that is run once when a recording is stopped.
+        self._quantizer = quantizer
+        # Overdubbing stops adding events once a pattern reaches this size.
+        self._max_overdub_events = max_overdub_events
+        # Events overdubbed since the last merge (None when not overdubbing).
+        self._overdub_pending = None
+        # Time the current pass of the overdubbed pattern started playing.
+        self._overdub_origin_ms = 0
+        # Length of a single loop of the overdubbed pattern.
+        self._overdub_loop_ms = 0
 
         # List of tuples containing (time, channel note, velocity)
         self._recording_pattern_id = None
         # Function to receive the recorded data event
         self._playback_fn = playback_fn
         self._pattern_map = {}
+        # Maps a pattern id to the quantized copy of the recorded pattern.
+        self._quantized_map = {}
+        # Pattern ids that should play back the raw (unquantized) take.
+        self._unquantized = set()
+        # Limits on the number of events and the time span of a recording.
+        self._max_events = None
+        self._max_duration_ms = None
+        # Limit on the number of events stored across all patterns.
+        self._max_total_events = None
+        # Called with the pattern id of a pattern evicted to stay in budget.
+        self._eviction_fn = None
+        # Pattern ids ordered from least to most recently played/recorded.
+        self._lru = {}
+        # Maps a pattern id to the time its last pass started playing.
+        self._play_start_ms = {}
+        # Maps a view id to a PatternView of a recorded pattern.
+        self._view_map = {}
         # Maps a pattern id to the current play tasks
         self._play_task_map = {}
         # Maps a pattern id to the next scheduled loop task.
@@ -40,17 +403,277 @@ class Recorder:
         """
         if self._recording_pattern_id is None:
             return
+        if self._overdub_pending is not None:
+            self._overdub(timestamp_ms, data)
+            return
         key = self._recording_pattern_id
-        self._pattern_map[key].append((timestamp_ms, data))
-
-    def start_recording(self, pattern_id):
-        """ Start recording incoming notes for the specified pattern id. """
+        buffer = self._pattern_map[key]
+        buffer.append((timestamp_ms, data))
+        if self._max_duration_ms is not None:
+            # Only keep the last max_duration_ms of events.
+            while timestamp_ms - buffer[0][0] > self._max_duration_ms:
+                buffer.popleft()
+
+    def start_recording(self, pattern_id, overdub=False):
+        """ Start recording incoming notes for the specified pattern id.
+
+        :param pattern_id: the pattern to record.
+        :param overdub: set to True to layer the new events onto the existing
+        pattern instead of replacing it. Events are placed relative to the
+        current position (phase) of the pattern's loop and are merged into the
+        pattern each time it loops (and when recording stops), so the loop
+        keeps playing while overdubbing. A pattern playing its quantized take
+        keeps playing it and the overdubbed events are quantized into it.
+        Timestamps passed to on_data_event must use the same clock as the
+        scheduler.
+        """
+        if self._recording_pattern_id is not None:
+            self.stop_recording()
         self._recording_pattern_id = pattern_id
-        self._pattern_map[pattern_id] = []
+        self._touch(pattern_id)
+        pattern = self._pattern_map.get(pattern_id)
+        if not overdub or not pattern:
+            if pattern_id in self._quantized_map:
+                del self._quantized_map[pattern_id]
+            self._pattern_map[pattern_id] = RingBuffer(self._max_events)
+            return
+
+        self._overdub_pending = []
+        if self.is_looping(pattern_id) or self._play_task_map.get(pattern_id):
+            self._overdub_origin_ms = self._play_start_ms[pattern_id]
+        else:
+            self._overdub_origin_ms = self._scheduler.time_ms()
+        # The loop length is that of the take being played.
+        take = self._get_pattern(pattern_id)
+        self._overdub_loop_ms = (take[-1][0] - take[0][0] +
+                                 self._loop_delays.get(pattern_id, 0))
 
     def stop_recording(self):
-        """ Stop recording incoming notes. """
+        """ Stop recording incoming notes.
+
+        If a quantizer is set, the quantized version of the recorded pattern
+        is computed here so that playback never needs to do any extra work.
+        """
+        pattern_id = self._recording_pattern_id
+        if pattern_id is None:
+            return
+        if self._overdub_pending is not None:
+            self._merge_overdub()
+            self._overdub_pending = None
+            pattern = self._pattern_map[pattern_id]
+            # Overdubbed events wrap around the loop, so the take still ends
+            # with its last event.
+            end_ms = pattern[-1][0]
+        else:
+            pattern = self._pattern_map[pattern_id].to_list()
+            # The take lasts until the recording stops.
+            end_ms = max(pattern[-1][0] if pattern else 0,
+                         int(self._scheduler.time_ms()))
         self._recording_pattern_id = None
+        self._pattern_map[pattern_id] = self._finish_recording(
+            pattern_id, pattern, end_ms)
+        if self._quantizer is not None:
+            self._quantized_map[pattern_id] = self._quantizer.quantize(
+                self._pattern_map[pattern_id])
+        self._enforce_budget()
+
+    def _finish_recording(self, pattern_id, pattern, end_ms):
+        """ Called with a finished recording. Returns the pattern to store.
+
+        :param end_ms: the time the recording ended (on the clock of the
+        recorded timestamps).
+        """
+        return pattern
+
+    def set_capacity(self, max_events=None, max_duration_ms=None):
+        """ Limit the size of each recorded pattern.
+
+        Recordings are kept in a ring buffer so that when a limit is reached,
+        the oldest events are dropped. This acts as a "retro capture" of the
+        last max_events events or max_duration_ms milliseconds. Takes effect
+        on the next recording.
+
+        :param max_events: maximum number of events in a pattern (None for no
+        limit).
+        :param max_duration_ms: maximum time span of a pattern (None for no
+        limit).
+        """
+        self._max_events = max_events
+        self._max_duration_ms = max_duration_ms
+
+    def set_memory_budget(self, max_total_events, eviction_fn=None):
+        """ Limit the total number of events stored across all patterns.
+
+        When a recording pushes the total over budget, the least recently
+        played patterns are evicted until the recorder is back in budget.
+        Patterns that are playing (directly or through a view) or being
+        recorded are never evicted.
+
+        :param max_total_events: the budget (None for no limit).
+        :param eviction_fn: function called with the pattern id of each
+        evicted pattern (e.g. to update lights).
+        """
+        self._max_total_events = max_total_events
+        self._eviction_fn = eviction_fn
+        self._enforce_budget()
+
+    def get_total_events(self):
+        """ Returns the number of events stored across all patterns. """
+        return (sum(len(p) for p in self._pattern_map.values()) +
+                sum(len(p) for p in self._quantized_map.values()))
+
+    def _touch(self, pattern_id):
+        """ Mark the pattern as the most recently used. """
+        if pattern_id in self._lru:
+            del self._lru[pattern_id]
+        self._lru[pattern_id] = None
+
+    def _enforce_budget(self):
+        if self._max_total_events is None:
+            return
+        total = self.get_total_events()
+        for pattern_id in list(self._lru.keys()):
+            if total <= self._max_total_events:
+                return
+            if self._is_in_use(pattern_id):
+                continue
+            total -= len(self._pattern_map.get(pattern_id, ()))
+            total -= len(self._quantized_map.get(pattern_id, ()))
+            self._evict(pattern_id)
+
+    def _is_in_use(self, pattern_id):
+        """ Returns True if the pattern is recorded or played (or a view of
+        it is played).
+        """
+        if pattern_id == self._recording_pattern_id:
+            return True
+        for play_id in ([pattern_id] +
+                        [view_id for view_id, view in self._view_map.items()
+                         if view.pattern_id == pattern_id]):
+            if (self.is_looping(play_id) or
+                    self._play_task_map.get(play_id)):
+                return True
+        return False
+
+    def _evict(self, pattern_id):
+        for state in (self._pattern_map, self._quantized_map, self._lru,
+                      self._loop_delays, self._play_start_ms):
+            if pattern_id in state:
+                del state[pattern_id]
+        self._unquantized.discard(pattern_id)
+        if self._eviction_fn is not None:
+            self._eviction_fn(pattern_id)
+
+    def is_overdubbing(self):
+        """ Return true if currently overdubbing onto a pattern. """
+        return self._overdub_pending is not None
+
+    def _overdub(self, timestamp_ms, data):
+        pattern_id = self._recording_pattern_id
+        pattern = self._pattern_map[pattern_id]
+        max_events = self._max_overdub_events
+        if self._max_events is not None:
+            max_events = min(max_events, self._max_events)
+        if len(pattern) + len(self._overdub_pending) >= max_events:
+            return
+        phase_ms = timestamp_ms - self._overdub_origin_ms
+        if self._overdub_loop_ms > 0:
+            phase_ms %= self._overdub_loop_ms
+        self._overdub_pending.append((pattern[0][0] + phase_ms, data))
+
+    def _merge_overdub(self):
+        """ Merge the pending overdubbed events into the recorded pattern. """
+        pending = self._overdub_pending
+        if not pending:
+            return
+        pattern_id = self._recording_pattern_id
+        pattern = self._pattern_map[pattern_id]
+        # Events arrive in time order except when the loop wraps around, so
+        # only the (small) pending list ever needs sorting.
+        pending.sort(key=_event_time)
+        overshoot_ms = pending[-1][0] - self._get_pattern(pattern_id)[-1][0]
+        if overshoot_ms > 0 and pattern_id in self._loop_delays:
+            # Events landed in the gap between loops. Shorten the loop delay so
+            # the length of the loop stays the same.
+            self._loop_delays[pattern_id] = max(
+                0, self._loop_delays[pattern_id] - overshoot_ms)
+        quantized = self._quantized_map.get(pattern_id)
+        if quantized is not None:
+            # The quantized take keeps playing, so the events are quantized
+            # (on the grid of the take) and merged into it as well.
+            quantized_pending = pending
+            if self._quantizer is not None:
+                quantized_pending = self._quantizer.quantize(
+                    [(quantized[0][0], None)] + pending)[1:]
+            self._quantized_map[pattern_id] = _merge_sorted(
+                quantized, quantized_pending)
+        self._pattern_map[pattern_id] = _merge_sorted(pattern, pending)
+        self._overdub_pending = []
+        self._enforce_budget()
+
+    def set_quantizer(self, quantizer: Quantizer):
+        """ Set the quantizer to run on recordings (None to disable). """
+        self._quantizer = quantizer
+
+    def set_quantized(self, pattern_id, quantized):
+        """ Switch between the quantized and raw take of a pattern.
+
+        Takes effect the next time the pattern is played (or loops).
+
+        :param pattern_id: the pattern to switch.
+        :param quantized: True to play the quantized take (default) or False to
+        play the raw take.
+        """
+        if quantized:
+            self._unquantized.discard(pattern_id)
+        else:
+            self._unquantized.add(pattern_id)
+
+    def is_quantized(self, pattern_id):
+        """ Returns True if the pattern plays back a quantized take. """
+        return (pattern_id in self._quantized_map and
+                pattern_id not in self._unquantized)
+
+    def add_view(self, view_id, pattern_id, *transforms):
+        """ Create a view of a pattern that can be played by its view id.
+
+        The transforms are applied in order to each event when it is emitted.
+        Adding a view with an existing view id replaces the previous view.
+
+        :param view_id: the id to play the view with. Must not be the id of a
+        recorded pattern.
+        :param pattern_id: the id of the recorded pattern to view.
+        :param transforms: the Transform stages to apply.
+        :return: the created PatternView.
+        """
+        view = PatternView(pattern_id, transforms)
+        self._view_map[view_id] = view
+        return view
+
+    def get_view(self, view_id):
+        """ Returns the PatternView for the view id or None if none exists. """
+        return self._view_map.get(view_id)
+
+    def remove_view(self, view_id):
+        """ Stops and removes the view with the given id. """
+        if view_id in self._view_map:
+            self.stop(view_id)
+            del self._view_map[view_id]
+
+    def _source_id(self, pattern_id):
+        """ Returns the id of the recorded pattern a view or pattern plays. """
+        view = self._view_map.get(pattern_id)
+        return pattern_id if view is None else view.pattern_id
+
+    def _get_pattern(self, pattern_id):
+        """ Returns the take (quantized or raw) to play for a pattern or view.
+
+        Returns None if no such pattern exists.
+        """
+        pattern_id = self._source_id(pattern_id)
+        if self.is_quantized(pattern_id):
+            return self._quantized_map[pattern_id]
+        return self._pattern_map.get(pattern_id)
 
     def is_recording(self):
         """ Return true if currently recording a pattern. """
@@ -64,9 +687,8 @@ class Recorder:
         return pattern_id in self._loop_task_map
 
     def has_pattern(self, pattern_id):
-        """ Returns true if a pattern exists for the given pattern id. """
-        return pattern_id in self._pattern_map and bool(
-            self._pattern_map[pattern_id])
+        """ Returns true if a pattern (or view) exists for the given id. """
+        return bool(self._get_pattern(pattern_id))
 
     def get_patterns(self):
         """ Returns a list of non-empty valid pattern ids. """
@@ -94,9 +716,7 @@ class Recorder:
         finishes before looping.
         :return True if pattern to play is found. False if no pattern to play.
         """
-        if pattern_id not in self._pattern_map:
-            return False
-        pattern = self._pattern_map[pattern_id]
+        pattern = self._get_pattern(pattern_id)
         if not pattern:
             # Nothing to play
             return False
@@ -117,15 +737,24 @@ class Recorder:
                 loop_delay_ms = self._loop_delays[pattern_id]
 
         self._loop_delays[pattern_id] = loop_delay_ms
+        self._touch(self._source_id(pattern_id))
         self._play_pattern(pattern_id, pattern, loop)
         return True
 
     def _play_pattern(self, pattern_id, pattern, loop):
         if pattern_id not in self._play_task_map:
             self._play_task_map[pattern_id] = set()
+        self._play_start_ms[pattern_id] = self._scheduler.time_ms()
+        if (pattern_id == self._recording_pattern_id and
+                self._overdub_pending is not None):
+            # New pass of the pattern being overdubbed.
+            self._overdub_origin_ms = self._play_start_ms[pattern_id]
+        view = self._view_map.get(pattern_id)
         base_ms = pattern[0][0]
         for timestamp_ms, data in pattern:
             delay_ms = timestamp_ms - base_ms
+            if view is not None:
+                delay_ms = view.delay(delay_ms)
             self._play_data(pattern_id, delay_ms, data)
         if loop and delay_ms > 0:
             # Don't schedule something that will keep playing now
@@ -137,13 +766,31 @@ class Recorder:
     def _play_data(self, pattern_id, delay_ms, data):
         if delay_ms <= 0:
             # Check if the data needs to be played now.
-            self._playback_fn(data)
+            self._emit(pattern_id, data)
         else:
-            task = self._scheduler.schedule(lambda: self._playback_fn(data),
-                                            delay_ms=delay_ms)
+            task = self._scheduler.schedule(
+                lambda: self._emit(pattern_id, data), delay_ms=delay_ms)
             self._play_task_map[pattern_id].add(task)
             self._schedule_delete_task(pattern_id, task, delay_ms)
 
+    def _emit(self, pattern_id, data):
+        # Views are looked up at emission time so that transforms toggled
+        # while the pattern plays take effect immediately.
+        view = self._view_map.get(pattern_id)
+        if view is None:
+            self._output(pattern_id, data)
+            return
+        for event in view.emit(data):
+            self._output(pattern_id, event)
+
+    def _output(self, pattern_id, data):
+        """ Called for each event emitted by a playing pattern. """
+        self._playback_fn(data)
+
+    def _release(self, pattern_id):
+        """ Called when a pattern is stopped before it finished playing. """
+        pass
+
     def _schedule_delete_task(self, pattern_id, task, delay_ms):
         def _clean_task():
             if pattern_id not in self._play_task_map: return
@@ -152,13 +799,24 @@ class Recorder:
 
     def _schedule_loop(self, pattern_id, delay_ms, pattern):
         task = self._scheduler.schedule(
-            lambda: self._play_pattern(pattern_id, pattern, True),
+            lambda: self._play_loop(pattern_id, pattern),
             delay_ms=delay_ms)
         if pattern_id in self._loop_task_map:
             # Cancel any pre-existing loop (just in case) before overwriting.
             self._scheduler.cancel(self._loop_task_map[pattern_id])
         self._loop_task_map[pattern_id] = task
 
+    def _play_loop(self, pattern_id, pattern):
+        # Pick up a switch between raw and quantized takes (or overdubbed
+        # events) on each loop unless the pattern is being re-recorded, in
+        # which case the previous take keeps looping.
+        if pattern_id == self._recording_pattern_id and self.is_overdubbing():
+            self._merge_overdub()
+        if (self._source_id(pattern_id) != self._recording_pattern_id or
+                self.is_overdubbing()):
+            pattern = self._get_pattern(pattern_id) or pattern
+        self._play_pattern(pattern_id, pattern, True)
+
     def get_last_looping_pattern_id(self):
         """ Gets the pattern id of the last pattern set to play looping. """
         return self._last_looping_pattern_id
@@ -179,6 +837,9 @@ class Recorder:
             for task in self._play_task_map[pattern_id]:
                 self._scheduler.cancel(task)
             self._play_task_map[pattern_id] = set()
+        self._release(pattern_id)
+        if pattern_id in self._view_map:
+            self._view_map[pattern_id].reset()
 
     def stop_all(self):
         """ Stop everything from playing immediately. """
@@ -188,7 +849,159 @@ class Recorder:
         self._loop_task_map.clear()
 
         # Cancel all pending tasks
-        for task_set in self._play_task_map.values():
+        for pattern_id, task_set in self._play_task_map.items():
             for task in task_set:
                 self._scheduler.cancel(task)
+            self._release(pattern_id)
         self._play_task_map.clear()
+        for view in self._view_map.values():
+            view.reset()
+
+
+class NoteRecord:
+    """ A recorded note on paired with the note off that ends it. """
+    def __init__(self, timestamp_ms, duration_ms, note_on: MidiMessage,
+                 note_off: MidiMessage):
+        self.timestamp_ms = timestamp_ms
+        self.duration_ms = duration_ms
+        self.note_on = note_on
+        self.note_off = note_off
+
+    def __repr__(self):
+        return '[NoteRecord: ch={} note=0x{:02X} at {}ms for {}ms]'.format(
+            self.note_on.get_channel(), self.note_on.data1,
+            self.timestamp_ms, self.duration_ms)
+
+
+def _note_index(msg: MidiMessage):
+    return (msg.get_channel() << 7) | msg.data1
+
+
+def _is_note_on(msg: MidiMessage):
+    return (msg.get_masked_status() == Midi.STATUS_NOTE_ON and
+            msg.data2 > 0)
+
+
+def _is_note_off(msg: MidiMessage):
+    return (msg.get_masked_status() == Midi.STATUS_NOTE_OFF or
+            (msg.get_masked_status() == Midi.STATUS_NOTE_ON and
+             msg.data2 == 0))
+
+
+def _note_off_for(note_on: MidiMessage):
+    return note_on.copy(
+        status=Midi.STATUS_NOTE_OFF | note_on.get_channel(), data2=0)
+
+
+class HeldNotes:
+    """ Table of the notes held down by a playing pattern.
+
+    The table has an entry for each of the 16 channels x 128 notes, so
+    updating it or checking a note is constant time, and the notes that are
+    held are tracked separately so releasing them never requires a scan.
+    """
+    def __init__(self):
+        self._counts = bytearray(16 * 128)
+        # Maps a held note's table index to the note on that started it.
+        self._held = {}
+
+    def update(self, msg: MidiMessage):
+        """ Update the table with a MidiMessage that is being emitted. """
+        if _is_note_on(msg):
+            idx = _note_index(msg)
+            self._counts[idx] = min(0xFF, self._counts[idx] + 1)
+            self._held[idx] = msg
+        elif _is_note_off(msg):
+            idx = _note_index(msg)
+            if self._counts[idx] > 0:
+                self._counts[idx] -= 1
+                if self._counts[idx] == 0:
+                    del self._held[idx]
+
+    def is_held(self, channel, note):
+        """ Returns True if the note is held down on the channel. """
+        return self._counts[(channel << 7) | note] > 0
+
+    def release(self):
+        """ Clears the table and returns note offs for all held notes. """
+        note_offs = [_note_off_for(msg) for msg in self._held.values()]
+        for idx in self._held:
+            self._counts[idx] = 0
+        self._held.clear()
+        return note_offs
+
+    def __len__(self):
+        return len(self._held)
+
+
+class NoteRecorder(Recorder):
+    """ Recorder specialized for recording MidiMessage notes.
+
+    In addition to the generic recorder behavior, the note ons of a recording
+    are paired with their note offs into NoteRecords (a note off is added at
+    the time the recording stops for any note left held), and the notes held
+    down by each playing pattern are tracked so stopping a pattern sends
+    exactly the note offs needed to avoid stuck notes.
+    """
+    def __init__(self, scheduler: scheduling.Scheduler, playback_fn=None,
+                 **kwargs):
+        super().__init__(scheduler, playback_fn=playback_fn, **kwargs)
+        # Maps a pattern id to the NoteRecords of the pattern.
+        self._note_map = {}
+        # Maps a playing pattern (or view) id to its HeldNotes.
+        self._held_map = {}
+
+    def get_notes(self, pattern_id):
+        """ Returns the NoteRecords of a recorded pattern sorted by time. """
+        return self._note_map.get(pattern_id, [])
+
+    def get_held_notes(self, pattern_id):
+        """ Returns the HeldNotes of the pattern (or view) being played. """
+        if pattern_id not in self._held_map:
+            self._held_map[pattern_id] = HeldNotes()
+        return self._held_map[pattern_id]
+
+    def _finish_recording(self, pattern_id, pattern, end_ms):
+        notes = []
+        # Maps a note's table index to the (timestamp_ms, note on) pairs that
+        # are still waiting for a note off.
+        open_notes = {}
+        for timestamp_ms, msg in pattern:
+            if not isinstance(msg, MidiMessage):
+                continue
+            if _is_note_on(msg):
+                open_notes.setdefault(_note_index(msg), []).append(
+                    (timestamp_ms, msg))
+            elif _is_note_off(msg) and open_notes.get(_note_index(msg)):
+                start_ms, note_on = open_notes[_note_index(msg)].pop(0)
+                notes.append(NoteRecord(start_ms, timestamp_ms - start_ms,
+                                        note_on, msg))
+
+        # Guarantee every note on in the pattern gets a note off, at the end
+        # of the recording for the notes still held when it stopped.
+        for pending in open_notes.values():
+            for start_ms, note_on in pending:
+                note_off = _note_off_for(note_on)
+                pattern.append((end_ms, note_off))
+                notes.append(NoteRecord(start_ms, end_ms - start_ms,
+                                        note_on, note_off))
+        notes.sort(key=lambda n: n.timestamp_ms)
+        self._note_map[pattern_id] = notes
+        return pattern
+
+    def _evict(self, pattern_id):
+        for state in (self._note_map, self._held_map):
+            if pattern_id in state:
+                del state[pattern_id]
+        super()._evict(pattern_id)
+
+    def _output(self, pattern_id, data):
+        if isinstance(data, MidiMessage):
+            self.get_held_notes(pattern_id).update(data)
+        self._playback_fn(data)
+
+    def _release(self, pattern_id):
+        if pattern_id not in self._held_map:
+            return
+        for note_off in self._held_map[pattern_id].release():
+            self._playback_fn(note_off)
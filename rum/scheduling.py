@@ -20,7 +20,7 @@ class Scheduler:
             time_fn = time.monotonic
         self._time_fn = time_fn
 
-    def _time_ms(self):
+    def time_ms(self):
         """ Return current timestamp in milliseconds. """
         return self._time_fn() * 1000
 
@@ -33,7 +33,7 @@ class Scheduler:
         :return: the entry corresponding to the task. This can be used to cancel
         the scheduled task.
         """
-        time_ms = self._time_ms()
+        time_ms = self.time_ms()
         # Add a monotonic value before the task to avoid any ties since lambda
         # functions are not comparable.
         entry = (time_ms + delay_ms, next(self._counter), task)
@@ -56,7 +56,7 @@ class Scheduler:
 
     def idle(self):
         """ Process an idle loop and processes tasks to be executed. """
-        time_ms = self._time_ms()
+        time_ms = self.time_ms()
         while self._tasks_pq:
             entry = _heapq.heappop(self._tasks_pq)
             if entry[0] > time_ms:
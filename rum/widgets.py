@@ -0,0 +1,252 @@
+""" Widgets for laying out labels, values, meters and lists on a display. """
+from rum.displays import Display, DisplayWindow
+
+
+class Widget:
+    """ Pseudo-interface for a widget that renders text in a display region.
+
+    Subclasses implement render() and call invalidate() whenever the value
+    they show changes.
+    """
+    def __init__(self):
+        self._window = None
+        self._value_fn = None
+        self._dirty = True
+
+    def attach(self, window: Display):
+        """ Attach the widget to the display region it renders to. """
+        self._window = window
+        self.invalidate()
+
+    def bind(self, value_fn):
+        """ Bind the widget to a function returning the value to show.
+
+        The function is polled on every update and the widget only
+        re-renders if the value returned changed.
+        """
+        self._value_fn = value_fn
+        self.invalidate()
+        return self
+
+    def set(self, value):
+        """ Sets the value shown by the widget. """
+        raise NotImplementedError()
+
+    def render(self, width, height):
+        """ Returns the list of lines to show in the widget region. """
+        raise NotImplementedError()
+
+    def invalidate(self):
+        """ Mark the widget to be rendered on the next draw. """
+        self._dirty = True
+
+    def is_dirty(self):
+        """ Returns True if the widget needs to be rendered. """
+        return self._dirty
+
+    def update(self):
+        """ Polls the bound value (if any) for changes. """
+        if self._value_fn is not None:
+            self.set(self._value_fn())
+
+    def draw(self):
+        """ Renders the widget into its region if it changed.
+
+        Returns True if the widget was rendered.
+        """
+        if not self._dirty or self._window is None:
+            return False
+        self._dirty = False
+        lines = self.render(self._window.width(), self._window.height())
+        for i in range(self._window.height()):
+            self._window[i] = lines[i] if i < len(lines) else ''
+        return True
+
+
+class Label(Widget):
+    """ Static text widget. """
+    def __init__(self, text=''):
+        super().__init__()
+        self._text = text
+
+    def set(self, text):
+        """ Sets the text of the label. """
+        if text != self._text:
+            self._text = text
+            self.invalidate()
+
+    def get(self):
+        return self._text
+
+    def render(self, width, height):
+        return [self._text]
+
+
+class Value(Widget):
+    """ Right aligned formatted value (e.g. a parameter value). """
+    def __init__(self, value=0, fmt='{}'):
+        """ Construct a Value widget.
+
+        :param value: the initial value to show.
+        :param fmt: format string used to render the value.
+        """
+        super().__init__()
+        self._value = value
+        self._fmt = fmt
+
+    def set(self, value):
+        """ Sets the value to show. """
+        if value != self._value:
+            self._value = value
+            self.invalidate()
+
+    def get(self):
+        return self._value
+
+    def render(self, width, height):
+        return [self._fmt.format(self._value).rjust(width)]
+
+
+class Meter(Widget):
+    """ Horizontal bar showing a value within a range. """
+    def __init__(self, value=0, min_value=0, max_value=127, fill_char='#',
+                 empty_char=' '):
+        """ Construct a Meter widget.
+
+        :param value: the initial value of the meter.
+        :param min_value: value of an empty meter.
+        :param max_value: value of a full meter.
+        :param fill_char: char used for the filled part of the meter.
+        :param empty_char: char used for the unfilled part of the meter.
+        """
+        super().__init__()
+        self._value = value
+        self._min_value = min_value
+        self._max_value = max_value
+        self._fill_char = fill_char
+        self._empty_char = empty_char
+        self._filled = None
+
+    def set(self, value):
+        """ Sets the value of the meter.
+
+        The meter is only rendered again if the number of filled cells
+        changes.
+        """
+        self._value = value
+        if (self._window is not None
+                and self._filled_cells(self._window.width()) != self._filled):
+            self.invalidate()
+
+    def get(self):
+        return self._value
+
+    def _filled_cells(self, width):
+        value = min(max(self._value, self._min_value), self._max_value)
+        fraction = ((value - self._min_value)
+                    / (self._max_value - self._min_value))
+        return int(round(fraction * width))
+
+    def render(self, width, height):
+        self._filled = self._filled_cells(width)
+        return [self._fill_char * self._filled
+                + self._empty_char * (width - self._filled)]
+
+
+class List(Widget):
+    """ Scrolling list of items with a marker on the selected item. """
+    def __init__(self, items=(), selected=0, marker='>'):
+        """ Construct a List widget.
+
+        :param items: the items to show (converted to str when rendered).
+        :param selected: index of the selected item.
+        :param marker: char shown in front of the selected item.
+        """
+        super().__init__()
+        self._items = list(items)
+        self._selected = selected
+        self._marker = marker
+
+    def set(self, items):
+        """ Sets the items of the list. """
+        items = list(items)
+        if items != self._items:
+            self._items = items
+            self._selected = min(self._selected, max(len(items) - 1, 0))
+            self.invalidate()
+
+    def get(self):
+        return self._items
+
+    def select(self, idx):
+        """ Selects the item at the specified index. """
+        idx = min(max(idx, 0), max(len(self._items) - 1, 0))
+        if idx != self._selected:
+            self._selected = idx
+            self.invalidate()
+
+    def selected(self):
+        """ Returns the index of the selected item. """
+        return self._selected
+
+    def render(self, width, height):
+        # Keep the selected item visible by scrolling one page at a time.
+        first = (self._selected // height) * height
+        lines = []
+        for idx in range(first, min(first + height, len(self._items))):
+            prefix = self._marker if idx == self._selected else ' '
+            lines.append('{}{}'.format(prefix, self._items[idx]))
+        return lines
+
+
+class Layout:
+    """ Places widgets in regions of a display and draws the ones that changed.
+
+    Each widget only writes to the cells of its own region and only renders
+    again when its value changes, so a fast changing value next to static
+    labels only updates the few characters that actually changed.
+    """
+    def __init__(self, display: Display):
+        self._display = display
+        self._widgets = []
+
+    def add(self, widget: Widget, line, col, width, height=1):
+        """ Place a widget in a region of the display.
+
+        :param widget: the widget to place.
+        :param line: the first line of the region.
+        :param col: the first column of the region.
+        :param width: the number of chars per line of the region.
+        :param height: the number of lines of the region (default: 1).
+        :return: the widget added.
+        """
+        window = DisplayWindow(self._display,
+                               line_range=(line, line + height),
+                               char_range=(col, col + width))
+        widget.attach(window)
+        self._widgets.append(widget)
+        return widget
+
+    def remove(self, widget: Widget):
+        """ Remove a widget from the layout (its cells are left as is). """
+        self._widgets.remove(widget)
+
+    def invalidate(self):
+        """ Mark all widgets to be drawn again (e.g. after a page switch). """
+        for widget in self._widgets:
+            widget.invalidate()
+
+    def render(self, push=True):
+        """ Draw the widgets whose values changed.
+
+        :param push: set to True to push the changes to the display.
+        :return: True if any widget was drawn.
+        """
+        drawn = False
+        for widget in self._widgets:
+            widget.update()
+            if widget.draw():
+                drawn = True
+        if drawn and push:
+            self._display.push()
+        return drawn
@@ -0,0 +1,131 @@
+import sys
+import unittest
+from os import path
+
+sys.path.append(
+    path.join(
+        path.dirname(path.dirname(path.dirname(path.dirname(path.abspath(
+            __file__))))),
+        'tests_flstudio/stubs')
+)
+
+from daw import flstudio
+from panels.flstudio.lights import LightPanel, get_light
+from rum import processor, autorefresh
+from rum.compositor import Compositor
+from rum.lights import LedFramebuffer, LedShadow
+
+
+class LightPanelTest(unittest.TestCase):
+    def setUp(self):
+        processor.get_processor().clear()
+        autorefresh.get_refresh_manager().clear()
+        self._sent = []
+        self._shadow = LedShadow()
+        self._framebuffer = LedFramebuffer(flush_fn=self._sent.extend,
+                                           shadow=self._shadow)
+        self._panel = LightPanel('test_panel', [1, 2, 3],
+                                 light_fn=self._framebuffer.set,
+                                 shadow=self._shadow)
+
+    def test_refreshLedsMatchingShadow_nothingSent(self):
+        self._panel.set_all(0x10)
+        self._framebuffer.flush()
+        self._sent.clear()
+
+        self._panel.refresh(flstudio.REFRESH_CONTROLLER_LEDS)
+        self._framebuffer.flush()
+        self.assertEqual([], self._sent)
+
+    def test_refreshLedMismatch_onlyMismatchSent(self):
+        self._panel.set_all(0x10)
+        self._framebuffer.flush()
+        self._shadow.update(2, 0x00)
+        self._sent.clear()
+
+        self._panel.refresh(flstudio.REFRESH_CONTROLLER_LEDS)
+        self._framebuffer.flush()
+        self.assertEqual([(2, 0x10)], self._sent)
+
+    def test_resync_allLedsSent(self):
+        self._panel.set_all(0x10)
+        self._framebuffer.flush()
+        self._sent.clear()
+
+        self._panel.resync()
+        self._framebuffer.flush()
+        self.assertEqual([(1, 0x10), (2, 0x10), (3, 0x10)], self._sent)
+
+
+class CompositedLightPanelTest(unittest.TestCase):
+    def setUp(self):
+        processor.get_processor().clear()
+        autorefresh.get_refresh_manager().clear()
+        self._sent = []
+        self._framebuffer = LedFramebuffer(flush_fn=self._sent.extend)
+        self._compositor = Compositor(output_fn=self._framebuffer.set)
+        self._layer = self._compositor.add_layer('status')
+        self._overlay = self._compositor.add_layer('overlay')
+        self._panel = LightPanel('composited_panel', [1, 2],
+                                 light_fn=self._layer.set,
+                                 resync_fn=self._framebuffer.resync)
+        self._panel.set_all(0x10)
+        self._flush()
+        self._sent.clear()
+
+    def _flush(self):
+        self._compositor.flatten()
+        self._framebuffer.flush()
+
+    def test_resync_ledsResent(self):
+        self._panel.resync()
+        self._flush()
+        self.assertEqual([(1, 0x10), (2, 0x10)], self._sent)
+
+    def test_resyncUnderOverlay_compositedColorResent(self):
+        self._overlay.set(2, 0x39)
+        self._flush()
+        self._sent.clear()
+
+        self._panel.resync()
+        self._flush()
+        self.assertEqual([(1, 0x10), (2, 0x39)], self._sent)
+
+    def test_refreshUnderOverlay_nothingSent(self):
+        self._overlay.set(2, 0x39)
+        self._flush()
+        self._sent.clear()
+
+        self._panel.refresh(flstudio.REFRESH_CONTROLLER_LEDS)
+        self._flush()
+        self.assertEqual([], self._sent)
+
+
+class GetLightTest(unittest.TestCase):
+    def test_getLight_returnsLightOfPanel(self):
+        panel = LightPanel('get_light_panel', [0x70, 0x71],
+                           light_fn=lambda led_id, value: None)
+        self.assertIs(panel[1], get_light(0x71))
+
+    def test_getLightUnknownLed_returnsNone(self):
+        self.assertIsNone(get_light(0x7E))
+
+    def test_getLightPanelReplaced_returnsLightOfNewPanel(self):
+        LightPanel('replaced_panel', [0x72],
+                   light_fn=lambda led_id, value: None)
+        panel = LightPanel('replaced_panel', [0x72],
+                           light_fn=lambda led_id, value: None)
+        self.assertIs(panel[0], get_light(0x72))
+
+
+    def test_getLightRemovedFromReplacedPanel_returnsNone(self):
+        LightPanel('shrunk_panel', [0x73, 0x74],
+                   light_fn=lambda led_id, value: None)
+        panel = LightPanel('shrunk_panel', [0x73],
+                           light_fn=lambda led_id, value: None)
+        self.assertIs(panel[0], get_light(0x73))
+        self.assertIsNone(get_light(0x74))
+
+
+if __name__ == '__main__':
+    unittest.main()
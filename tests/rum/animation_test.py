@@ -1,7 +1,7 @@
 import unittest
 
 from rum.animations import BlinkingAnimation, SequentialAnimation
-from rum.lights import OnOffLight
+from rum.lights import OnOffLight, ColorLight, ColorToggleLight
 from rum.scheduling import Scheduler
 from tests.testutils import FakeClock
 
@@ -65,6 +65,36 @@ class BlinkingAnimationTest(unittest.TestCase):
         self.assertTrue(self._light)
 
 
+class NativeBlinkingAnimationTest(unittest.TestCase):
+    def setUp(self):
+        self._updates = []
+        self._blinks = []
+        self._clock = FakeClock()
+        self._scheduler = Scheduler(time_fn=self._clock.time)
+        self._light = ColorToggleLight(
+            ColorLight(update_fn=self._updates.append),
+            on_color=0x10,
+            blink_fn=self._blinks.append)
+        self._animation = BlinkingAnimation(self._light, self._scheduler,
+                                            update_interval_ms=250)
+
+    def test_nativeBlinkSupported_deviceBlinksWithoutTraffic(self):
+        self._animation.start_animation()
+        self.assertTrue(self._animation.is_native())
+        self.assertEqual([0x10], self._blinks)
+        self._clock.advance(1.0)
+        self._scheduler.idle()
+        self.assertEqual([], self._updates)
+        self.assertEqual([0x10], self._blinks)
+
+    def test_nativeBlinkStopped_solidColorRestored(self):
+        self._light.set(0x20)
+        self._animation.start_animation()
+        self._animation.stop_animation()
+        self.assertFalse(self._animation.is_animation_running())
+        self.assertEqual([0x20, 0x20], self._updates)
+
+
 class SequentialAnimationTest(unittest.TestCase):
     def setUp(self):
         # Let's make a row of 5 lights
@@ -0,0 +1,55 @@
+import unittest
+
+from rum import colors
+from rum.colors import Palette, Rgb
+
+_ENTRIES = [Rgb(0, 0, 0), Rgb(255, 0, 0), Rgb(0, 255, 0), Rgb(0, 0, 255),
+            Rgb(255, 255, 255)]
+
+
+class RgbTest(unittest.TestCase):
+    def test_fromHex_splitsChannels(self):
+        self.assertEqual(Rgb(0x12, 0x34, 0x56), Rgb.from_hex(0x123456))
+
+    def test_blend_interpolatesChannels(self):
+        self.assertEqual(Rgb(128, 0, 128),
+                         colors.RED.blend(colors.BLUE, 0.5))
+        self.assertEqual(colors.BLUE, colors.RED.blend(colors.BLUE, 1.0))
+
+    def test_scale_dimsColor(self):
+        self.assertEqual(Rgb(100, 50, 0), Rgb(200, 100, 0).scale(0.5))
+
+    def test_bool_blackIsOff(self):
+        self.assertFalse(colors.BLACK)
+        self.assertTrue(Rgb(0, 0, 1))
+
+
+class PaletteTest(unittest.TestCase):
+    def setUp(self):
+        self._palette = Palette(_ENTRIES)
+
+    def test_index_exactColorsMapToEntry(self):
+        for idx, rgb in enumerate(_ENTRIES):
+            self.assertEqual(idx, self._palette.index(rgb))
+
+    def test_index_nearbyColorMapsToNearestEntry(self):
+        self.assertEqual(1, self._palette.index(Rgb(200, 30, 20)))
+        self.assertEqual(0, self._palette.index(Rgb(20, 30, 20)))
+
+    def test_index_matchesFullSearchAcrossCube(self):
+        for r in range(0, 256, 51):
+            for g in range(0, 256, 51):
+                for b in range(0, 256, 51):
+                    rgb = Rgb(r, g, b)
+                    # The table is computed at the center of the cell.
+                    center = Rgb(r | 8, g | 8, b | 8)
+                    self.assertEqual(self._palette.nearest(center),
+                                     self._palette.index(rgb))
+
+    def test_getPalette_sharedForSameEntries(self):
+        self.assertIs(colors.get_palette(_ENTRIES),
+                      colors.get_palette(list(_ENTRIES)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+
+from rum.animations import BlinkingAnimation
+from rum.compositor import Compositor
+from rum.controls import Metronome
+from rum.scheduling import Scheduler
+from tests.testutils import FakeClock
+
+
+class CompositorTests(unittest.TestCase):
+    def setUp(self):
+        self._output = []
+        self._compositor = Compositor(
+            output_fn=lambda led_id, color: self._output.append(
+                (led_id, color)))
+        self._base = self._compositor.add_layer('base')
+        self._overlay = self._compositor.add_layer('overlay')
+
+    def test_flatten_topLayerWins(self):
+        self._base.set(1, 0x10)
+        self._base.set(2, 0x20)
+        self._overlay.set(2, 0x30)
+        self._compositor.flatten()
+        self.assertEqual([(1, 0x10), (2, 0x30)], self._output)
+
+    def test_clearOverlay_lowerLayerShowsThrough(self):
+        self._base.set(1, 0x10)
+        self._overlay.set(1, 0x30)
+        self._compositor.flatten()
+        self._overlay.clear(1)
+        self.assertEqual([(1, 0x10)], self._compositor.flatten())
+
+    def test_setCoveredLed_nothingOutput(self):
+        self._base.set(1, 0x10)
+        self._overlay.set(1, 0x30)
+        self._compositor.flatten()
+        self._base.set(1, 0x20)
+        self.assertEqual([], self._compositor.flatten())
+
+    def test_hideLayer_restoresLowerLayer(self):
+        self._base.set(1, 0x10)
+        self._overlay.set(1, 0x30)
+        self._compositor.flatten()
+        self._overlay.set_visible(False)
+        self.assertEqual([(1, 0x10)], self._compositor.flatten())
+
+    def test_noLayerSetsLed_background(self):
+        self._base.set(1, 0x10)
+        self._compositor.flatten()
+        self._base.clear()
+        self.assertEqual([(1, 0)], self._compositor.flatten())
+
+
+class LayerLightTests(unittest.TestCase):
+    def setUp(self):
+        self._clock = FakeClock()
+        self._scheduler = Scheduler(time_fn=self._clock.time)
+        self._compositor = Compositor()
+        self._base = self._compositor.add_layer('base')
+        self._blink = self._compositor.add_layer('blink')
+        self._base.set(1, 0x10)
+        self._compositor.flatten()
+
+    def test_blinkOverlay_doesNotOverwriteBaseColor(self):
+        animation = BlinkingAnimation(self._blink.light(1, 0x05),
+                                      self._scheduler, update_interval_ms=100)
+        animation.start_animation()
+        self._clock.advance(0.1)
+        self._scheduler.idle()
+        self.assertEqual([(1, 0x05)], self._compositor.flatten())
+        self._clock.advance(0.1)
+        self._scheduler.idle()
+        self.assertEqual([(1, 0x10)], self._compositor.flatten())
+        self.assertEqual(0x10, self._base.get(1))
+
+    def test_metronomeResetFrame_noRedundantChanges(self):
+        metronome = Metronome(self._scheduler,
+                              [self._blink.light(led_id, 0x7F)
+                               for led_id in (2, 3)])
+        metronome.beat()
+        self.assertEqual([(2, 0x7F)], self._compositor.flatten())
+        metronome.beat()
+        self.assertEqual([(2, 0), (3, 0x7F)], self._compositor.flatten())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,6 +29,18 @@ class TriggerWhenTests(unittest.TestCase):
         processor.get_processor().process(m)
         self.assertEqual([m], self._received)
 
+    def test_triggerWhenPort_onlyCalledForMessagesFromPort(self):
+        self._received = []
+
+        @trigger_when(status_eq(129), port=3)
+        def dispatch(m):
+            self._received.append(m)
+
+        m = MidiMessage(129, 1, 2, port=3)
+        processor.get_processor().process(MidiMessage(129, 1, 2, port=4))
+        processor.get_processor().process(m)
+        self.assertEqual([m], self._received)
+
 
 class ButtonTests(unittest.TestCase):
     def setUp(self):
@@ -0,0 +1,128 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from device_profile import description
+from device_profile.novation.launchkey import mini_mk3_layout
+from device_profile.novation.launchkey.mini_mk3 import MiniMk3
+from rum.midi import MidiMessage
+
+_DESCRIPTION = {
+    'name': 'test_device',
+    'commands': {'preamble': ['0x9F', 12, '0x00']},
+    'leds': {'solid': '0x99'},
+    'controls': {
+        'play': {'status_range': ['0xB0', '0xB1'], 'ids': '0x73'},
+        'pads': {'status': {'down': '0x99', 'up': '0x89'},
+                 'channel': 9,
+                 'ids': [['0x28', '0x29'], ['0x24', '0x25']]},
+    }
+}
+
+
+class DeviceDescriptionTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._dir.name, 'device.json')
+        self._write(_DESCRIPTION)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _load(self):
+        return description.DeviceDescription(
+            description.compile_file(self._path))
+
+    def _write(self, data):
+        with open(self._path, 'w') as f:
+            json.dump(data, f)
+
+    def test_compile_compilesTables(self):
+        desc = self._load()
+        self.assertEqual('test_device', desc.name)
+        self.assertEqual(bytes([0x9F, 0x0C, 0x00]), desc.command('preamble'))
+        self.assertEqual(0x99, desc.led('solid'))
+        self.assertEqual([[0x28, 0x29], [0x24, 0x25]], desc.rows('pads'))
+        self.assertEqual({0x28: 0, 0x29: 1, 0x24: 2, 0x25: 3},
+                         desc.id_map('pads'))
+        self.assertEqual(0x89, desc.status('pads', 'up'))
+        self.assertEqual(9, desc.channel('pads'))
+
+    def test_lookup_indexesControlMessages(self):
+        desc = self._load()
+        self.assertEqual(('play', 0), desc.lookup(MidiMessage(0xB1, 0x73, 0)))
+        self.assertEqual(('pads', 2), desc.lookup(MidiMessage(0x89, 0x24, 0)))
+        self.assertIsNone(desc.lookup(MidiMessage(0xB2, 0x73, 0)))
+
+    def test_matcher_matchesControlEventAndIndex(self):
+        desc = self._load()
+        pad_down = desc.matcher('pads', idx=1, event='down')
+        self.assertTrue(pad_down(MidiMessage(0x99, 0x29, 0x7F)))
+        self.assertFalse(pad_down(MidiMessage(0x89, 0x29, 0x00)))
+        self.assertFalse(pad_down(MidiMessage(0x99, 0x28, 0x7F)))
+        self.assertTrue(desc.matcher('pads')(MidiMessage(0x89, 0x25, 0)))
+
+    def test_writeModule_compiledTablesAsLiterals(self):
+        module_path = os.path.join(self._dir.name, 'device_layout.py')
+        description.write_module(self._path, module_path)
+        namespace = {}
+        with open(module_path) as f:
+            exec(f.read(), namespace)
+        self.assertEqual(description.compile_file(self._path),
+                         namespace['COMPILED'])
+
+    def test_compile_overlappingControlsAsserts(self):
+        data = dict(_DESCRIPTION, controls={
+            'a': {'status_range': [0xB0, 0xB0], 'ids': 1},
+            'b': {'status_range': [0xB0, 0xB0], 'ids': 1}})
+        with self.assertRaises(AssertionError):
+            description.compile_description(data)
+
+
+class MiniMk3DescriptionTest(unittest.TestCase):
+    def test_compiledLayout_matchesDescription(self):
+        # Regenerate with:
+        # python -m device_profile.description \
+        #   device_profile/novation/launchkey/mini_mk3.json \
+        #   device_profile/novation/launchkey/mini_mk3_layout.py
+        json_path = os.path.join(
+            os.path.dirname(mini_mk3_layout.__file__), 'mini_mk3.json')
+        self.assertEqual(description.compile_file(json_path),
+                         mini_mk3_layout.COMPILED)
+
+    def test_import_onlyBuiltinModulesLoaded(self):
+        # FL Studio only ships the builtin modules.
+        code = ('import sys\n'
+                'import device_profile.novation.launchkey.mini_mk3\n'
+                'print(sorted(m for m in ("json", "pickle", "hashlib", "pprint")'
+                ' if m in sys.modules))')
+        output = subprocess.check_output([sys.executable, '-c', code],
+                                         cwd=os.path.dirname(os.path.dirname(
+                                             os.path.dirname(
+                                                 os.path.abspath(__file__)))))
+        self.assertEqual(b'[]', output.strip())
+
+    def test_constants_matchDeviceLayout(self):
+        self.assertEqual(bytes([0x9F, 0x0C, 0x00]), MiniMk3.CMD_PREAMBLE)
+        self.assertEqual(0x99, MiniMk3.SOLID_LED_STATUS_CMD)
+        self.assertEqual(0x9B, MiniMk3.BLINK_LED_STATUS_CMD)
+        self.assertEqual([[0x28, 0x29, 0x2A, 0x2B, 0x30, 0x31, 0x32, 0x33],
+                          [0x24, 0x25, 0x26, 0x27, 0x2C, 0x2D, 0x2E, 0x2F]],
+                         MiniMk3.DRUM_PAD_IDS)
+        self.assertEqual(list(range(0x15, 0x1D)), MiniMk3.ENCODER_IDS)
+        self.assertEqual(9, MiniMk3.DRUM_PAD_MIDI_CHANNEL)
+
+    def test_matchers_matchDeviceMessages(self):
+        self.assertTrue(MiniMk3.IS_RECORD_BUTTON(MidiMessage(0xBF, 0x75, 0)))
+        self.assertTrue(MiniMk3.IS_DRUM_PAD(MidiMessage(0x89, 0x2C, 0)))
+        self.assertFalse(MiniMk3.IS_DRUM_PAD(MidiMessage(0x99, 0x34, 0)))
+        self.assertTrue(
+            MiniMk3.DRUM_PAD_DOWN_MATCHERS[1][0](MidiMessage(0x99, 0x24, 1)))
+        self.assertTrue(MiniMk3.is_encoder(7)(MidiMessage(0xB0, 0x1C, 5)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,16 @@
 import unittest
 
-from device_profile.abstract import MidiCommandBuilder
+from device_profile.abstract import MidiCommandBuilder, DeviceProfile
+from device_profile.arturia.keylab import Mk2, Mk2DeviceProfile
+from device_profile.novation.launchkey.mini_mk3 import MiniMk3, \
+    MiniMk3DeviceProfile, MiniMk3MidiCommandBuilder, is_led_refresh, \
+    pack_led_updates, unpack_led_updates
+from rum.animations import BlinkingAnimation
+from rum.colors import Rgb
+from rum.output import OutputQueue
+from rum.scheduling import Scheduler
+from tests.testutils import FakeClock
+from rum.displays import DirectDisplay
 
 
 class MidiCommandBuilderTest(unittest.TestCase):
@@ -41,6 +51,305 @@ class MidiCommandBuilderTest(unittest.TestCase):
             (2, ['cat'])],
             self._command_builder.param_display_updates)
 
+    def test_buildMessagesMixedEntrySizes_eachMessageWithinMaxSize(self):
+        class SizedCommandBuilder(MidiCommandBuilder):
+            # 2 bytes overhead, 1 byte per light on and 3 per light color.
+            def build(self, daw_mode=True):
+                cmd = bytearray([0xF0])
+                for led_id in self.param_lights_to_turn_on:
+                    cmd += bytes([led_id])
+                for led_id, color in self.param_lights_to_set_colors:
+                    cmd += bytes([0x99, led_id, color])
+                cmd.append(0xF7)
+                return bytes(cmd)
+
+        messages = (SizedCommandBuilder()
+                    .light_on(1)
+                    .light_color(2, 5, 3, 6)
+                    .build_messages(max_size=8))
+        self.assertEqual([bytes([0xF0, 1, 0x99, 2, 5, 0xF7]),
+                          bytes([0xF0, 0x99, 3, 6, 0xF7])], messages)
+
+
+class DeviceProfileTest(unittest.TestCase):
+    class TestCommandBuilder(MidiCommandBuilder):
+        def build(self, daw_mode=True):
+            return (tuple(self.param_lights_to_turn_on),
+                    tuple(self.param_lights_to_turn_off),
+                    tuple(self.param_lights_to_set_colors))
+
+    class TestDeviceProfile(DeviceProfile):
+        def new_midi_command_builder(self):
+            return DeviceProfileTest.TestCommandBuilder()
+
+    def setUp(self):
+        self._sent = []
+        self._profile = DeviceProfileTest.TestDeviceProfile(
+            True, self._sent.append)
+
+    def test_setManyLights_singleCommandOnFlush(self):
+        lights = [self._profile.new_color_toggle_light(led_id)
+                  for led_id in range(4)]
+        toggle = self._profile.new_toggle_light(10)
+        for light in lights:
+            light.toggle(True)
+        toggle.toggle(True)
+        self.assertEqual([], self._sent)
+
+        self._profile.get_framebuffer().flush()
+        self.assertEqual(
+            [((10,), (), ((0, 0x7F), (1, 0x7F), (2, 0x7F), (3, 0x7F)))],
+            self._sent)
+
+    def test_singleLedCommand_builtOnceAndCached(self):
+        built = []
+        new_builder = self._profile.new_midi_command_builder
+
+        def counting_builder():
+            built.append(True)
+            return new_builder()
+
+        self._profile.new_midi_command_builder = counting_builder
+        light = self._profile.new_color_toggle_light(3)
+        for _ in range(3):
+            light.toggle(True)
+            self._profile.get_framebuffer().flush()
+            light.toggle(False)
+            self._profile.get_framebuffer().flush()
+        self.assertEqual(6, len(self._sent))
+        self.assertEqual(2, len(built))
+
+    def test_outputQueue_commandsSentWhenServiced(self):
+        queue = OutputQueue(self._sent.append,
+                            scheduler=Scheduler(time_fn=FakeClock().time))
+        profile = DeviceProfileTest.TestDeviceProfile(
+            True, self._sent.append, output_queue=queue)
+        profile.new_color_toggle_light(1).toggle(True)
+        profile.get_framebuffer().flush()
+        self.assertEqual([], self._sent)
+        queue.service()
+        self.assertEqual(1, len(self._sent))
+
+    def test_clearOutput_framebufferResynced(self):
+        queue = OutputQueue(self._sent.append,
+                            scheduler=Scheduler(time_fn=FakeClock().time))
+        profile = DeviceProfileTest.TestDeviceProfile(
+            True, self._sent.append, output_queue=queue)
+        profile.new_color_toggle_light(1).toggle(True)
+        profile.get_framebuffer().flush()
+        profile.clear_output()
+        self.assertEqual(0, len(queue))
+
+        profile.get_framebuffer().flush()
+        queue.service()
+        self.assertEqual(1, len(self._sent))
+
+    def test_lightToggledBackBeforeFlush_nothingSent(self):
+        light = self._profile.new_color_toggle_light(3)
+        light.toggle(True)
+        self._profile.get_framebuffer().flush()
+        light.toggle(False)
+        light.toggle(True)
+        self._profile.get_framebuffer().flush()
+        self.assertEqual(1, len(self._sent))
+
+
+class MiniMk3DeviceProfileTest(unittest.TestCase):
+    def test_blinkingLight_sendsNativeBlinkCommand(self):
+        sent = []
+        profile = MiniMk3DeviceProfile(False, sent.append)
+        light = profile.new_color_toggle_light(0x24, on_value=0x05)
+        animation = BlinkingAnimation(light,
+                                      Scheduler(time_fn=FakeClock().time))
+        animation.start_animation()
+        profile.get_framebuffer().flush()
+        self.assertTrue(animation.is_native())
+        self.assertEqual([bytes([0x9B, 0x24, 0x05])], sent)
+
+    def test_refreshWhileBlinkingNatively_keepsBlinking(self):
+        sent = []
+        profile = MiniMk3DeviceProfile(False, sent.append)
+        light = profile.new_color_toggle_light(0x28, on_value=0x05)
+        animation = BlinkingAnimation(light,
+                                      Scheduler(time_fn=FakeClock().time))
+        animation.start_animation()
+        profile.get_framebuffer().flush()
+
+        light.refresh()
+        light.set(light.get(), force_update=True)
+        profile.get_framebuffer().flush()
+        self.assertEqual([bytes([0x9B, 0x28, 0x05])], sent)
+
+        animation.stop_animation()
+        profile.get_framebuffer().flush()
+        self.assertEqual(bytes([0x99, 0x28, 0x00]), sent[-1])
+
+    def test_resyncThenPadPress_padSentBeforeRefresh(self):
+        sent = []
+        queue = OutputQueue(sent.append,
+                            scheduler=Scheduler(time_fn=FakeClock().time))
+        profile = MiniMk3DeviceProfile(False, sent.append,
+                                       output_queue=queue)
+        pad1 = profile.new_color_toggle_light(0x24)
+        pad2 = profile.new_color_toggle_light(0x25)
+        pad1.toggle(True)
+        pad2.toggle(True)
+        profile.get_framebuffer().flush()
+        queue.service()
+        del sent[:]
+
+        profile.resync()
+        profile.get_framebuffer().flush()
+        pad1.toggle(False)
+        profile.get_framebuffer().flush()
+        queue.service()
+        # The refresh carries the newer color of the pressed pad.
+        self.assertEqual([bytes([0x99, 0x24, 0x00]),
+                          bytes([0x99, 0x24, 0x00, 0x99, 0x25, 0x7F])], sent)
+
+    def test_rgbColor_sentAsNearestPaletteIndex(self):
+        sent = []
+        profile = MiniMk3DeviceProfile(False, sent.append)
+        light = profile.new_color_toggle_light(0x24,
+                                               on_value=Rgb(250, 5, 0))
+        light.toggle(True)
+        profile.get_framebuffer().flush()
+        self.assertEqual([bytes([0x99, 0x24, 0x05])], sent)
+
+    def test_padGrid_changedPadsSentInOneCommand(self):
+        sent = []
+        profile = MiniMk3DeviceProfile(False, sent.append)
+        grid = profile.new_pad_grid(MiniMk3.DRUM_PAD_IDS)
+        grid.flush()
+        sent.clear()
+        grid.set_row(1, [0x05, 0x05])
+        grid.flush()
+        self.assertEqual([bytes([0x99, 0x24, 0x05, 0x99, 0x25, 0x05])], sent)
+
+    def test_buildLights_singleCommandWithPreamble(self):
+        cmd = (MiniMk3MidiCommandBuilder()
+               .light_off(0x24)
+               .light_on(0x25)
+               .light_color(0x26, 0x10)
+               .blinking_light(0x27, 0x05)
+               .build(daw_mode=True))
+        self.assertEqual(MiniMk3.CMD_PREAMBLE + bytes([
+            0x99, 0x24, 0x00,
+            0x99, 0x25, 0x77,
+            0x99, 0x26, 0x10,
+            0x9B, 0x27, 0x05]), cmd)
+
+    def test_buildNothing_emptyCommand(self):
+        self.assertEqual(b'', MiniMk3MidiCommandBuilder().build())
+
+    def test_packLedUpdates_roundTrips(self):
+        updates = [(0x24, (False, 0x10)), (0x25, (True, 0x05))]
+        packed = pack_led_updates(updates)
+        self.assertTrue(all(b < 0x80 for b in packed[1:-1]))
+        self.assertEqual(updates, unpack_led_updates(packed))
+
+    def test_packRefresh_marksRefresh(self):
+        updates = [(0x28, (True, 0x05))]
+        packed = pack_led_updates(updates, refresh=True)
+        self.assertTrue(is_led_refresh(packed))
+        self.assertFalse(is_led_refresh(pack_led_updates(updates)))
+        self.assertEqual(updates, unpack_led_updates(packed))
+
+    def test_unpackOtherSysex_returnsNone(self):
+        self.assertIsNone(unpack_led_updates(bytes([0xF0, 0x00, 0xF7])))
+
+    def test_profileWithoutCapability_noNativeBlink(self):
+        profile = DeviceProfileTest.TestDeviceProfile(True, lambda cmd: None)
+        light = profile.new_color_toggle_light(1)
+        self.assertFalse(light.set_native_blinking(True))
+
+
+class Mk2CommandBuilderTest(unittest.TestCase):
+    def test_lightsAndDisplay_bothCommandsBuilt(self):
+        cmd = (Mk2()
+               .light_on(0x10)
+               .light_color(0x11, 0x20)
+               .display(0, ['ab'])
+               .build())
+        self.assertEqual(
+            Mk2.CMD_BEGIN + Mk2.CMD_SET_LIGHTS
+            + bytes([0x10, 0x7F, 0x11, 0x20]) + Mk2.CMD_END
+            + Mk2.CMD_BEGIN + Mk2.CMD_SET_DISPLAY
+            + b'\x01ab\x00\x7F' + Mk2.CMD_END,
+            cmd)
+
+    def test_buildMessagesMaxSize_lightsSplitIntoFewestMessages(self):
+        builder = Mk2().light_color(1, 1, 2, 2, 3, 3, 4, 4, 5, 5)
+        # 10 bytes overhead + 2 bytes per light.
+        messages = builder.build_messages(max_size=15)
+        self.assertEqual(
+            [Mk2.CMD_BEGIN + Mk2.CMD_SET_LIGHTS + bytes([1, 1, 2, 2])
+             + Mk2.CMD_END,
+             Mk2.CMD_BEGIN + Mk2.CMD_SET_LIGHTS + bytes([3, 3, 4, 4])
+             + Mk2.CMD_END,
+             Mk2.CMD_BEGIN + Mk2.CMD_SET_LIGHTS + bytes([5, 5])
+             + Mk2.CMD_END],
+            messages)
+        self.assertTrue(all(len(msg) <= 15 for msg in messages))
+
+    def test_buildMessagesUnlimited_singleMessage(self):
+        builder = Mk2().light_color(1, 1, 2, 2, 3, 3)
+        self.assertEqual([builder.build()], builder.build_messages())
+
+    def test_buildMessagesMaxLights_onePerMessage(self):
+        messages = Mk2().light_on(1, 2).build_messages(max_lights=1)
+        self.assertEqual(2, len(messages))
+
+    def test_displayLines_copiedIntoCommand(self):
+        display = DirectDisplay.Builder().set_line_width(4).build()
+        display[0] = 'hi'
+        display[1] = 'mk2'
+        cmd = Mk2().display(0, display[:]).build()
+        self.assertEqual(
+            Mk2.CMD_BEGIN + Mk2.CMD_SET_DISPLAY
+            + b'\x01hi  \x00\x02mk2 \x00\x7F' + Mk2.CMD_END,
+            cmd)
+
+
+class Mk2DeviceProfileTest(unittest.TestCase):
+    def setUp(self):
+        self._sent = []
+        self._profile = Mk2DeviceProfile(True, self._sent.append)
+
+    def test_changedLights_sentInSingleMessage(self):
+        for led_id in (0x10, 0x11, 0x12):
+            self._profile.new_toggle_light(led_id).toggle(True)
+        self._profile.get_framebuffer().flush()
+        self.assertEqual(
+            [Mk2.CMD_BEGIN + Mk2.CMD_SET_LIGHTS
+             + bytes([0x10, 0x7F, 0x11, 0x7F, 0x12, 0x7F]) + Mk2.CMD_END],
+            self._sent)
+
+    def test_manyChangedLights_splitWithinMaxMessageSize(self):
+        for led_id in range(0x10, 0x50):
+            self._profile.new_toggle_light(led_id).toggle(True)
+        self._profile.get_framebuffer().flush()
+        self.assertEqual(2, len(self._sent))
+        self.assertTrue(all(len(msg) <= Mk2DeviceProfile.MAX_MESSAGE_SIZE
+                            for msg in self._sent))
+
+    def test_displayPush_onlyChangedLinesSent(self):
+        display = self._profile.new_display()
+        self.assertEqual((2, 16), (display.height(), display.width()))
+        display.push()
+        display[1] = 'mk2'
+        display.push()
+        self.assertEqual(
+            Mk2.CMD_BEGIN + Mk2.CMD_SET_DISPLAY
+            + b'\x02mk2' + b' ' * 13 + b'\x00\x7F' + Mk2.CMD_END,
+            self._sent[-1])
+
+    def test_displayUnchanged_nothingSent(self):
+        display = self._profile.new_display()
+        display.push()
+        display.push()
+        self.assertEqual(1, len(self._sent))
+
 
 if __name__ == '__main__':
     unittest.main()
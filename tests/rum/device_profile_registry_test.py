@@ -0,0 +1,30 @@
+import unittest
+
+from device_profile import registry
+from device_profile.abstract import NATIVE_BLINK
+from device_profile.novation.launchkey.mini_mk3 import MiniMk3DeviceProfile
+
+
+class DeviceProfileRegistryTest(unittest.TestCase):
+    def test_getProfileClass_knownProfile(self):
+        self.assertIs(
+            MiniMk3DeviceProfile,
+            registry.get_profile_class('novation_launchkey_mini_mk3'))
+
+    def test_getProfileClass_unknownProfileNone(self):
+        self.assertIsNone(registry.get_profile_class('unknown'))
+
+    def test_newProfile_constructsRegisteredClass(self):
+        profile = registry.new_profile('novation_launchkey_mini_mk3',
+                                       True, lambda cmd: None)
+        self.assertIsInstance(profile, MiniMk3DeviceProfile)
+
+    def test_findProfiles_matchesCapabilities(self):
+        self.assertIn('novation_launchkey_mini_mk3',
+                      registry.find_profiles(NATIVE_BLINK))
+        self.assertNotIn('novation_launchkey_mini_mk3',
+                         registry.find_profiles(NATIVE_BLINK, 'unknown'))
+
+
+if __name__ == '__main__':
+    unittest.main()
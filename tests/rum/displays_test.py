@@ -1,7 +1,7 @@
 import unittest
 
 from rum.displays import DirectDisplay, DisplayWindow, ScrollingDisplay, \
-    PagedDisplay
+    MarqueeCache, PagedDisplay, RenderLoop, line_bytes
 from rum.scheduling import Scheduler
 from tests.testutils import FakeClock
 
@@ -47,6 +47,85 @@ class DirectDisplayTests(unittest.TestCase):
             list('   45           '),
             list(' '*16)], self._pushed)
 
+    def test_pushWithoutChanges_skipped(self):
+        self._display.push()
+        self._pushed = None
+        self.assertFalse(self._display.is_dirty())
+        self._display.push()
+        self.assertIsNone(self._pushed)
+
+    def test_pushWithoutChangesForced_pushesAllLines(self):
+        self._display.push()
+        self._pushed = None
+        self._display.push(force=True)
+        self.assertEqual([list(' '*16), list(' '*16)], self._pushed)
+
+
+class DirectDisplayBufferTests(unittest.TestCase):
+    def setUp(self):
+        self._display = (DirectDisplay.Builder()
+                         .set_lines(2)
+                         .set_line_width(4)
+                         .build())
+
+    def test_setLines_writtenToSingleBuffer(self):
+        self._display[0] = 'ab'
+        self._display[1] = 'cdefg'
+        self.assertEqual(b'ab  cdef', bytes(self._display.buffer()))
+
+    def test_nonAsciiChars_replaced(self):
+        self._display[0] = 'h\u00e9y'
+        self.assertEqual('h?y ', str(self._display[0]))
+
+    def test_lineBytes_viewOfBuffer(self):
+        self._display[1] = 'abcd'
+        data = line_bytes(self._display[1])
+        self._display[1][0] = 'z'
+        self.assertEqual(b'zbcd', bytes(data))
+
+    def test_lineBytes_encodesText(self):
+        self.assertEqual(b'abc', bytes(line_bytes('abc')))
+        self.assertEqual(b'abc', bytes(line_bytes(['a', 'b', 'c'])))
+
+    def test_windowColumns_shareBuffer(self):
+        window = DisplayWindow(self._display, char_range=(1, 3))
+        window[1] = 'xyz'
+        self.assertEqual(b'     xy ', bytes(self._display.buffer()))
+        self.assertEqual('xy', str(window[1]))
+
+
+class DirectDisplayChangesTests(unittest.TestCase):
+    def setUp(self):
+        self._regions = []
+        self._display = (DirectDisplay.Builder()
+                         .set_lines(2)
+                         .set_line_width(8)
+                         .push_changes_with(self._regions.append)
+                         .build())
+
+    def test_firstPush_pushesAllLines(self):
+        self._display[1] = 'hi'
+        self._display.push()
+        self.assertEqual([[(0, 0, list(' ' * 8)),
+                           (1, 0, list('hi      '))]], self._regions)
+
+    def test_changeWithinLine_onlyChangedSpanPushed(self):
+        self._display[0] = 'vol: 10'
+        self._display.push()
+        self._display[0] = 'vol: 12'
+        self._display[1][7:8] = '*'
+        self.assertTrue(self._display.is_dirty())
+        self._display.push()
+        self.assertEqual([(0, 6, ['2']), (1, 7, ['*'])], self._regions[-1])
+        self.assertFalse(self._display.is_dirty())
+
+    def test_rewriteSameText_nothingPushed(self):
+        self._display[0] = 'same'
+        self._display.push()
+        self._display[0] = 'same'
+        self._display.push()
+        self.assertEqual(1, len(self._regions))
+
 
 class DisplayWindowTest(unittest.TestCase):
     def setUp(self):
@@ -406,6 +485,103 @@ class ScrollingDisplayTest(unittest.TestCase):
         self.assertEqual(list('****************'), self._display[4])
 
 
+class MarqueeCacheTest(unittest.TestCase):
+    def test_frames_cycleThroughWrappedText(self):
+        cache = MarqueeCache()
+        self.assertEqual(('abcd', 'bcd ', 'cd a', 'd ab', ' abc'),
+                         cache.frames('abcd', 4, 1, 1))
+
+    def test_scrollAmountNotDivisor_cyclesUntilOffsetRepeats(self):
+        cache = MarqueeCache()
+        frames = cache.frames('abc', 2, 0, 2)
+        self.assertEqual(('ab', 'ca', 'bc'), frames)
+
+    def test_sameText_framesShared(self):
+        cache = MarqueeCache()
+        self.assertIs(cache.frames('hello world', 5, 2, 1),
+                      cache.frames('hello world', 5, 2, 1))
+
+    def test_maxEntriesExceeded_leastRecentlyUsedEvicted(self):
+        cache = MarqueeCache(max_entries=2)
+        first = cache.frames('first line', 4, 2, 1)
+        cache.frames('second line', 4, 2, 1)
+        cache.frames('first line', 4, 2, 1)
+        cache.frames('third line', 4, 2, 1)
+        self.assertEqual(2, len(cache))
+        self.assertIs(first, cache.frames('first line', 4, 2, 1))
+        self.assertEqual(2, len(cache))
+
+    def test_scrollingDisplays_shareCachedFrames(self):
+        cache = MarqueeCache()
+        scheduler = Scheduler(time_fn=FakeClock().time)
+        displays = [ScrollingDisplay(DirectDisplay.Builder()
+                                     .set_lines(1)
+                                     .set_line_width(4)
+                                     .build(),
+                                     scheduler,
+                                     marquee_cache=cache)
+                    for _ in range(2)]
+        for display in displays:
+            display[0] = 'long text'
+        self.assertEqual(1, len(cache))
+
+
+class RenderLoopTest(unittest.TestCase):
+    def setUp(self):
+        self._clock = FakeClock()
+        self._pushes = []
+        self._scheduler = Scheduler(time_fn=self._clock.time)
+        self._display = (DirectDisplay.Builder()
+                         .set_lines(2)
+                         .set_line_width(10)
+                         .push_with(lambda lines: self._pushes.append(
+                             [''.join(line) for line in lines]))
+                         .build())
+        self._loop = RenderLoop(self._scheduler, tick_ms=50, max_fps=10)
+        left = DisplayWindow(self._display, char_range=(0, 5))
+        right = DisplayWindow(self._display, char_range=(5, 10))
+        self._left = ScrollingDisplay(left, self._scheduler,
+                                      scroll_interval_ms=100, padding=1,
+                                      render_loop=self._loop)
+        self._right = ScrollingDisplay(right, self._scheduler,
+                                       scroll_interval_ms=100, padding=1,
+                                       render_loop=self._loop)
+
+    def _advance_ms(self, ms):
+        for _ in range(ms // 50):
+            self._clock.advance(0.05)
+            self._scheduler.idle()
+
+    def test_multipleScrollingLines_singlePushPerFrame(self):
+        self._left[0] = 'abcdef'
+        self._left[1] = 'ABCDEF'
+        self._right[0] = '123456'
+        self.assertEqual([], self._pushes)
+
+        self._advance_ms(50)
+        self.assertEqual([['abcde12345', 'ABCDE     ']], self._pushes)
+
+        self._advance_ms(50)
+        self.assertEqual(1, len(self._pushes))
+        self._advance_ms(50)
+        self.assertEqual(['bcdef23456', 'BCDEF     '], self._pushes[-1])
+        self.assertEqual(2, len(self._pushes))
+
+    def test_fastScrolling_pushesCappedByMaxFps(self):
+        fast = ScrollingDisplay(DisplayWindow(self._display), self._scheduler,
+                                scroll_interval_ms=10, render_loop=self._loop)
+        fast[0] = 'a long line of text'
+        self._advance_ms(1000)
+        self.assertLessEqual(len(self._pushes), 10)
+
+    def test_shortLines_loopStopsTicking(self):
+        self._left[0] = 'abc'
+        self._advance_ms(100)
+        self.assertEqual(1, len(self._pushes))
+        self.assertFalse(self._left.is_animating())
+        self.assertEqual([], self._scheduler._tasks_pq)
+
+
 class PagedDisplayTests(unittest.TestCase):
     def setUp(self):
         self._clock = FakeClock()
@@ -615,6 +791,41 @@ class PagedDisplayTests(unittest.TestCase):
                           list('world           ')],
                          self._pushed)
 
+    def test_pageRenderer_notCalledUntilPageShown(self):
+        calls = []
+
+        def render():
+            calls.append(True)
+            return ['volume', '80']
+
+        self._paged_display.set_page_renderer('mixer', render)
+        self._paged_display.invalidate('mixer')
+        self.assertEqual([], calls)
+
+        self._paged_display.set_active_page('mixer')
+        self.assertEqual(1, len(calls))
+        self.assertEqual(list('volume          '), self._display[0])
+        self.assertEqual(list('80              '), self._display[1])
+
+    def test_pageRenderer_cachedUntilInvalidated(self):
+        calls = []
+
+        def render():
+            calls.append(True)
+            return ['render {}'.format(len(calls))]
+
+        self._paged_display.set_page_renderer('mixer', render)
+        self._paged_display.set_active_page('mixer')
+        self._paged_display.set_active_page('main')
+        self._paged_display.set_active_page('mixer')
+        self.assertEqual(1, len(calls))
+
+        self._paged_display.invalidate('mixer')
+        self.assertEqual(2, len(calls))
+        self.assertEqual([list('render 2        '),
+                          list(' ' * 16)],
+                         self._pushed)
+
 
 if __name__ == '__main__':
     unittest.main()
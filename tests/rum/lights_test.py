@@ -1,6 +1,7 @@
 import unittest
 
-from rum.lights import OnOffLight, ColorLight, ColorToggleLight
+from rum.lights import OnOffLight, ColorLight, ColorToggleLight, \
+    LedFramebuffer, LedShadow
 
 
 class OnOffLightTests(unittest.TestCase):
@@ -143,5 +144,65 @@ class ColorToggleLightsTest(unittest.TestCase):
         self.assertEqual([30], self._update_values)
 
 
+class LedShadowTests(unittest.TestCase):
+    def test_transmittedValue_matches(self):
+        shadow = LedShadow()
+        shadow.update(1, 0x10)
+        self.assertTrue(shadow.matches(1, 0x10))
+        self.assertFalse(shadow.matches(1, 0x20))
+        self.assertFalse(shadow.matches(2, 0x00))
+
+    def test_resync_nothingMatches(self):
+        shadow = LedShadow()
+        shadow.update(1, 0x10)
+        shadow.resync()
+        self.assertFalse(shadow.matches(1, 0x10))
+        self.assertEqual(0, len(shadow))
+
+
+class LedFramebufferTests(unittest.TestCase):
+    def setUp(self):
+        self._flushed = []
+        self._framebuffer = LedFramebuffer(flush_fn=self._flushed.append)
+
+    def test_multipleLeds_flushedInSingleCall(self):
+        self._framebuffer.set(1, 0x10)
+        self._framebuffer.set(2, 0x20)
+        self._framebuffer.flush()
+        self.assertEqual([[(1, 0x10), (2, 0x20)]], self._flushed)
+        self.assertFalse(self._framebuffer.is_dirty())
+
+    def test_ledChangedAndRestored_notFlushed(self):
+        self._framebuffer.set(1, 0x10)
+        self._framebuffer.flush()
+        self._framebuffer.set(1, 0x00)
+        self._framebuffer.set(1, 0x10)
+        self._framebuffer.flush()
+        self.assertEqual(1, len(self._flushed))
+
+    def test_repeatedWrites_lastValueFlushed(self):
+        self._framebuffer.set(1, 0x10)
+        self._framebuffer.set(1, 0x20)
+        self._framebuffer.set(1, 0x30)
+        self._framebuffer.flush()
+        self.assertEqual([[(1, 0x30)]], self._flushed)
+
+    def test_resync_resendsAllLeds(self):
+        self._framebuffer.set(1, 0x10)
+        self._framebuffer.set(2, 0x20)
+        self._framebuffer.flush()
+        self._framebuffer.resync()
+        self._framebuffer.flush()
+        self.assertEqual([(1, 0x10), (2, 0x20)], self._flushed[-1])
+
+    def test_sharedShadowUpdatedElsewhere_mismatchResent(self):
+        self._framebuffer.set(1, 0x10)
+        self._framebuffer.flush()
+        self._framebuffer.shadow().update(1, 0x00)
+        self._framebuffer.set(1, 0x10)
+        self._framebuffer.flush()
+        self.assertEqual([(1, 0x10)], self._flushed[-1])
+
+
 if __name__ == '__main__':
     unittest.main()
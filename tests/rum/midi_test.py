@@ -28,6 +28,15 @@ class MidiMessageTests(unittest.TestCase):
         msg.mark_handled()
         self.assertTrue(msg.handled)
 
+    def test_copyWithReplacedField_originalUnchanged(self):
+        msg = MidiMessage(0x84, 2, 3)
+        msg.userdata['key'] = 'value'
+        copy = msg.copy(data1=5)
+        self.assertEqual(bytes([0x84, 5, 3]), bytes(copy))
+        self.assertEqual(bytes([0x84, 2, 3]), bytes(msg))
+        self.assertEqual(msg.timestamp_ms, copy.timestamp_ms)
+        self.assertEqual({'key': 'value'}, copy.userdata)
+
 
 class MidiProcessorTests(unittest.TestCase):
     def _increment_count(self, msg):
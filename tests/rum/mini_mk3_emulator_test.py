@@ -0,0 +1,83 @@
+import unittest
+
+from device_profile.novation.launchkey import emulator
+from device_profile.novation.launchkey.emulator import MiniMk3Emulator
+from device_profile.novation.launchkey.mini_mk3 import MiniMk3, \
+    MiniMk3MidiCommandBuilder, pack_led_updates
+from tests.testutils import FakeClock
+
+
+class InputGeneratorTest(unittest.TestCase):
+    def test_padRoll_pressesAndReleasesAtRate(self):
+        events = emulator.pad_roll(rate_hz=10, count=2)
+        self.assertEqual([(0x99, 0x28, 0x7F), (0x89, 0x28, 0),
+                          (0x99, 0x29, 0x7F), (0x89, 0x29, 0)],
+                         [event[1:] for event in events])
+        for expected, event in zip([0.0, 0.05, 0.1, 0.15], events):
+            self.assertAlmostEqual(expected, event[0])
+
+    def test_encoderSweep_valuesInOrder(self):
+        events = emulator.encoder_sweep(0, rate_hz=100, first=3, last=1)
+        self.assertEqual([3, 2, 1], [event[3] for event in events])
+        self.assertTrue(all(event[2] == 0x15 for event in events))
+
+    def test_buttonChord_allPressedBeforeReleased(self):
+        events = emulator.button_chord(['record', 'play'], hold=0.5)
+        self.assertEqual([0x7F, 0x7F, 0x00, 0x00],
+                         [event[3] for event in events])
+        self.assertEqual([0x75, 0x73, 0x73, 0x75],
+                         [event[2] for event in events])
+
+
+class MiniMk3EmulatorTest(unittest.TestCase):
+    def setUp(self):
+        self._clock = FakeClock()
+        self._inputs = []
+        self._emulator = MiniMk3Emulator(
+            lambda *args: self._inputs.append(args),
+            time_fn=self._clock.time, sleep_fn=self._clock.advance)
+
+    def test_receiveBuiltCommand_updatesLedState(self):
+        self._emulator.receive(MiniMk3MidiCommandBuilder()
+                               .light_color(0x24, 0x10)
+                               .blinking_light(0x25, 0x05)
+                               .build(daw_mode=True))
+        self.assertEqual((False, 0x10), self._emulator.led(0x24))
+        self.assertEqual((True, 0x05), self._emulator.led(0x25))
+        self.assertEqual(emulator.LED_OFF, self._emulator.led(0x26))
+
+    def test_receivePackedUpdates_updatesLedState(self):
+        self._emulator.receive(pack_led_updates([(0x28, (True, 0x05))]))
+        self.assertEqual((True, 0x05), self._emulator.pad_colors()[0][0])
+
+    def test_pressPad_sendsPadMessage(self):
+        self._emulator.press_pad(0, 1, velocity=0x40)
+        self.assertEqual([(0x99, MiniMk3.DRUM_PAD_IDS[1][0], 0x40)],
+                         self._inputs)
+
+    def test_play_sendsEventsAtTheirTimes(self):
+        times = []
+        self._emulator = MiniMk3Emulator(
+            lambda *args: times.append(self._clock.time()),
+            time_fn=self._clock.time, sleep_fn=self._clock.advance)
+        self._emulator.play(emulator.pad_roll(rate_hz=10, count=2))
+        self.assertEqual(4, len(times))
+        self.assertAlmostEqual(0.15, times[-1])
+
+    def test_report_measuresTrafficAndLatency(self):
+        self._emulator.press_pad(0, 0)
+        self._clock.advance(0.004)
+        self._emulator.receive(bytes([0x99, 0x28, 0x05]))
+        # Resending the same color is not an LED change.
+        self._emulator.receive(bytes([0x99, 0x28, 0x05]))
+        report = self._emulator.report()
+        self.assertEqual(1, report['inputs'])
+        self.assertEqual(2, report['messages'])
+        self.assertEqual(1, report['led_changes'])
+        self.assertEqual(2.0, report['messages_per_input'])
+        self.assertAlmostEqual(1500.0, report['bytes_per_second'])
+        self.assertAlmostEqual(4.0, report['latency_ms_max'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+from rum.output import OutputQueue, PRIORITY_BULK, PRIORITY_INTERACTIVE
+from rum.scheduling import Scheduler
+from tests.testutils import FakeClock
+
+
+class OutputQueueTests(unittest.TestCase):
+    def setUp(self):
+        self._clock = FakeClock()
+        self._sent = []
+        # 31250 baud -> 3.125 bytes per ms.
+        self._queue = OutputQueue(self._sent.append,
+                                  buffer_bytes=10,
+                                  scheduler=Scheduler(
+                                      time_fn=self._clock.time))
+
+    def test_messagesWithinBuffer_sentImmediately(self):
+        self._queue.send(b'abc')
+        self._queue.send(b'def')
+        self.assertEqual(2, self._queue.service())
+        self.assertEqual([b'abc', b'def'], self._sent)
+
+    def test_messagesExceedBuffer_pacedToBandwidth(self):
+        for _ in range(4):
+            self._queue.send(b'12345')
+        self._queue.service()
+        self.assertEqual(2, len(self._sent))
+
+        # 5 bytes take 1.6ms to transmit.
+        self._clock.advance(0.001)
+        self._queue.service()
+        self.assertEqual(2, len(self._sent))
+        self._clock.advance(0.001)
+        self._queue.service()
+        self.assertEqual(3, len(self._sent))
+        self.assertEqual(1, len(self._queue))
+
+    def test_largeMessage_sentWhenLineIdle(self):
+        self._queue.send(b'x' * 32)
+        self._queue.service()
+        self.assertEqual([b'x' * 32], self._sent)
+
+    def test_interactive_sentBeforeBulk(self):
+        self._queue.send(b'bulk', priority=PRIORITY_BULK)
+        self._queue.send(b'pad', priority=PRIORITY_INTERACTIVE)
+        self._queue.service()
+        self.assertEqual([b'pad', b'bulk'], self._sent)
+
+    def test_sameKey_pendingMessageSuperseded(self):
+        self._queue.send(b'led1=red', key=('led', 1))
+        self._queue.send(b'led2=red', key=('led', 2))
+        self._queue.send(b'led1=green', key=('led', 1))
+        self.assertEqual(2, len(self._queue))
+        self._queue.service()
+        self._clock.advance(0.01)
+        self._queue.service()
+        self.assertEqual([b'led2=red', b'led1=green'], self._sent)
+
+    def test_discard_pendingMessageDropped(self):
+        self._queue.send(b'led1', key=('led', 1))
+        self._queue.send(b'led2', key=('led', 2))
+        self._queue.discard(('led', 1))
+        self._queue.discard(('led', 3))
+        self.assertFalse(self._queue.is_pending(('led', 1)))
+        self._queue.service()
+        self.assertEqual([b'led2'], self._sent)
+
+
+if __name__ == '__main__':
+    unittest.main()
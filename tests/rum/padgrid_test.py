@@ -0,0 +1,65 @@
+import unittest
+
+from rum.padgrid import PadGrid
+
+_LED_IDS = [[0x28, 0x29, 0x2A, 0x2B],
+            [0x24, 0x25, 0x26, 0x27]]
+
+
+class PadGridTest(unittest.TestCase):
+    def setUp(self):
+        self._sent = []
+        self._grid = PadGrid(_LED_IDS, flush_fn=self._sent.append)
+
+    def test_coordinates_mapToLedIds(self):
+        self.assertEqual((4, 2), (self._grid.width(), self._grid.height()))
+        self.assertEqual(0x26, self._grid.led_id(2, 1))
+        self.assertEqual((3, 0), self._grid.coord(0x2B))
+        self.assertIsNone(self._grid.coord(0x30))
+
+    def test_setLed_setsColorAtCoordinate(self):
+        self._grid.set_led(0x25, 0x10)
+        self.assertEqual(0x10, self._grid.get(1, 1))
+
+    def test_firstFlush_sendsAllPads(self):
+        self._grid.flush()
+        self.assertEqual(1, len(self._sent))
+        self.assertEqual(8, len(self._sent[0]))
+
+    def test_flush_onlyChangedPadsSentInOneCall(self):
+        self._grid.flush()
+        self._sent.clear()
+        self._grid.set(0, 0, 5)
+        self._grid.set(3, 1, 6)
+        self._grid.flush()
+        self.assertEqual([[(0x28, 5), (0x27, 6)]], self._sent)
+
+    def test_flushUnchanged_nothingSent(self):
+        self._grid.flush()
+        self._grid.set(0, 0, 5)
+        self._grid.set(0, 0, 0)
+        self.assertFalse(self._grid.is_dirty())
+        self.assertEqual([], self._grid.flush())
+        self.assertEqual(1, len(self._sent))
+
+    def test_blit_clippedToGrid(self):
+        self._grid.blit([[1, 2, 3], [4, 5, 6], [7, 8, 9]], x=2, y=1)
+        self.assertEqual([0, 0, 1, 2], list(self._grid.get_row(1)))
+        self.assertEqual([0, 0, 0, 0], list(self._grid.get_row(0)))
+
+    def test_blitNegativeOffset_clippedToGrid(self):
+        self._grid.blit([bytes([1, 2, 3])], x=-1, y=0)
+        self.assertEqual([2, 3, 0, 0], list(self._grid.get_row(0)))
+
+    def test_fill_setsAllPads(self):
+        self._grid.fill(9)
+        self.assertEqual([9] * 4, list(self._grid.get_row(1)))
+
+    def test_resync_resendsAllPads(self):
+        self._grid.flush()
+        self._grid.resync()
+        self.assertEqual(8, len(self._grid.flush()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -44,6 +44,29 @@ class MidiProcessorTest(unittest.TestCase):
         self._processor.process(MidiMessage(128, 3, 4))
         self.assertEqual(3, self._cnt)
 
+    def test_portProcessor_onlyProcessesMessagesFromPort(self):
+        received = []
+        self._processor.port(1).add(lambda m: received.append((1, m)))
+        self._processor.port(2).add(lambda m: received.append((2, m)))
+        m = MidiMessage(0x90, 0x30, 0x7F, port=2)
+        self._processor.process(m)
+        self._processor.process(MidiMessage(0x90, 0x30, 0x7F))
+        self.assertEqual([(2, m)], received)
+
+    def test_portProcessor_sharedProcessorsCalledFirst(self):
+        received = []
+        self._processor.port(1).add(lambda m: received.append('port'))
+        self._processor.add(lambda m: received.append('shared'))
+        self._processor.process(MidiMessage(0x90, 0x30, 0x7F, port=1))
+        self.assertEqual(['shared', 'port'], received)
+
+    def test_clear_clearsPortProcessors(self):
+        received = []
+        self._processor.port(1).add(received.append)
+        self._processor.clear()
+        self._processor.process(MidiMessage(0x90, 0x30, 0x7F, port=1))
+        self.assertEqual([], received)
+
 
 class WhenTest(unittest.TestCase):
     def test_whenConditionFails_doesNotTriggerThen(self):
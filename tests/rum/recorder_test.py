@@ -1,6 +1,8 @@
 import unittest
 
-from rum.recorder import Recorder
+from rum import recorder
+from rum.midi import MidiMessage
+from rum.recorder import Recorder, Quantizer, RingBuffer, NoteRecorder
 from rum.scheduling import Scheduler
 from tests.testutils import FakeClock
 
@@ -883,5 +885,499 @@ class RecorderTests(unittest.TestCase):
             history)
 
 
+class QuantizerTests(unittest.TestCase):
+    def setUp(self):
+        # 120 bpm with 4 steps per beat gives a 125ms grid.
+        self._quantizer = Quantizer(lambda: 120.0, steps_per_beat=4)
+
+    def test_gridFromTempo_matchesSixteenthNotes(self):
+        self.assertEqual(125.0, self._quantizer.grid_ms())
+
+    def test_quantizeFullStrength_snapsToGrid(self):
+        pattern = [(1000, 'a'), (1130, 'b'), (1240, 'c'), (1370, 'd')]
+        self.assertEqual(
+            [(1000, 'a'), (1125, 'b'), (1250, 'c'), (1375, 'd')],
+            self._quantizer.quantize(pattern))
+
+    def test_quantizeHalfStrength_movesHalfwayToGrid(self):
+        quantizer = Quantizer(lambda: 120.0, strength=0.5)
+        pattern = [(1000, 'a'), (1110, 'b'), (1270, 'c')]
+        self.assertEqual(
+            [(1000, 'a'), (1118, 'b'), (1260, 'c')],
+            quantizer.quantize(pattern))
+
+    def test_quantizeWithSwing_delaysOddSteps(self):
+        quantizer = Quantizer(lambda: 120.0, swing=0.2)
+        pattern = [(0, 'a'), (120, 'b'), (255, 'c'), (380, 'd')]
+        self.assertEqual(
+            [(0, 'a'), (150, 'b'), (250, 'c'), (400, 'd')],
+            quantizer.quantize(pattern))
+
+    def test_quantizeShortNotes_noteLengthsKept(self):
+        on_a, off_a = MidiMessage(0x90, 0x3C, 0x40), MidiMessage(0x80, 0x3C, 0)
+        on_b, off_b = MidiMessage(0x90, 0x3E, 0x40), MidiMessage(0x80, 0x3E, 0)
+        pattern = [(0, on_a), (60, off_a), (190, on_b), (240, off_b)]
+        self.assertEqual(
+            [(0, on_a), (60, off_a), (250, on_b), (300, off_b)],
+            self._quantizer.quantize(pattern))
+
+    def test_quantizeEmptyPattern_returnsEmpty(self):
+        self.assertEqual([], self._quantizer.quantize([]))
+
+
+class RecorderQuantizationTests(unittest.TestCase):
+    def setUp(self):
+        self._data_played = []
+        self._clock = FakeClock()
+        self._scheduler = Scheduler(time_fn=self._clock.time)
+        # 60 bpm with 1 step per beat gives a 1 second grid.
+        self._recorder = Recorder(
+            self._scheduler,
+            playback_fn=self._data_played.append,
+            quantizer=Quantizer(lambda: 60.0, steps_per_beat=1))
+
+    def _record_sloppy_pattern(self):
+        self._recorder.start_recording('sloppy')
+        self._recorder.on_data_event(0, 'a')
+        self._recorder.on_data_event(1400, 'b')
+        self._recorder.on_data_event(1900, 'c')
+        self._recorder.stop_recording()
+
+    def _play_history(self, pattern_id, steps=3):
+        self._recorder.play(pattern_id)
+        history = []
+        self._scheduler.idle()
+        history.append(self._data_played[:])
+        for _ in range(steps):
+            self._clock.advance(1)
+            self._scheduler.idle()
+            history.append(self._data_played[:])
+        return history
+
+    def test_stopRecording_patternQuantizedByDefault(self):
+        self._record_sloppy_pattern()
+        self.assertTrue(self._recorder.is_quantized('sloppy'))
+        self.assertEqual([['a'], ['a', 'b'], ['a', 'b', 'c'], ['a', 'b', 'c']],
+                         self._play_history('sloppy'))
+
+    def test_switchToRawTake_playsOriginalTiming(self):
+        self._record_sloppy_pattern()
+        self._recorder.set_quantized('sloppy', False)
+        self.assertFalse(self._recorder.is_quantized('sloppy'))
+        self.assertEqual([['a'], ['a'], ['a', 'b', 'c'], ['a', 'b', 'c']],
+                         self._play_history('sloppy'))
+
+    def test_noQuantizer_playsOriginalTiming(self):
+        self._recorder.set_quantizer(None)
+        self._record_sloppy_pattern()
+        self.assertFalse(self._recorder.is_quantized('sloppy'))
+        self.assertEqual([['a'], ['a'], ['a', 'b', 'c'], ['a', 'b', 'c']],
+                         self._play_history('sloppy'))
+
+    def test_rerecordPattern_dropsStaleQuantizedTake(self):
+        self._record_sloppy_pattern()
+        self._recorder.start_recording('sloppy')
+        self.assertFalse(self._recorder.is_quantized('sloppy'))
+
+    def test_overdubQuantizedLoop_quantizedTakeKeepsPlaying(self):
+        self._record_sloppy_pattern()
+        self._recorder.play('sloppy', loop=True)
+        self._scheduler.idle()
+        self._clock.advance(0.7)
+        self._scheduler.idle()
+        self._recorder.start_recording('sloppy', overdub=True)
+        self.assertTrue(self._recorder.is_quantized('sloppy'))
+        self._recorder.on_data_event(self._scheduler.time_ms(), 'x')
+
+        # The next loop starts after the 2 seconds of the quantized take and
+        # plays x snapped to the grid together with b.
+        self._clock.advance(1.3)
+        self._scheduler.idle()
+        self.assertEqual(['a', 'b', 'c', 'a'], self._data_played)
+        self._clock.advance(1)
+        self._scheduler.idle()
+        self.assertEqual(['a', 'b', 'c', 'a', 'b', 'x'], self._data_played)
+
+        # Stopping re-quantizes the take from the merged raw take.
+        self._recorder.stop_recording()
+        self.assertTrue(self._recorder.is_quantized('sloppy'))
+        self.assertEqual([(0, 'a'), (1000, 'x'), (1000, 'b'), (2000, 'c')],
+                         self._recorder._quantized_map['sloppy'])
+        self.assertEqual([(0, 'a'), (700, 'x'), (1400, 'b'), (1900, 'c')],
+                         self._recorder._pattern_map['sloppy'])
+
+
+class RecorderViewTests(unittest.TestCase):
+    def setUp(self):
+        self._data_played = []
+        self._clock = FakeClock()
+        self._scheduler = Scheduler(time_fn=self._clock.time)
+        self._recorder = Recorder(self._scheduler,
+                                  playback_fn=self._data_played.append)
+        self._recorder.start_recording('notes')
+        for i, note in enumerate([0x30, 0x32, 0x34]):
+            self._recorder.on_data_event(
+                1000 * i, MidiMessage(0x90 + i, note, 0x40))
+        self._recorder.stop_recording()
+
+    def _played(self):
+        return [bytes(msg) for msg in self._data_played]
+
+    def _advance(self, seconds):
+        for _ in range(seconds):
+            self._clock.advance(1)
+            self._scheduler.idle()
+
+    def test_playTransposedView_originalPatternUnchanged(self):
+        self._recorder.add_view('up', 'notes', recorder.transpose(12))
+        self.assertTrue(self._recorder.has_pattern('up'))
+        self.assertTrue(self._recorder.play('up'))
+        self._advance(3)
+        self.assertEqual([bytes([0x90, 0x3C, 0x40]),
+                          bytes([0x91, 0x3E, 0x40]),
+                          bytes([0x92, 0x40, 0x40])], self._played())
+
+        self._data_played.clear()
+        self._recorder.play('notes')
+        self._advance(3)
+        self.assertEqual([bytes([0x90, 0x30, 0x40]),
+                          bytes([0x91, 0x32, 0x40]),
+                          bytes([0x92, 0x34, 0x40])], self._played())
+
+    def test_chainedTransforms_appliedInOrder(self):
+        self._recorder.add_view('view', 'notes',
+                                recorder.only_channels(0, 2),
+                                recorder.scale_velocity(2.5),
+                                recorder.transpose(-1))
+        self._recorder.play('view')
+        self._advance(3)
+        self.assertEqual([bytes([0x90, 0x2F, 0x7F]),
+                          bytes([0x92, 0x33, 0x7F])], self._played())
+
+    def test_transposeOutOfRange_noteDropped(self):
+        self._recorder.add_view('high', 'notes', recorder.transpose(0x4E))
+        self._recorder.play('high')
+        self._advance(3)
+        self.assertEqual([bytes([0x90, 0x7E, 0x40])], self._played())
+
+    def test_stretchView_timingScaled(self):
+        self._recorder.add_view('slow', 'notes', recorder.stretch(2.0))
+        self._recorder.play('slow')
+        self._scheduler.idle()
+        self._advance(2)
+        self.assertEqual(2, len(self._data_played))
+        self._advance(2)
+        self.assertEqual(3, len(self._data_played))
+
+    def test_toggleTransformWhilePlaying_appliesToRemainingEvents(self):
+        up = recorder.transpose(12)
+        self._recorder.add_view('up', 'notes', up)
+        self._recorder.play('up')
+        self._scheduler.idle()
+        up.enabled = False
+        self._advance(3)
+        self.assertEqual([bytes([0x90, 0x3C, 0x40]),
+                          bytes([0x91, 0x32, 0x40]),
+                          bytes([0x92, 0x34, 0x40])], self._played())
+
+    def test_viewOfMissingPattern_doesNotPlay(self):
+        self._recorder.add_view('view', 'missing', recorder.transpose(1))
+        self.assertFalse(self._recorder.has_pattern('view'))
+        self.assertFalse(self._recorder.play('view'))
+
+    def test_removeViewWhilePlaying_stopsView(self):
+        self._recorder.add_view('view', 'notes', recorder.transpose(1))
+        self._recorder.play('view', loop=True)
+        self._scheduler.idle()
+        self._recorder.remove_view('view')
+        self._advance(3)
+        self.assertEqual(1, len(self._data_played))
+        self.assertIsNone(self._recorder.get_view('view'))
+        self.assertNotIn('view', self._recorder.get_patterns())
+
+
+class RecorderOverdubTests(unittest.TestCase):
+    def setUp(self):
+        self._data_played = []
+        self._clock = FakeClock()
+        self._scheduler = Scheduler(time_fn=self._clock.time)
+        self._recorder = Recorder(self._scheduler,
+                                  playback_fn=self._data_played.append,
+                                  max_overdub_events=5)
+        self._recorder.start_recording('loop')
+        self._recorder.on_data_event(0, 'a')
+        self._recorder.on_data_event(1000, 'b')
+        self._recorder.on_data_event(2000, 'c')
+        self._recorder.stop_recording()
+
+    def _advance_ms(self, ms):
+        self._clock.advance(ms / 1000)
+        self._scheduler.idle()
+
+    def _now_ms(self):
+        return self._scheduler.time_ms()
+
+    def test_overdubWhileLooping_eventsPlayedOnNextLoop(self):
+        self._recorder.play('loop', loop=True, loop_delay_ms=1000)
+        self._scheduler.idle()
+        self._advance_ms(1500)
+        self._recorder.start_recording('loop', overdub=True)
+        self.assertTrue(self._recorder.is_overdubbing())
+        self._recorder.on_data_event(self._now_ms(), 'x')
+
+        self._advance_ms(1500)
+        self.assertEqual(['a', 'b', 'c', 'a'], self._data_played)
+        self._advance_ms(1500)
+        self.assertEqual(['a', 'b', 'c', 'a', 'b', 'x'], self._data_played)
+        self._advance_ms(1000)
+        self.assertEqual(['a', 'b', 'c', 'a', 'b', 'x', 'c'],
+                         self._data_played)
+
+        self._recorder.stop_recording()
+        self.assertFalse(self._recorder.is_overdubbing())
+        self.assertEqual(['a', 'b', 'x', 'c'],
+                         [d for _, d in self._recorder._pattern_map['loop']])
+
+    def test_overdubIntoLoopGap_loopLengthUnchanged(self):
+        self._recorder.play('loop', loop=True, loop_delay_ms=1000)
+        self._scheduler.idle()
+        self._advance_ms(2500)
+        self._recorder.start_recording('loop', overdub=True)
+        self._recorder.on_data_event(self._now_ms(), 'x')
+        self._advance_ms(500)
+        self._recorder.stop_recording()
+
+        # The next loops start every 3 seconds with x in the former gap.
+        self._advance_ms(2500)
+        self.assertEqual(['a', 'b', 'c', 'a', 'b', 'c', 'x'],
+                         self._data_played)
+        self._advance_ms(500)
+        self.assertEqual(['a', 'b', 'c', 'a', 'b', 'c', 'x', 'a'],
+                         self._data_played)
+
+    def test_overdubWhileStopped_eventsRelativeToRecordStart(self):
+        self._advance_ms(10000)
+        self._recorder.start_recording('loop', overdub=True)
+        self._recorder.on_data_event(self._now_ms() + 500, 'x')
+        self._recorder.stop_recording()
+        self.assertEqual([(0, 'a'), (500, 'x'), (1000, 'b'), (2000, 'c')],
+                         self._recorder._pattern_map['loop'])
+
+    def test_overdubBeyondCap_eventsDropped(self):
+        self._recorder.start_recording('loop', overdub=True)
+        for i in range(5):
+            self._recorder.on_data_event(self._now_ms() + i, i)
+        self._recorder.stop_recording()
+        self.assertEqual(5, len(self._recorder._pattern_map['loop']))
+
+    def test_overdubEmptyPattern_recordsNormally(self):
+        self._recorder.start_recording('new', overdub=True)
+        self.assertFalse(self._recorder.is_overdubbing())
+        self._recorder.on_data_event(100, 'x')
+        self._recorder.stop_recording()
+        self.assertEqual([(100, 'x')], self._recorder._pattern_map['new'])
+
+
+class RingBufferTests(unittest.TestCase):
+    def test_appendBeyondCapacity_oldestDropped(self):
+        buffer = RingBuffer(3)
+        for i in range(5):
+            buffer.append(i)
+        self.assertEqual(3, len(buffer))
+        self.assertEqual([2, 3, 4], buffer.to_list())
+        self.assertEqual(2, buffer[0])
+        self.assertEqual(4, buffer[-1])
+
+    def test_unbounded_growsAndKeepsOrder(self):
+        buffer = RingBuffer()
+        for i in range(20):
+            buffer.append(i)
+            if i % 3 == 0:
+                buffer.popleft()
+        self.assertEqual(list(range(7, 20)), list(buffer))
+
+    def test_indexOutOfRange_raises(self):
+        buffer = RingBuffer(2)
+        with self.assertRaises(IndexError):
+            _ = buffer[0]
+
+
+class RecorderMemoryTests(unittest.TestCase):
+    def setUp(self):
+        self._evicted = []
+        self._clock = FakeClock()
+        self._scheduler = Scheduler(time_fn=self._clock.time)
+        self._recorder = Recorder(self._scheduler, playback_fn=lambda _: None)
+
+    def _record(self, pattern_id, num_events, spacing_ms=100):
+        self._recorder.start_recording(pattern_id)
+        for i in range(num_events):
+            self._recorder.on_data_event(i * spacing_ms, i)
+        self._recorder.stop_recording()
+
+    def test_maxEvents_keepsLastEvents(self):
+        self._recorder.set_capacity(max_events=3)
+        self._record('p', 10)
+        self.assertEqual([(700, 7), (800, 8), (900, 9)],
+                         self._recorder._pattern_map['p'])
+
+    def test_maxDuration_keepsLastWindow(self):
+        self._recorder.set_capacity(max_duration_ms=250)
+        self._record('p', 10)
+        self.assertEqual([(700, 7), (800, 8), (900, 9)],
+                         self._recorder._pattern_map['p'])
+
+    def test_overBudget_leastRecentlyPlayedEvicted(self):
+        self._recorder.set_memory_budget(10, eviction_fn=self._evicted.append)
+        self._record('a', 4)
+        self._record('b', 4)
+        self._recorder.play('a')
+        self._clock.advance(1)
+        self._scheduler.idle()
+        self._record('c', 4)
+        self.assertEqual(['b'], self._evicted)
+        self.assertEqual(['a', 'c'], sorted(self._recorder.get_patterns()))
+        self.assertFalse(self._recorder.play('b'))
+        self.assertEqual(8, self._recorder.get_total_events())
+
+    def test_overBudget_loopingPatternNotEvicted(self):
+        self._recorder.set_memory_budget(9, eviction_fn=self._evicted.append)
+        self._record('a', 4)
+        self._recorder.play('a', loop=True)
+        self._record('b', 4)
+        self.assertEqual([], self._evicted)
+        self._record('c', 4)
+        self.assertEqual(['b'], self._evicted)
+        self.assertTrue(self._recorder.has_pattern('a'))
+
+    def test_overBudget_patternLoopingThroughViewNotEvicted(self):
+        self._recorder.set_memory_budget(9, eviction_fn=self._evicted.append)
+        self._record('a', 4)
+        self._recorder.add_view('view', 'a', recorder.stretch(2))
+        self._recorder.play('view', loop=True)
+        self._record('b', 4)
+        self._record('c', 4)
+        self.assertEqual(['b'], self._evicted)
+        self.assertTrue(self._recorder.has_pattern('a'))
+
+
+class NoteRecorderTests(unittest.TestCase):
+    def setUp(self):
+        self._played = []
+        self._clock = FakeClock()
+        self._scheduler = Scheduler(time_fn=self._clock.time)
+        self._recorder = NoteRecorder(
+            self._scheduler, playback_fn=lambda m: self._played.append(bytes(m)))
+
+    def _advance(self, seconds):
+        for _ in range(seconds):
+            self._clock.advance(1)
+            self._scheduler.idle()
+
+    def _record(self, events):
+        self._recorder.start_recording('p')
+        for timestamp_ms, status, data1, data2 in events:
+            self._recorder.on_data_event(
+                timestamp_ms, MidiMessage(status, data1, data2))
+        self._recorder.stop_recording()
+
+    def test_recordNotes_pairedWithDurations(self):
+        self._record([(0, 0x90, 0x30, 0x40),
+                      (500, 0x91, 0x30, 0x40),
+                      (1000, 0x80, 0x30, 0x00),
+                      (3000, 0x91, 0x30, 0x00)])
+        notes = self._recorder.get_notes('p')
+        self.assertEqual([(0, 1000, 0), (500, 2500, 1)],
+                         [(n.timestamp_ms, n.duration_ms,
+                           n.note_on.get_channel()) for n in notes])
+
+    def test_recordUnfinishedNote_noteOffAddedAtEnd(self):
+        self._record([(0, 0x90, 0x30, 0x40),
+                      (1000, 0x90, 0x32, 0x40),
+                      (2000, 0x80, 0x32, 0x00)])
+        notes = self._recorder.get_notes('p')
+        self.assertEqual([(0, 2000), (1000, 1000)],
+                         [(n.timestamp_ms, n.duration_ms) for n in notes])
+        self._recorder.play('p')
+        self._advance(3)
+        self.assertEqual(bytes([0x80, 0x30, 0x00]), self._played[-1])
+
+    def test_keyHeldThroughStop_noteOffAtStopTime(self):
+        self._recorder.start_recording('p')
+        self._recorder.on_data_event(0, MidiMessage(0x90, 0x3C, 0x40))
+        self._recorder.on_data_event(1000, MidiMessage(0x80, 0x3C, 0x00))
+        self._recorder.on_data_event(2000, MidiMessage(0x90, 0x3E, 0x40))
+        self._clock.advance(2.5)
+        self._recorder.stop_recording()
+        notes = self._recorder.get_notes('p')
+        self.assertEqual([(0x3C, 0, 1000), (0x3E, 2000, 500)],
+                         [(n.note_on.data1, n.timestamp_ms, n.duration_ms)
+                          for n in notes])
+
+    def test_evictPlayedPattern_heldNotesDropped(self):
+        self._record([(0, 0x90, 0x30, 0x40), (1000, 0x80, 0x30, 0x00)])
+        self._recorder.play('p')
+        self._advance(2)
+        self.assertIn('p', self._recorder._held_map)
+        self._recorder.set_memory_budget(0)
+        self.assertNotIn('p', self._recorder._held_map)
+
+    def test_stopWhileNoteHeld_sendsNoteOff(self):
+        self._record([(0, 0x90, 0x30, 0x40),
+                      (0, 0x91, 0x34, 0x40),
+                      (2000, 0x80, 0x30, 0x00),
+                      (2000, 0x81, 0x34, 0x00)])
+        self._recorder.play('p', loop=True)
+        self._scheduler.idle()
+        held = self._recorder.get_held_notes('p')
+        self.assertEqual(2, len(held))
+        self.assertTrue(held.is_held(1, 0x34))
+
+        self._recorder.stop('p')
+        self.assertEqual(0, len(held))
+        self.assertEqual([bytes([0x90, 0x30, 0x40]),
+                          bytes([0x91, 0x34, 0x40]),
+                          bytes([0x80, 0x30, 0x00]),
+                          bytes([0x81, 0x34, 0x00])], self._played)
+        self._advance(3)
+        self.assertEqual(4, len(self._played))
+
+    def test_stopAfterNotesReleased_noExtraNoteOffs(self):
+        self._record([(0, 0x90, 0x30, 0x40),
+                      (1000, 0x80, 0x30, 0x00),
+                      (3000, 0x90, 0x32, 0x40)])
+        self._recorder.play('p')
+        self._scheduler.idle()
+        self._advance(2)
+        self._recorder.stop_all()
+        self.assertEqual([bytes([0x90, 0x30, 0x40]),
+                          bytes([0x80, 0x30, 0x00])], self._played)
+
+    def test_stopTransposedView_releasesTransposedNotes(self):
+        self._record([(0, 0x90, 0x30, 0x40), (1000, 0x80, 0x30, 0x00)])
+        self._recorder.add_view('up', 'p', recorder.transpose(2))
+        self._recorder.play('up')
+        self._scheduler.idle()
+        self._recorder.stop('up')
+        self.assertEqual([bytes([0x90, 0x32, 0x40]),
+                          bytes([0x80, 0x32, 0x00])], self._played)
+
+
+    def test_toggleTransposeDuringNote_noteOffMatchesNoteOn(self):
+        self._record([(0, 0x90, 0x30, 0x40), (2000, 0x80, 0x30, 0x00),
+                      (3000, 0x90, 0x31, 0x40), (4000, 0x80, 0x31, 0x00)])
+        up = recorder.transpose(2)
+        self._recorder.add_view('up', 'p', up)
+        self._recorder.play('up')
+        self._scheduler.idle()
+        self._advance(1)
+        up.enabled = False
+        self._advance(4)
+        self.assertEqual([bytes([0x90, 0x32, 0x40]),
+                          bytes([0x80, 0x32, 0x00]),
+                          bytes([0x90, 0x31, 0x40]),
+                          bytes([0x80, 0x31, 0x00])], self._played)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+from rum.displays import DirectDisplay
+from rum.widgets import Label, Layout, List, Meter, Value
+
+
+class LayoutTests(unittest.TestCase):
+    def setUp(self):
+        self._regions = []
+        self._display = (DirectDisplay.Builder()
+                         .set_lines(2)
+                         .set_line_width(16)
+                         .push_changes_with(
+                             lambda regions: self._regions.append(
+                                 [(idx, start, ''.join(chars))
+                                  for idx, start, chars in regions]))
+                         .build())
+        self._layout = Layout(self._display)
+
+    def test_render_widgetsDrawnInRegions(self):
+        self._layout.add(Label('Vol'), 0, 0, 4)
+        self._layout.add(Value(42), 0, 12, 4)
+        self._layout.add(Meter(64, max_value=128), 1, 0, 8)
+        self._layout.render()
+        self.assertEqual('Vol           42', str(self._display[0]))
+        self.assertEqual('####            ', str(self._display[1]))
+
+    def test_valueChanged_onlyValueCellsPushed(self):
+        value = self._layout.add(Value(10), 0, 12, 4)
+        self._layout.add(Label('Volume'), 0, 0, 6)
+        self._layout.render()
+        value.set(12)
+        self._layout.render()
+        self.assertEqual([(0, 15, '2')], self._regions[-1])
+
+    def test_noChanges_nothingDrawn(self):
+        self._layout.add(Label('Vol'), 0, 0, 4)
+        self._layout.render()
+        self.assertFalse(self._layout.render())
+        self.assertEqual(1, len(self._regions))
+
+    def test_boundValue_polledOnRender(self):
+        state = {'pan': 0}
+        self._layout.add(Value(fmt='{:+d}'), 0, 12, 4).bind(
+            lambda: state['pan'])
+        self._layout.render()
+        state['pan'] = -5
+        self._layout.render()
+        self.assertEqual('  -5', str(self._display[0])[12:])
+
+    def test_meterSameCells_notRedrawn(self):
+        meter = self._layout.add(Meter(0, max_value=160), 1, 0, 16)
+        self._layout.render()
+        meter.set(4)
+        self.assertFalse(self._layout.render())
+        meter.set(10)
+        self.assertTrue(self._layout.render())
+
+    def test_list_selectedItemMarkedAndPaged(self):
+        items = self._layout.add(List(['a', 'b', 'c']), 0, 0, 4, height=2)
+        self._layout.render()
+        self.assertEqual('>a  ', str(self._display[0])[:4])
+        self.assertEqual(' b  ', str(self._display[1])[:4])
+        items.select(2)
+        self._layout.render()
+        self.assertEqual('>c  ', str(self._display[0])[:4])
+        self.assertEqual('    ', str(self._display[1])[:4])
+
+
+if __name__ == '__main__':
+    unittest.main()
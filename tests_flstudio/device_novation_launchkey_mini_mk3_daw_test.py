@@ -0,0 +1,83 @@
+import os.path as path
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.append(path.join(path.dirname(path.abspath(__file__)), 'stubs'))
+
+import device_novation_launchkey_mini_mk3_daw as daw
+from daw import flstudio
+from device_profile import registry as profiles
+from device_profile.novation.launchkey.mini_mk3 import pack_led_updates
+from rum.midi import MidiMessage
+from rum.output import OutputQueue
+from rum.scheduling import Scheduler
+from tests.testutils import FakeClock
+
+
+class FakeSysexEvent:
+    def __init__(self, sysex):
+        self.sysex = sysex
+        self.handled = False
+
+
+class NovationLaunchkeyMiniMk3DawTests(unittest.TestCase):
+    def setUp(self):
+        daw._pending_batch.clear()
+        daw._pending_refresh.clear()
+        self._sent = []
+        queue = OutputQueue(flstudio.Device.send_sysex_message,
+                            scheduler=Scheduler(time_fn=FakeClock().time))
+        profile = profiles.new_profile('novation_launchkey_mini_mk3', True,
+                                       flstudio.Device.send_sysex_message,
+                                       output_queue=queue)
+        for p in [patch('device.midiOutSysex', side_effect=self._sent.append),
+                  patch.object(daw, '_output_queue', queue),
+                  patch.object(daw, '_profile', profile)]:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_singleLedUpdates_pendingUpdateSuperseded(self):
+        daw._send_led_updates([(0x28, (False, 0x05))])
+        daw._send_led_updates([(0x28, (False, 0x10))])
+        self.assertEqual(1, len(daw._output_queue))
+        daw._output_queue.service()
+        self.assertEqual([bytes([0x9F, 0x0C, 0x00, 0x99, 0x28, 0x10])],
+                         self._sent)
+
+    def test_batches_pendingBatchMergedIntoNewer(self):
+        daw._send_led_updates([(0x28, (False, 0x05)), (0x29, (True, 0x05))])
+        daw._send_led_updates([(0x29, (False, 0x00)), (0x2A, (False, 0x10))])
+        daw._send_led_updates([(0x2B, (False, 0x0D))])
+        self.assertEqual(1, len(daw._output_queue))
+        daw._output_queue.service()
+        self.assertEqual([bytes([0x9F, 0x0C, 0x00,
+                                 0x99, 0x28, 0x05,
+                                 0x99, 0x29, 0x00,
+                                 0x99, 0x2A, 0x10,
+                                 0x99, 0x2B, 0x0D])], self._sent)
+
+    def test_onSysEx_ledBatchSent(self):
+        event = FakeSysexEvent(pack_led_updates([(0x24, (True, 0x05)),
+                                                 (0x25, (False, 0x10))]))
+        daw.OnSysEx(event)
+        daw._output_queue.service()
+        self.assertTrue(event.handled)
+        self.assertEqual([bytes([0x9F, 0x0C, 0x00,
+                                 0x99, 0x25, 0x10,
+                                 0x9B, 0x24, 0x05])], self._sent)
+
+    def test_refreshThenPadPress_padSentFirst(self):
+        daw.OnSysEx(FakeSysexEvent(pack_led_updates(
+            [(0x24, (False, 0x10)), (0x25, (False, 0x10))], refresh=True)))
+        daw.set_led_color(MidiMessage(0x99, 0x24, 0x05))
+        daw._output_queue.service()
+        # The refresh carries the newer color of the pressed pad.
+        self.assertEqual([bytes([0x9F, 0x0C, 0x00, 0x99, 0x24, 0x05]),
+                          bytes([0x9F, 0x0C, 0x00,
+                                 0x99, 0x24, 0x05,
+                                 0x99, 0x25, 0x10])], self._sent)
+
+
+if __name__ == '__main__':
+    unittest.main()
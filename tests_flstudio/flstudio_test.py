@@ -10,7 +10,7 @@ sys.path.append(path.join(path.dirname(path.abspath(__file__)), 'stubs'))
 # Include FL Studio API stubs
 from daw import flstudio
 from daw.flstudio import register
-from rum import scheduling, matchers
+from rum import scheduling, matchers, flushing
 from rum.midi import MidiMessage
 from rum.decorators import trigger_when
 from rum.scheduling import Scheduler
@@ -54,6 +54,14 @@ class ChannelRackTest(unittest.TestCase):
                 ]
                 mock_dispatch.assert_has_calls(expected_calls)
 
+    def test_dispatchSysexToOtherScripts_sentToEachReceiver(self):
+        with patch('device.dispatchReceiverCount', return_value=2):
+            with patch('device.dispatch') as mock_dispatch:
+                flstudio.Device.dispatch_sysex_to_other_scripts(b'\xF0\xF7')
+                mock_dispatch.assert_has_calls([
+                    call(0, 0xF0, b'\xF0\xF7'),
+                    call(1, 0xF0, b'\xF0\xF7')])
+
 
 class DecoratorsTest(unittest.TestCase):
 
@@ -98,6 +106,23 @@ class DecoratorsTest(unittest.TestCase):
         self.assertEqual([2], idle)
         self.assertEqual([1], scheduled)
 
+    def test_callRegisteredOnIdle_flushesAfterFunction(self):
+        events = []
+
+        def flush():
+            events.append('flush')
+
+        @register
+        def OnIdle():
+            events.append('idle')
+
+        flushing.get_flush_manager().add(flush)
+        try:
+            OnIdle()
+        finally:
+            flushing.get_flush_manager().remove(flush)
+        self.assertEqual(['idle', 'flush'], events)
+
     def test_callRegisteredOnMidiMsg_triggerProcessor(self):
         received = []
         called = []
@@ -132,6 +157,60 @@ class DecoratorsTest(unittest.TestCase):
         self.assertEqual(0x1, received[0].data1)
         self.assertEqual(0x2, received[0].data2)
 
+    @patch('device.getPortNumber')
+    def test_callRegisteredOnMidiMsg_routedByEventPort(self,
+                                                       mock_port_number):
+        # The script's own port must not be used to route the messages.
+        mock_port_number.return_value = 5
+        received = []
+
+        @trigger_when(matchers.status_eq(0x31), port=5)
+        def port5_msg_received(m: MidiMessage):
+            received.append((5, m.data1))
+
+        @trigger_when(matchers.status_eq(0x31), port=6)
+        def port6_msg_received(m: MidiMessage):
+            received.append((6, m.data1))
+
+        @register
+        def OnMidiMsg(event):
+            pass
+
+        class FakeEventData:
+            def __init__(self, status, data1, data2, port):
+                self.status = status
+                self.data1 = data1
+                self.data2 = data2
+                self.port = port
+
+        OnMidiMsg(FakeEventData(0x31, 1, 2, port=6))
+        OnMidiMsg(FakeEventData(0x31, 3, 2, port=5))
+        self.assertEqual([(6, 1), (5, 3)], received)
+
+    def test_callRegisteredOnMidiMsgWithoutPort_onlySharedHandlersCalled(self):
+        received = []
+
+        @trigger_when(matchers.status_eq(0x32))
+        def msg_received(m: MidiMessage):
+            received.append(('shared', m.port))
+
+        @trigger_when(matchers.status_eq(0x32), port=5)
+        def port5_msg_received(m: MidiMessage):
+            received.append(('port', m.port))
+
+        @register
+        def OnMidiMsg(event):
+            pass
+
+        class FakeEventData:
+            def __init__(self, status, data1, data2):
+                self.status = status
+                self.data1 = data1
+                self.data2 = data2
+
+        OnMidiMsg(FakeEventData(0x32, 1, 2))
+        self.assertEqual([('shared', None)], received)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,95 @@
+import importlib
+import os.path as path
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.append(path.join(path.dirname(path.abspath(__file__)), 'stubs'))
+
+import device_novation_launchkey_mini_mk3_midi as dut
+from device_profile.novation.launchkey import emulator
+from device_profile.novation.launchkey.emulator import MiniMk3Emulator
+from device_profile.novation.launchkey.mini_mk3 import LED_BATCH_HEADER
+from rum import autorefresh, flushing, processor
+from tests.testutils import FakeClock
+
+
+class FakeEventData:
+    def __init__(self, status, data1, data2):
+        self.status = status
+        self.data1 = data1
+        self.data2 = data2
+        self.handled = False
+        self.sysex = None
+
+
+class MiniMk3ScriptEmulatorTest(unittest.TestCase):
+    """ Drives the Launchkey Mini Mk3 MIDI script with the emulator. """
+    def setUp(self):
+        # Other tests clear the handlers the script registers when imported,
+        # so the script is reloaded to register them again.
+        processor.get_processor().clear()
+        flushing.get_flush_manager().clear()
+        autorefresh.get_refresh_manager().clear()
+        importlib.reload(dut)
+        dut.DEBUG = False
+        clock = FakeClock()
+        self._emulator = MiniMk3Emulator(
+            lambda *args: dut.OnMidiMsg(FakeEventData(*args)),
+            time_fn=clock.time, sleep_fn=clock.advance)
+        # The LED updates the script dispatches to the DAW script are
+        # received by the emulator.
+        patches = [
+            patch('device.dispatchReceiverCount', return_value=1),
+            patch('device.dispatch',
+                  side_effect=lambda idx, status, data:
+                  self._emulator.receive(data)),
+            patch('channels.selectedChannel', return_value=0),
+            patch('channels.channelCount', return_value=8),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def _send(self, input_fn):
+        """ Returns the (messages, led changes) sent for an input. """
+        self._emulator.reset_metrics()
+        input_fn()
+        report = self._emulator.report()
+        return report['messages'], report['led_changes']
+
+    def test_recordPadAndRoll_ledsBatchedPerInput(self):
+        dut.OnInit()
+        self.assertEqual((0, 0), self._send(
+            lambda: self._emulator.press_button('record')))
+        self.assertEqual((1, 1), self._send(
+            lambda: self._emulator.press_pad(1, 0)))
+        self.assertEqual((True, 0x05), self._emulator.pad_colors()[0][1])
+        # LED updates are dispatched in the callback of the input.
+        self.assertEqual(0.0, self._emulator.report()['latency_ms_max'])
+        self.assertEqual((0, 0), self._send(
+            lambda: self._emulator.release_pad(1, 0)))
+        self.assertEqual((0, 0), self._send(
+            lambda: self._emulator.release_button('record')))
+
+        # Pads that don't change their LEDs send nothing.
+        self._emulator.reset_metrics()
+        self._emulator.play(emulator.pad_roll(rate_hz=20, count=16),
+                            idle_fn=dut.OnIdle)
+        report = self._emulator.report()
+        self.assertEqual(32, report['inputs'])
+        self.assertEqual(0, report['messages'])
+
+    def test_fullRefresh_allPadsResentInOneMessage(self):
+        dut.OnInit()
+        self._emulator.reset_metrics()
+        dut.OnDoFullRefresh()
+        report = self._emulator.report()
+        self.assertEqual(1, report['messages'])
+        self.assertEqual(len(LED_BATCH_HEADER) + 3 * 16 + 1,
+                         report['bytes'])
+        self.assertEqual(0, report['led_changes'])
+
+
+if __name__ == '__main__':
+    unittest.main()